@@ -76,6 +76,15 @@ class UserAdmin(BaseUserAdmin):
         ("Personal info", {
             "fields": ("name",)
         }),
+        ("Notifications", {
+            "fields": (
+                "timezone",
+                "digest_enabled",
+                "digest_time",
+                "quiet_hours_start",
+                "quiet_hours_end",
+            )
+        }),
         ("Permissions", {
             "fields": (
                 "is_verified",
@@ -90,6 +99,14 @@ class UserAdmin(BaseUserAdmin):
         # ("Important dates", {"fields": ("last_login", "date_joined")}),
     )
 
+    # Changes that should end the user's existing sessions
+    revoking_fields = {"password", "is_active", "is_staff", "is_superuser", "groups", "user_permissions"}
+
+    def save_model(self, request, obj, form, change):
+        if change and self.revoking_fields & set(form.changed_data):
+            obj.bump_auth_version()
+        super().save_model(request, obj, form, change)
+
     add_fieldsets = (
         (None, {
             "classes": ("wide",),
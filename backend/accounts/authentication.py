@@ -0,0 +1,79 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+User = get_user_model()
+
+AUTH_VERSION_CLAIM = "auth_version"
+
+
+def user_cache_key(user_id):
+    return f"auth:user:{user_id}"
+
+
+def get_cached_user(user_id):
+    """
+    Loads a user by id, going to the database only on a cache miss.
+    Entries live for AUTH_USER_CACHE_TTL and are dropped whenever the
+    user is saved, so the TTL only bounds a write racing a refill.
+    """
+    key = user_cache_key(user_id)
+    user = cache.get(key)
+    if user is None:
+        user = User.objects.filter(pk=user_id).first()
+        if user is None:
+            return None
+        cache.set(key, user, settings.AUTH_USER_CACHE_TTL)
+    return user
+
+
+def invalidate_cached_user(user_id):
+    invalidate_cached_users([user_id])
+
+
+def invalidate_cached_users(user_ids):
+    """
+    Drops cached users. Call it after QuerySet.update() on users,
+    which doesn't send post_save.
+    """
+    keys = [user_cache_key(user_id) for user_id in user_ids]
+    cache.delete_many(keys)
+    # A request may have refilled the cache from the pre-commit row
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def resolve_token_user(token):
+    """
+    Returns the active user a token belongs to.
+    Raises AuthenticationFailed if the token's auth version is stale.
+    """
+    try:
+        user_id = token[api_settings.USER_ID_CLAIM]
+    except KeyError:
+        raise InvalidToken("Token contained no recognizable user identification")
+
+    user = get_cached_user(user_id)
+    if user is None:
+        raise AuthenticationFailed("User not found", code="user_not_found")
+    if not user.is_active:
+        raise AuthenticationFailed("User is inactive", code="user_inactive")
+
+    # Tokens from before versioning carry no claim and count as version 0
+    if token.get(AUTH_VERSION_CLAIM, 0) != user.auth_version:
+        raise AuthenticationFailed("Token has been revoked", code="token_revoked")
+    return user
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that resolves the user from the cache,
+    so an authenticated request with a warm cache makes no queries.
+    """
+
+    def get_user(self, validated_token):
+        return resolve_token_user(validated_token)
@@ -0,0 +1,22 @@
+from django.contrib.auth import get_user_model
+from chores.hashing import acheck_password, amake_password
+
+User = get_user_model()
+
+async def aauthenticate_user(email, password):
+    """
+    Async equivalent of authenticate() with the model backend,
+    with the password check done in the hashing pool.
+    """
+    try:
+        user = await User._default_manager.aget_by_natural_key(email)
+    except User.DoesNotExist:
+        # Hash anyway so unknown emails take as long as wrong passwords
+        await amake_password(password)
+        return None
+
+    if not await acheck_password(password, user.password):
+        return None
+    if not user.is_active:
+        return None
+    return user
@@ -0,0 +1,164 @@
+import os
+import re
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import BytesIO
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.core.files.base import ContentFile
+from django.core.files.storage import storages
+
+
+AVATAR_NAME_RE = re.compile(r"^avatar_(?P<key>[0-9a-f]+)(?:_\d+)?\.png$")
+
+def get_avatar_storage():
+    """ Storage backend for avatars, configured in STORAGES["avatars"] """
+    return storages["avatars"]
+
+def avatar_name(key, size_name="large"):
+    """ Storage name of one pre-rendered size of an avatar """
+    return f"avatar_{key}_{settings.AVATAR_SIZES[size_name]}.png"
+
+def avatar_url(key, size_name="large"):
+    return get_avatar_storage().url(avatar_name(key, size_name))
+
+def avatar_urls(key):
+    """ URLs of every pre-rendered size, e.g. small for lists, large for profiles """
+    if not key:
+        return None
+    return {size_name: avatar_url(key, size_name) for size_name in settings.AVATAR_SIZES}
+
+def avatar_image_path(key):
+    """
+    Value stored in User.avatar_image.
+    Kept relative (media/avatars/...) as the app prefixes it with the host.
+    """
+    return avatar_url(key).lstrip("/")
+
+def avatar_exists(key):
+    storage = get_avatar_storage()
+    return all(storage.exists(avatar_name(key, size_name)) for size_name in settings.AVATAR_SIZES)
+
+def save_avatar_image(name, image):
+    """
+    Save a PIL image under a content-addressed name.
+    The content for a name never changes, so existing files are kept.
+    """
+    storage = get_avatar_storage()
+    if storage.exists(name):
+        return name
+    buffer = BytesIO()
+    image.save(buffer, format="PNG", optimize=True)
+    return storage.save(name, ContentFile(buffer.getvalue()))
+
+def _iter_avatar_files(storage):
+    """
+    Yield (name, size, modified) for every stored avatar.
+    Local directories are streamed with scandir, other backends
+    fall back to listdir.
+    """
+    location = getattr(storage, "location", None)
+    if location is not None:
+        if not os.path.isdir(location):
+            return
+        with os.scandir(location) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    stat = entry.stat()
+                    modified = datetime.fromtimestamp(stat.st_mtime, tz=dt_timezone.utc)
+                    yield entry.name, stat.st_size, modified
+        return
+
+    _, files = storage.listdir("")
+    for name in files:
+        yield name, storage.size(name), storage.get_modified_time(name)
+
+def _referenced_avatars():
+    """
+    Keys and file names referenced by users, read in chunks.
+    File names cover avatars saved before content keys existed.
+    """
+    from accounts.models import User
+
+    keys = set()
+    names = set()
+    rows = (
+        User.objects
+        .filter(avatar_image__isnull=False)
+        .values_list("avatar_key", "avatar_image")
+        .iterator(chunk_size=2000)
+    )
+    for key, image in rows:
+        if key:
+            keys.add(key)
+        if image:
+            names.add(os.path.basename(image))
+    return keys, names
+
+def _still_referenced(names):
+    """
+    The names a user references right now. Keys are shared, and
+    adopting an existing key doesn't touch its file, so a file can
+    gain a user after _referenced_avatars has run.
+    """
+    from accounts.models import User
+
+    storage = get_avatar_storage()
+    keys = {AVATAR_NAME_RE.match(name)["key"] for name in names}
+    # Stored the way avatar_image_path stores them
+    images = [storage.url(name).lstrip("/") for name in names]
+    referenced = set()
+    for key, image in User.objects.filter(Q(avatar_key__in=keys) | Q(avatar_image__in=images)).values_list(
+        "avatar_key", "avatar_image"
+    ):
+        referenced.update(
+            name for name in names
+            if AVATAR_NAME_RE.match(name)["key"] == key or os.path.basename(image or "") == name
+        )
+    return referenced
+
+def collect_orphaned_avatars(grace=None, batch_size=None):
+    """
+    Delete avatar files no user references, once they are older
+    than the grace period. The grace period covers avatars rendered
+    for rows that haven't committed yet.
+    Returns a report of scanned, deleted and reclaimed bytes.
+    """
+    grace = grace or timedelta(hours=settings.AVATAR_GC_GRACE_HOURS)
+    batch_size = batch_size or settings.AVATAR_GC_BATCH_SIZE
+    cutoff = timezone.now() - grace
+    storage = get_avatar_storage()
+    keys, names = _referenced_avatars()
+
+    report = {"scanned": 0, "deleted": 0, "reclaimed_bytes": 0}
+    batch = []
+
+    def flush():
+        if not batch:
+            return
+        referenced = _still_referenced([name for name, _ in batch])
+        for name, size in batch:
+            if name in referenced:
+                continue
+            try:
+                storage.delete(name)
+            except FileNotFoundError:
+                continue
+            report["deleted"] += 1
+            report["reclaimed_bytes"] += size
+        batch.clear()
+
+    for name, size, modified in _iter_avatar_files(storage):
+        match = AVATAR_NAME_RE.match(name)
+        if not match:
+            continue
+        report["scanned"] += 1
+        if modified > cutoff:
+            continue
+        if match["key"] in keys or name in names:
+            continue
+        batch.append((name, size))
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+    return report
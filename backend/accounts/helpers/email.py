@@ -1,24 +1,28 @@
-from django.core.mail import send_mail
-from django.conf import settings
+from django.db import transaction
+from accounts.tasks import send_emails
 
 # TODO: In production, use a proper email backend and environment variables for sensitive info
 
+def queue_emails(messages):
+    """
+    Hand emails to the Celery mail queue once the current
+    transaction commits, so no SMTP work happens on the request path
+    and nothing is sent for rolled back changes.
+    """
+    transaction.on_commit(lambda: send_emails.delay(messages))
+
 def send_verification_email(email, token):
     verify_link = f"http://localhost:8000/api/accounts/verify-email?token={token}"
-    send_mail(
-        subject="Verify your email",
-        message=f"Click this link to verify your email: {verify_link}",
-        from_email=settings.DEFAULT_FROM_EMAIL,
-        recipient_list=[email],
-        fail_silently=False,
-    )
+    queue_emails([{
+        "subject": "Verify your email",
+        "body": f"Click this link to verify your email: {verify_link}",
+        "to": [email],
+    }])
 
 def send_password_reset_email(email, token):
     reset_link = f"http://localhost:8000/api/accounts/reset-password?token={token}"
-    send_mail(
-        subject="Password Reset Request",
-        message=f"Click this link to reset your passwrod: {reset_link}",
-        from_email=settings.DEFAULT_FROM_EMAIL,
-        recipient_list=[email],
-        fail_silently=False,
-    )
+    queue_emails([{
+        "subject": "Password Reset Request",
+        "body": f"Click this link to reset your passwrod: {reset_link}",
+        "to": [email],
+    }])
@@ -1,9 +1,17 @@
 from PIL import Image, ImageDraw, ImageFont, ImageColor
 import hashlib
 import os
-import secrets
-from pathlib import Path
+from functools import lru_cache
 from typing import Optional, Tuple
+from django.conf import settings
+from django.db import transaction
+
+from .avatar_storage import (
+    avatar_image_path,
+    avatar_name,
+    get_avatar_storage,
+    save_avatar_image,
+)
 
 # Path to default Inter font in your project
 DEFAULT_FONT_PATH = "fonts/Inter/static/Inter_28pt-Bold.ttf"
@@ -17,52 +25,78 @@ def _color_from_string(text: str) -> Tuple[int, int, int]:
         int(hash_hex[4:6], 16),
     )
 
-def _generate_random_filename() -> str:
-    return f"avatar_{secrets.token_hex(8)}.png"
+@lru_cache(maxsize=32)
+def _load_font(font_file: str, font_size: int) -> ImageFont.FreeTypeFont:
+    """Load a font once per (file, size) instead of on every render."""
+    return ImageFont.truetype(font_file, font_size)
 
-def generate_avatar(
-    initials: str,
-    size: int = 256,
-    bg_color: Optional[Tuple[int, int, int]] = None,
-    text_color: Tuple[int, int, int] = (255, 255, 255),
-    font_path: Optional[str] = None,
-    output_path: Optional[str] = None,
-    circular: bool = True,
-) -> str:
-    """
-    Generate avatar with:
-    - Solid background (custom or hashed)
-    - Centered initials
-    - Optional circular mask
-    - Auto-random filename if output_path not provided
-    """
+def _resolve_font_file(font_path: Optional[str]) -> str:
+    font_file = font_path if font_path and os.path.exists(font_path) else DEFAULT_FONT_PATH
+    if not os.path.exists(font_file):
+        raise FileNotFoundError(f"Font file not found: {font_file}")
+    return font_file
+
+def _normalise_initials(initials: str) -> str:
     initials = initials.strip().upper()
     if not initials:
         raise ValueError("Initials cannot be empty")
+    return initials
 
-    # Generate filename if not provided
-    output_dir = Path("media/avatars")
-    output_dir.mkdir(parents=True, exist_ok=True)
-
-    if output_path is None:
-        output_path = output_dir / _generate_random_filename()
-    else:
-        output_path = Path(output_path)
-
-    # Background color
+def _normalise_color(bg_color, initials: str) -> Tuple[int, int, int]:
     if bg_color is None:
-        bg_color = _color_from_string(initials)
+        return _color_from_string(initials)
     elif isinstance(bg_color, str):
         try:
-            bg_color = ImageColor.getcolor(bg_color, "RGB")
+            return ImageColor.getcolor(bg_color, "RGB")
         except ValueError:
             raise ValueError("Background color format not recognised")
     elif isinstance(bg_color, tuple):
         if len(bg_color) != 3 or not all(isinstance(c, int) for c in bg_color):
             raise ValueError("Background color tuple must be (R, G, B) integers")
+        return bg_color
     else:
         raise TypeError("Background color must be None, str, or (R, G, B) tuple")
 
+def _content_key(
+    initials: str,
+    bg_color: Tuple[int, int, int],
+    text_color: Tuple[int, int, int],
+    font_file: str,
+    circular: bool,
+) -> str:
+    """Key an avatar by a hash of everything that affects its pixels."""
+    shape = "circle" if circular else "square"
+    key = f"{initials}|{bg_color}|{text_color}|{shape}|{font_file}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:24]
+
+def avatar_key(
+    initials: str,
+    bg_color: Optional[Tuple[int, int, int]] = None,
+    text_color: Tuple[int, int, int] = (255, 255, 255),
+    font_path: Optional[str] = None,
+    circular: bool = True,
+) -> str:
+    """
+    Return the content key an avatar is stored under, without
+    rendering it. Identical avatars share one set of files.
+    """
+    initials = _normalise_initials(initials)
+    return _content_key(
+        initials,
+        _normalise_color(bg_color, initials),
+        text_color,
+        _resolve_font_file(font_path),
+        circular,
+    )
+
+def _render(
+    initials: str,
+    size: int,
+    bg_color: Tuple[int, int, int],
+    text_color: Tuple[int, int, int],
+    font_file: str,
+    circular: bool,
+) -> Image.Image:
     # Create image
     mode = "RGBA" if circular else "RGB"
     img = Image.new(mode, (size, size), (0, 0, 0, 0) if circular else bg_color)
@@ -74,13 +108,8 @@ def generate_avatar(
     else:
         draw.rectangle((0, 0, size, size), fill=bg_color)
 
-    # Load font: use provided font_path, or default Inter Bold
-    font_file = font_path if font_path and os.path.exists(font_path) else DEFAULT_FONT_PATH
-    if not os.path.exists(font_file):
-        raise FileNotFoundError(f"Font file not found: {font_file}")
-
     font_size = int(size * 0.5)
-    font = ImageFont.truetype(font_file, font_size)
+    font = _load_font(font_file, font_size)
 
     ascent, descent = font.getmetrics()
     bbox = font.getbbox(initials)
@@ -91,6 +120,62 @@ def generate_avatar(
     y = (size - text_height) / 2
 
     draw.text((x, y), initials, fill=text_color, font=font)
+    return img
+
+def generate_avatar(
+    initials: str,
+    bg_color: Optional[Tuple[int, int, int]] = None,
+    text_color: Tuple[int, int, int] = (255, 255, 255),
+    font_path: Optional[str] = None,
+    circular: bool = True,
+) -> str:
+    """
+    Generate avatar with:
+    - Solid background (custom or hashed)
+    - Centered initials
+    - Optional circular mask
+    - One image per size in settings.AVATAR_SIZES, saved to the
+      avatar storage under a content-addressed name. Sizes that
+      already exist are not rendered again.
+    Returns the avatar key.
+    """
+    initials = _normalise_initials(initials)
+    bg_color = _normalise_color(bg_color, initials)
+    font_file = _resolve_font_file(font_path)
+    key = _content_key(initials, bg_color, text_color, font_file, circular)
+
+    storage = get_avatar_storage()
+    for size_name, size in settings.AVATAR_SIZES.items():
+        name = avatar_name(key, size_name)
+        if storage.exists(name):
+            continue
+        save_avatar_image(name, _render(initials, size, bg_color, text_color, font_file, circular))
+    return key
+
+def queue_avatar(initials: str, bg_color=None) -> str:
+    """
+    Return the avatar key straight away and render it in a Celery
+    worker after commit. Queued even when an identical avatar exists:
+    the garbage collector can't see a row that hasn't committed, so
+    the file may be gone by then. Existing sizes aren't re-rendered.
+    """
+    from accounts.tasks import render_avatar
+
+    key = avatar_key(initials, bg_color=bg_color)
+    transaction.on_commit(lambda: render_avatar.delay(initials, bg_color))
+    return key
+
+# Fields set_generated_avatar changes, for save(update_fields=...)
+GENERATED_AVATAR_FIELDS = ["avatar_type", "avatar_key", "avatar_image", "avatar_color"]
 
-    img.save(output_path)
-    return output_path
+def set_generated_avatar(user, bg_color=None):
+    """ Point the user at a generated avatar, rendered in the background """
+    key = queue_avatar(initials=user.name[0], bg_color=bg_color)
+    # Avatars are shared between users with the same initials and
+    # color, so the old file is left in place
+    user.avatar_type = "generated"
+    user.avatar_key = key
+    user.avatar_image = avatar_image_path(key)
+    if bg_color:
+        user.avatar_color = bg_color
+    return key
@@ -0,0 +1,109 @@
+import hashlib
+import os
+import secrets
+import shutil
+from pathlib import Path
+from PIL import Image, ImageOps
+from django.conf import settings
+from django.core.files.uploadhandler import FileUploadHandler, StopUpload, SkipFile
+
+from .avatar_storage import avatar_name, save_avatar_image
+
+ALLOWED_FORMATS = {"JPEG", "PNG", "WEBP"}
+
+class AvatarUploadLimitHandler(FileUploadHandler):
+    """
+    Counts bytes as they stream in and stops the upload as soon as
+    it goes over the limit, before the rest of the body is read.
+    Put it in front of TemporaryFileUploadHandler so nothing is
+    buffered in memory.
+    """
+    def __init__(self, request=None, max_bytes=None):
+        super().__init__(request)
+        self.max_bytes = max_bytes or settings.AVATAR_UPLOAD_MAX_BYTES
+        self.received = 0
+        self.exceeded = False
+        self.rejected_type = False
+
+    def new_file(self, field_name, file_name, content_type, *args, **kwargs):
+        if not (content_type or "").startswith("image/"):
+            self.rejected_type = True
+            raise SkipFile()
+        super().new_file(field_name, file_name, content_type, *args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > self.max_bytes:
+            self.exceeded = True
+            raise StopUpload(connection_reset=True)
+        return raw_data
+
+    def file_complete(self, file_size):
+        return None
+
+def check_avatar_upload(path):
+    """
+    Validate an uploaded image from its header only, without decoding
+    the pixel data. Raises ValueError with a user facing message.
+    """
+    max_dimension = settings.AVATAR_UPLOAD_MAX_DIMENSION
+    try:
+        with Image.open(path) as img:
+            if img.format not in ALLOWED_FORMATS:
+                raise ValueError("Avatar must be a JPEG, PNG or WEBP image")
+            width, height = img.size
+    except (OSError, Image.DecompressionBombError):
+        raise ValueError("Avatar is not a valid image")
+
+    if width > max_dimension or height > max_dimension:
+        raise ValueError(f"Avatar must be at most {max_dimension}x{max_dimension} pixels")
+
+def stage_avatar_upload(uploaded_file):
+    """
+    Move an uploaded temporary file to the shared staging directory,
+    where a worker picks it up. Returns the staged path.
+    """
+    staging = Path(settings.AVATAR_UPLOAD_DIR)
+    staging.mkdir(parents=True, exist_ok=True)
+    path = staging / f"upload_{secrets.token_hex(16)}"
+    shutil.move(uploaded_file.temporary_file_path(), path)
+    return str(path)
+
+def _file_key(path, chunk_size=64 * 1024):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:24]
+
+def process_avatar_upload(path):
+    """
+    Produce every size in settings.AVATAR_SIZES from an uploaded image.
+    JPEGs are decoded at reduced resolution with draft(), so a large
+    photo never gets decoded at full size.
+    Returns the avatar key.
+    """
+    key = _file_key(path)
+    largest = max(settings.AVATAR_SIZES.values())
+
+    with Image.open(path) as img:
+        img.draft("RGB", (largest, largest))
+        img = ImageOps.exif_transpose(img)
+
+        # Center crop to a square
+        side = min(img.size)
+        left = (img.width - side) // 2
+        top = (img.height - side) // 2
+        img = img.crop((left, top, left + side, top + side))
+        img = img.convert("RGBA" if "A" in img.getbands() else "RGB")
+
+        for size_name, size in sorted(settings.AVATAR_SIZES.items(), key=lambda item: -item[1]):
+            img.thumbnail((size, size), Image.Resampling.LANCZOS)
+            save_avatar_image(avatar_name(key, size_name), img)
+    return key
+
+def discard_staged_upload(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,52 @@
+import asyncio
+import os
+import time
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.hashers import check_password, make_password
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from chores import hashing
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure login password checks per second, hashing in the sync "
+        "thread pool vs the hashing process pool at increasing sizes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=64)
+        parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+
+    def handle(self, *args, **options):
+        encoded = make_password("benchmark-password")
+        total = options["requests"]
+
+        # Baseline: sync views under ASGI share one thread for their work
+        rate = asyncio.run(self._run(
+            total, lambda: sync_to_async(check_password)("benchmark-password", encoded)
+        ))
+        self.stdout.write(f"thread pool:      {rate:8.1f} logins/s")
+
+        workers = 1
+        while workers <= options["max_workers"]:
+            with override_settings(PASSWORD_HASHING_WORKERS=workers):
+                # Warm up so worker start-up isn't measured
+                asyncio.run(self._run(
+                    workers, lambda: hashing.acheck_password("benchmark-password", encoded)
+                ))
+                rate = asyncio.run(self._run(
+                    total, lambda: hashing.acheck_password("benchmark-password", encoded)
+                ))
+                hashing._pool.shutdown()
+                hashing._pool = None
+            self.stdout.write(f"{workers:3d} worker(s):    {rate:8.1f} logins/s")
+            workers *= 2
+
+    async def _run(self, total, check):
+        start = time.perf_counter()
+        results = await asyncio.gather(*(check() for _ in range(total)))
+        assert all(results)
+        return total / (time.perf_counter() - start)
@@ -1,12 +1,16 @@
 import hashlib
 import secrets
-from datetime import timedelta
+from datetime import timedelta, time
 from django.utils import timezone
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin, BaseUserManager
 from django.db import models
 
 
-class PasswordResetToken(models.Model):
+class HashedToken(models.Model):
+    """
+    Single-use token emailed to a user. Only the SHA-256 of the raw
+    token is stored, under a unique index.
+    """
     user = models.ForeignKey("User", on_delete=models.CASCADE)
     token_hash = models.CharField(max_length=64, unique=True, db_index=True)
 
@@ -14,16 +18,18 @@ class PasswordResetToken(models.Model):
     expires_at = models.DateTimeField()
     used_at = models.DateTimeField(null=True, blank=True)
 
+    expiry_minutes = 60
+
     class Meta:
+        abstract = True
         indexes = [
-            models.Index(fields=["token_hash"]),
             models.Index(fields=["expires_at"]),
         ]
 
     @classmethod
-    def create_token(cls, user, expiry_minutes=60):
+    def create_token(cls, user, expiry_minutes=None):
         """
-        Creates a reset token and returns the RAW token.
+        Creates a token and returns the RAW token.
         The raw token should be emailed to the user.
         """
 
@@ -33,10 +39,10 @@ class PasswordResetToken(models.Model):
         raw_token = secrets.token_urlsafe(32)
         token_hash = cls.hash_token(raw_token)
 
-        instance = cls.objects.create(
+        cls.objects.create(
             user=user,
             token_hash=token_hash,
-            expires_at=timezone.now() + timedelta(minutes=expiry_minutes),
+            expires_at=timezone.now() + timedelta(minutes=expiry_minutes or cls.expiry_minutes),
         )
 
         return raw_token
@@ -57,8 +63,30 @@ class PasswordResetToken(models.Model):
         self.used_at = timezone.now()
         self.save(update_fields=["used_at"])
 
+    @classmethod
+    def purge(cls, batch_size, now=None):
+        """
+        Deletes expired and used tokens in chunks of batch_size,
+        so no single statement holds locks on a large range.
+        Returns the number of rows deleted.
+        """
+        now = now or timezone.now()
+        stale = cls.objects.filter(models.Q(expires_at__lte=now) | models.Q(used_at__isnull=False))
+        deleted = 0
+        while True:
+            ids = list(stale.values_list("id", flat=True)[:batch_size])
+            if not ids:
+                return deleted
+            deleted += cls.objects.filter(id__in=ids).delete()[0]
+
     def __str__(self):
-        return f"PasswordResetToken(user={self.user_id}, expires_at={self.expires_at})"
+        return f"{type(self).__name__}(user={self.user_id}, expires_at={self.expires_at})"
+
+class PasswordResetToken(HashedToken):
+    expiry_minutes = 60
+
+class EmailVerificationToken(HashedToken):
+    expiry_minutes = 60 * 24
 
 class CustomUserManager(BaseUserManager):
     def create_user(self, email, password=None, **extra_fields):
@@ -95,21 +123,37 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     avatar_color = models.CharField(max_length=7, default="#888888")
     avatar_image = models.CharField(max_length=255, null=True, blank=True)
+    avatar_key = models.CharField(max_length=64, null=True, blank=True)
 
     is_guest = models.BooleanField(default=False)
     device_id = models.CharField(max_length=255, null=True, blank=True, unique=True)
     is_verified = models.BooleanField(default=False)
-    verification_token = models.CharField(max_length=64, null=True, blank=True)
     verification_sent_at = models.DateTimeField(null=True, blank=True)
 
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)
+    # Included in issued tokens; bumping it revokes all of them
+    auth_version = models.PositiveIntegerField(default=0)
+
+    # Notification preferences
+    timezone = models.CharField(max_length=64, default="UTC")
+    digest_enabled = models.BooleanField(default=False)
+    digest_time = models.TimeField(default=time(8, 0))
+    digest_last_sent_on = models.DateField(null=True, blank=True)
+    quiet_hours_start = models.TimeField(null=True, blank=True)
+    quiet_hours_end = models.TimeField(null=True, blank=True)
 
     objects = CustomUserManager()
 
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = ["name"]
 
+    def bump_auth_version(self):
+        """
+        Revokes every token issued to this user. Takes effect on save().
+        """
+        self.auth_version += 1
+
     def __str__(self):
         return self.email
 
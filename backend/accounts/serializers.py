@@ -1,8 +1,9 @@
-import secrets
+from zoneinfo import available_timezones
 from rest_framework import serializers
 from django.utils import timezone
-from .models import User
+from .models import User, EmailVerificationToken
 from .helpers.email import send_verification_email
+from .helpers.avatar_storage import avatar_urls
 
 class RegisterSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, required=True)
@@ -13,13 +14,17 @@ class RegisterSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         password = validated_data.pop("password")
+        # Async views hash off the event loop and pass the result in
+        password_hash = validated_data.pop("password_hash", None)
         user = User(**validated_data)
         user.is_verified = False
-        token = secrets.token_urlsafe(32)
-        user.verification_token = token
         user.verification_sent_at = timezone.now()
-        user.set_password(password)
+        if password_hash:
+            user.password = password_hash
+        else:
+            user.set_password(password)
         user.save()
+        token = EmailVerificationToken.create_token(user)
         send_verification_email(user.email, token)
         return user
 
@@ -28,6 +33,8 @@ class GuestSerializer(serializers.Serializer):
     name = serializers.CharField(max_length=150)
 
 class UserSerializer(serializers.ModelSerializer):
+    avatar_urls = serializers.SerializerMethodField()
+
     class Meta:
         model = User
         fields = [
@@ -37,9 +44,34 @@ class UserSerializer(serializers.ModelSerializer):
             "avatar_type",
             "avatar_color",
             "avatar_image",
+            "avatar_urls",
             "is_guest",
             "device_id",
             "is_active",
             "is_staff",
             "is_verified",
+            "timezone",
+            "digest_enabled",
+            "digest_time",
+            "quiet_hours_start",
+            "quiet_hours_end",
+        ]
+
+    def get_avatar_urls(self, obj):
+        return avatar_urls(obj.avatar_key)
+
+class NotificationPreferencesSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = User
+        fields = [
+            "timezone",
+            "digest_enabled",
+            "digest_time",
+            "quiet_hours_start",
+            "quiet_hours_end",
         ]
+
+    def validate_timezone(self, value):
+        if value not in available_timezones():
+            raise serializers.ValidationError("Unknown timezone")
+        return value
@@ -1,14 +1,16 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from .models import User
-from .helpers.generate_avatar import generate_avatar
+from .authentication import invalidate_cached_user
+from .helpers.generate_avatar import set_generated_avatar
 
-# TEMP: Needs to be updated to use all the avatar_* fields
 @receiver(post_save, sender=User)
 def create_avatar(sender, instance, created, **kwargs):
     if created and not instance.avatar_image:
-        path = generate_avatar(
-            initials=f"{instance.name[0]}".upper(),
-        )
-        instance.avatar_image = path
-        instance.save(update_fields=["avatar_image"])
+        set_generated_avatar(instance)
+        instance.save(update_fields=["avatar_type", "avatar_key", "avatar_image"])
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_cache(sender, instance, **kwargs):
+    invalidate_cached_user(instance.pk)
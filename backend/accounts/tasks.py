@@ -0,0 +1,111 @@
+from smtplib import SMTPException
+from celery import shared_task
+from celery.utils.time import get_exponential_backoff_interval
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from .models import User, PasswordResetToken, EmailVerificationToken
+from .helpers.generate_avatar import generate_avatar
+from .helpers.avatar_storage import avatar_image_path, collect_orphaned_avatars
+from .helpers.upload import discard_staged_upload, process_avatar_upload
+
+# One SMTP connection per worker process, reused across tasks
+_connection = None
+_connection_backend = None
+
+def get_persistent_connection():
+    """
+    Return an open mail connection, reusing the one held by this worker.
+    Stale SMTP connections are detected with NOOP and reopened.
+    """
+    global _connection, _connection_backend
+    if _connection is None or _connection_backend != settings.EMAIL_BACKEND:
+        close_persistent_connection()
+        _connection = get_connection(fail_silently=False)
+        _connection_backend = settings.EMAIL_BACKEND
+
+    smtp = getattr(_connection, "connection", None)
+    if smtp is not None:
+        try:
+            smtp.noop()
+        except (SMTPException, OSError):
+            _connection.close()
+    _connection.open()
+    return _connection
+
+def close_persistent_connection():
+    global _connection
+    if _connection is not None:
+        try:
+            _connection.close()
+        except (SMTPException, OSError):
+            pass
+    _connection = None
+
+@shared_task(bind=True, max_retries=5)
+def send_emails(self, messages):
+    """
+    Send emails over the worker's persistent connection.
+    messages = [{"subject": ..., "body": ..., "to": [...]}, ...]
+
+    On an SMTP or socket error only the messages that weren't delivered
+    are retried, with exponential backoff and jitter.
+    """
+    sent = 0
+    try:
+        connection = get_persistent_connection()
+        for message in messages:
+            connection.send_messages([EmailMessage(
+                subject=message["subject"],
+                body=message["body"],
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                to=message["to"],
+                connection=connection,
+            )])
+            sent += 1
+    except (SMTPException, OSError) as exc:
+        # Drop the broken connection so the retry reconnects
+        close_persistent_connection()
+        countdown = get_exponential_backoff_interval(
+            factor=1, retries=self.request.retries, maximum=600, full_jitter=True,
+        )
+        raise self.retry(args=[messages[sent:]], exc=exc, countdown=countdown)
+    return sent
+
+@shared_task
+def render_avatar(initials, bg_color=None):
+    # Tuples arrive as lists after JSON serialisation
+    if isinstance(bg_color, list):
+        bg_color = tuple(bg_color)
+    return generate_avatar(initials=initials, bg_color=bg_color)
+
+@shared_task
+def collect_orphaned_avatars_task():
+    report = collect_orphaned_avatars()
+    print(
+        f"Avatar GC: scanned {report['scanned']}, deleted {report['deleted']}, "
+        f"reclaimed {report['reclaimed_bytes']} bytes"
+    )
+    return report
+
+@shared_task
+def purge_expired_tokens():
+    batch_size = settings.TOKEN_PURGE_BATCH_SIZE
+    for model in (PasswordResetToken, EmailVerificationToken):
+        deleted = model.purge(batch_size)
+        print(f"Purged {deleted} {model.__name__} rows")
+
+@shared_task
+def process_avatar_upload_task(user_id, path):
+    try:
+        key = process_avatar_upload(path)
+    finally:
+        discard_staged_upload(path)
+
+    user = User.objects.filter(id=user_id).first()
+    if user is None:
+        return None
+    user.avatar_type = "uploaded"
+    user.avatar_key = key
+    user.avatar_image = avatar_image_path(key)
+    user.save(update_fields=["avatar_type", "avatar_key", "avatar_image"])
+    return key
@@ -0,0 +1,80 @@
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from api.models import House
+from chores import hashing
+
+User = get_user_model()
+
+
+@override_settings(PASSWORD_HASHING_WORKERS=1)
+class HashingPoolTests(TestCase):
+    def tearDown(self):
+        if hashing._pool is not None:
+            hashing._pool.shutdown()
+            hashing._pool = None
+
+    def test_hashes_in_worker_process(self):
+        encoded = async_to_sync(hashing.amake_password)("secret-pass")
+        self.assertTrue(async_to_sync(hashing.acheck_password)("secret-pass", encoded))
+        self.assertFalse(async_to_sync(hashing.acheck_password)("wrong", encoded))
+        self.assertIsNotNone(hashing._pool)
+
+
+@override_settings(PASSWORD_HASHING_WORKERS=0, RATE_LIMIT_ENABLED=False)
+class AsyncAuthViewTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="user@example.com", name="user", password="Password123!"
+        )
+
+    def test_login(self):
+        url = reverse("login")
+        response = self.client.post(url, {"email": self.user.email, "password": "Password123!"})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("access_token", response.data)
+
+        response = self.client.post(url, {"email": self.user.email, "password": "wrong"})
+        self.assertEqual(response.status_code, 401)
+        response = self.client.post(url, {"email": "nobody@example.com", "password": "wrong"})
+        self.assertEqual(response.status_code, 401)
+
+    def test_register(self):
+        response = self.client.post(
+            reverse("register"),
+            {"email": "new@example.com", "name": "new", "password": "Password123!"},
+        )
+        self.assertEqual(response.status_code, 200)
+        user = User.objects.get(email="new@example.com")
+        self.assertTrue(user.check_password("Password123!"))
+
+    def test_change_password(self):
+        self.client.force_authenticate(user=self.user)
+        url = reverse("change-password")
+        response = self.client.put(
+            url, {"current_password": "wrong", "new_password": "NewPassword123!"}
+        )
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.put(
+            url, {"current_password": "Password123!", "new_password": "NewPassword123!"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password("NewPassword123!"))
+
+    def test_join_house(self):
+        house = House.objects.create(name="house", max_members=6, password=make_password("house-pw"))
+        self.client.force_authenticate(user=self.user)
+        url = reverse("house-join")
+
+        response = self.client.post(url, {"join_code": house.join_code, "password": "wrong"})
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post(url, {"join_code": house.join_code, "password": "house-pw"})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(house.memberships.filter(user=self.user).exists())
@@ -0,0 +1,79 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APIRequestFactory, APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.authentication import CachedJWTAuthentication
+from accounts.tokens import issue_tokens
+
+User = get_user_model()
+
+
+@override_settings(PASSWORD_HASHING_WORKERS=0, RATE_LIMIT_ENABLED=False)
+class CachedJWTAuthenticationTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email="user@example.com", name="user", password="Password123!"
+        )
+        self.tokens = issue_tokens(self.user)
+
+    def _authenticate(self, access_token):
+        request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {access_token}")
+        return CachedJWTAuthentication().authenticate(request)
+
+    def _get_user(self, access_token):
+        return self.client.get(reverse("user"), HTTP_AUTHORIZATION=f"Bearer {access_token}")
+
+    def test_cached_request_makes_no_queries(self):
+        user, _ = self._authenticate(self.tokens["access_token"])
+        self.assertEqual(user, self.user)
+        with self.assertNumQueries(0):
+            user, _ = self._authenticate(self.tokens["access_token"])
+        self.assertEqual(user, self.user)
+
+    def test_tokens_without_version_claim_still_work(self):
+        legacy = RefreshToken.for_user(self.user)
+        self.assertEqual(self._get_user(str(legacy.access_token)).status_code, 200)
+
+    def test_password_change_revokes_other_tokens(self):
+        other_session = issue_tokens(self.user)
+        self.assertEqual(self._get_user(other_session["access_token"]).status_code, 200)
+
+        response = self.client.put(
+            reverse("change-password"),
+            {"current_password": "Password123!", "new_password": "NewPassword123!"},
+            HTTP_AUTHORIZATION=f"Bearer {self.tokens['access_token']}",
+        )
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(self._get_user(other_session["access_token"]).status_code, 401)
+        self.assertEqual(self._get_user(response.data["access_token"]).status_code, 200)
+
+        response = self.client.post(
+            reverse("refresh"), {"refresh_token": other_session["refresh_token"]}
+        )
+        self.assertEqual(response.status_code, 401)
+
+    def test_deactivation_takes_effect_immediately(self):
+        self.assertEqual(self._get_user(self.tokens["access_token"]).status_code, 200)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self._get_user(self.tokens["access_token"]).status_code, 401)
+
+    def test_stale_cached_user_does_not_overwrite(self):
+        self._authenticate(self.tokens["access_token"])
+        # A write that skips post_save, like the digest sender's update()
+        User.objects.filter(pk=self.user.pk).update(digest_last_sent_on="2026-02-01")
+
+        response = self.client.put(
+            reverse("user"),
+            {"name": "renamed"},
+            HTTP_AUTHORIZATION=f"Bearer {self.tokens['access_token']}",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.name, "renamed")
+        self.assertEqual(str(self.user.digest_last_sent_on), "2026-02-01")
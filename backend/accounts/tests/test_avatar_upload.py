@@ -0,0 +1,73 @@
+import tempfile
+from io import BytesIO
+from pathlib import Path
+from unittest.mock import patch
+from PIL import Image
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from accounts.models import User
+from accounts.tasks import process_avatar_upload_task
+
+
+def make_image(size, fmt="JPEG"):
+    buffer = BytesIO()
+    Image.new("RGB", size, (200, 10, 10)).save(buffer, format=fmt)
+    return SimpleUploadedFile(f"avatar.{fmt.lower()}", buffer.getvalue(), content_type=f"image/{fmt.lower()}")
+
+
+class UploadAvatarTests(APITestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        storages = {
+            **settings.STORAGES,
+            "avatars": {
+                "BACKEND": "django.core.files.storage.FileSystemStorage",
+                "OPTIONS": {"location": self.tmpdir.name, "base_url": "/media/avatars/"},
+            },
+        }
+        override = override_settings(
+            STORAGES=storages,
+            AVATAR_UPLOAD_DIR=Path(self.tmpdir.name) / "uploads",
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.user = User.objects.create(email="u@example.com", name="U", avatar_image="x")
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("upload-avatar")
+
+    @patch("accounts.views.process_avatar_upload_task.delay")
+    def test_upload_processed_in_worker(self, mock_delay):
+        mock_delay.side_effect = process_avatar_upload_task
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(self.url, {"avatar": make_image((1200, 800))}, format="multipart")
+        self.assertEqual(response.status_code, 202)
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.avatar_type, "uploaded")
+        for size in settings.AVATAR_SIZES.values():
+            path = Path(self.tmpdir.name) / f"avatar_{self.user.avatar_key}_{size}.png"
+            with Image.open(path) as img:
+                self.assertEqual(img.size, (size, size))
+        # Staged upload is removed once processed
+        self.assertEqual(list((Path(self.tmpdir.name) / "uploads").iterdir()), [])
+
+    @override_settings(AVATAR_UPLOAD_MAX_BYTES=1024)
+    def test_too_large_rejected(self):
+        response = self.client.post(self.url, {"avatar": make_image((800, 800), "PNG")}, format="multipart")
+        self.assertEqual(response.status_code, 413)
+
+    @override_settings(AVATAR_UPLOAD_MAX_DIMENSION=100)
+    def test_dimensions_rejected(self):
+        response = self.client.post(self.url, {"avatar": make_image((200, 50))}, format="multipart")
+        self.assertEqual(response.status_code, 400)
+
+    def test_non_image_rejected(self):
+        upload = SimpleUploadedFile("avatar.txt", b"hello", content_type="text/plain")
+        response = self.client.post(self.url, {"avatar": upload}, format="multipart")
+        self.assertEqual(response.status_code, 400)
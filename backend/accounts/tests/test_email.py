@@ -0,0 +1,118 @@
+import socket
+from email import message_from_bytes
+from smtplib import SMTPServerDisconnected
+from unittest import skipUnless
+from unittest.mock import patch
+from celery.exceptions import Retry
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.test import TestCase, override_settings
+
+from accounts.helpers.email import send_verification_email, send_password_reset_email
+from accounts import tasks
+
+try:
+    from aiosmtpd.controller import Controller
+except ImportError:
+    Controller = None
+
+
+@override_settings(EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend")
+class QueuedEmailTests(TestCase):
+    def tearDown(self):
+        tasks.close_persistent_connection()
+
+    @patch("accounts.helpers.email.send_emails.delay")
+    def test_queued_on_commit(self, mock_delay):
+        with self.captureOnCommitCallbacks() as callbacks:
+            send_verification_email("user@example.com", "token")
+        mock_delay.assert_not_called()
+
+        for callback in callbacks:
+            callback()
+        messages = mock_delay.call_args.args[0]
+        self.assertEqual(messages[0]["to"], ["user@example.com"])
+        self.assertIn("token=token", messages[0]["body"])
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_send_emails_batch(self):
+        sent = tasks.send_emails([
+            {"subject": "one", "body": "body", "to": ["a@example.com"]},
+            {"subject": "two", "body": "body", "to": ["b@example.com"]},
+        ])
+        self.assertEqual(sent, 2)
+        self.assertEqual([m.subject for m in mail.outbox], ["one", "two"])
+
+    def test_connection_reused(self):
+        first = tasks.get_persistent_connection()
+        tasks.send_emails([{"subject": "one", "body": "body", "to": ["a@example.com"]}])
+        self.assertIs(tasks.get_persistent_connection(), first)
+
+    @patch("accounts.helpers.email.send_emails.delay")
+    def test_password_reset_queued(self, mock_delay):
+        with self.captureOnCommitCallbacks(execute=True):
+            send_password_reset_email("user@example.com", "token")
+        self.assertEqual(mock_delay.call_count, 1)
+
+    @patch.object(tasks.send_emails, "retry", side_effect=Retry)
+    def test_retries_only_undelivered(self, mock_retry):
+        messages = [
+            {"subject": subject, "body": "body", "to": ["a@example.com"]}
+            for subject in ("one", "two", "three")
+        ]
+        with patch.object(EmailBackend, "send_messages", side_effect=[1, SMTPServerDisconnected()]):
+            with self.assertRaises(Retry):
+                tasks.send_emails(messages)
+        self.assertEqual(mock_retry.call_args.kwargs["args"], [messages[1:]])
+
+
+class Inbox:
+    def __init__(self):
+        self.subjects = []
+
+    async def handle_DATA(self, server, session, envelope):
+        self.subjects.append(message_from_bytes(envelope.content)["Subject"])
+        return "250 OK"
+
+
+@skipUnless(Controller, "aiosmtpd is not installed")
+class SMTPServerTests(TestCase):
+    def setUp(self):
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        self.inbox = Inbox()
+        self.server = Controller(self.inbox, hostname="127.0.0.1", port=port)
+        self.server.start()
+        self.addCleanup(self.server.stop)
+
+        settings = override_settings(
+            EMAIL_BACKEND="django.core.mail.backends.smtp.EmailBackend",
+            EMAIL_HOST="127.0.0.1",
+            EMAIL_PORT=port,
+            EMAIL_USE_TLS=False,
+            EMAIL_HOST_USER="",
+            EMAIL_HOST_PASSWORD="",
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.addCleanup(tasks.close_persistent_connection)
+
+    def _send(self, subject):
+        return tasks.send_emails([{"subject": subject, "body": "body", "to": ["a@example.com"]}])
+
+    def test_connection_kept_alive(self):
+        self._send("one")
+        smtp = tasks.get_persistent_connection().connection
+        self._send("two")
+        self.assertIs(tasks.get_persistent_connection().connection, smtp)
+        self.assertEqual(self.inbox.subjects, ["one", "two"])
+
+    def test_reconnects_after_drop(self):
+        self._send("one")
+        smtp = tasks.get_persistent_connection().connection
+        smtp.sock.close()
+        # NOOP fails on the dead socket and a new connection is opened
+        self.assertEqual(self._send("two"), 1)
+        self.assertIsNot(tasks.get_persistent_connection().connection, smtp)
+        self.assertEqual(self.inbox.subjects, ["one", "two"])
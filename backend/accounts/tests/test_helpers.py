@@ -1,5 +1,16 @@
-from django.test import TestCase
+import os
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+from unittest.mock import patch
+from django.conf import settings
+from django.test import TestCase, override_settings
 from accounts.helpers.validate_password import validate_password
+from accounts.helpers import avatar_storage, generate_avatar as avatars
+from accounts.helpers.avatar_storage import avatar_urls, collect_orphaned_avatars
+from accounts.models import User
+from accounts.tasks import render_avatar
 
 
 class ValidatePasswordTests(TestCase):
@@ -41,3 +52,125 @@ class ValidatePasswordTests(TestCase):
         with self.assertRaises(ValueError) as cm:
             validate_password("Abc1234")
         self.assertIn("special character", str(cm.exception))
+
+
+class GenerateAvatarTests(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        storages = {
+            **settings.STORAGES,
+            "avatars": {
+                "BACKEND": "django.core.files.storage.FileSystemStorage",
+                "OPTIONS": {"location": self.tmpdir.name, "base_url": "/media/avatars/"},
+            },
+        }
+        override = override_settings(STORAGES=storages)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def _files(self):
+        return sorted(p.name for p in Path(self.tmpdir.name).iterdir())
+
+    def test_identical_avatars_share_files(self):
+        first = avatars.generate_avatar("a", bg_color="#aabbcc")
+        second = avatars.generate_avatar("A", bg_color=(0xaa, 0xbb, 0xcc))
+        self.assertEqual(first, second)
+        self.assertEqual(len(self._files()), len(settings.AVATAR_SIZES))
+
+    def test_every_size_rendered(self):
+        key = avatars.generate_avatar("B", bg_color="#112233")
+        self.assertEqual(key, avatars.avatar_key("B", bg_color="#112233"))
+        self.assertEqual(
+            self._files(),
+            sorted(f"avatar_{key}_{size}.png" for size in settings.AVATAR_SIZES.values()),
+        )
+
+    def test_different_inputs_differ(self):
+        self.assertNotEqual(
+            avatars.avatar_key("C", bg_color="#112233"),
+            avatars.avatar_key("C", bg_color="#112234"),
+        )
+        self.assertNotEqual(
+            avatars.avatar_key("C", circular=True),
+            avatars.avatar_key("C", circular=False),
+        )
+
+    def test_existing_avatar_not_rerendered(self):
+        avatars.generate_avatar("D")
+        with patch.object(avatars.Image, "new") as mock_new:
+            avatars.generate_avatar("D")
+        mock_new.assert_not_called()
+
+    def test_font_loaded_once_per_size(self):
+        avatars._load_font.cache_clear()
+        avatars.generate_avatar("E", bg_color="#000001")
+        avatars.generate_avatar("E", bg_color="#000002")
+        info = avatars._load_font.cache_info()
+        self.assertEqual(info.misses, len(settings.AVATAR_SIZES))
+        self.assertEqual(info.hits, len(settings.AVATAR_SIZES))
+
+    def test_served_with_immutable_caching(self):
+        key = avatars.generate_avatar("F")
+        url = avatar_urls(key)["small"]
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("immutable", response["Cache-Control"])
+
+        cached = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(cached.status_code, 304)
+
+    def test_unknown_avatar_404(self):
+        self.assertEqual(self.client.get("/media/avatars/avatar_00_64.png").status_code, 404)
+        self.assertEqual(self.client.get("/media/avatars/..%2Fsecret.png").status_code, 404)
+
+    def _age(self, days):
+        old = time.time() - days * 24 * 60 * 60
+        for path in Path(self.tmpdir.name).iterdir():
+            os.utime(path, (old, old))
+
+    def test_gc_deletes_only_old_orphans(self):
+        kept = avatars.generate_avatar("G")
+        User.objects.create(email="g@example.com", name="G", avatar_key=kept, avatar_image="x")
+        orphan = avatars.generate_avatar("H")
+
+        report = collect_orphaned_avatars(grace=timedelta(hours=1))
+        self.assertEqual(report["deleted"], 0)
+
+        self._age(days=2)
+        report = collect_orphaned_avatars(grace=timedelta(hours=1), batch_size=1)
+        self.assertEqual(report["deleted"], len(settings.AVATAR_SIZES))
+        self.assertGreater(report["reclaimed_bytes"], 0)
+        self.assertTrue(all(kept in name for name in self._files()))
+        self.assertFalse(any(orphan in name for name in self._files()))
+
+    def test_gc_during_uncommitted_adoption(self):
+        key = avatars.generate_avatar("K")
+        self._age(days=2)
+        user = User(email="k@example.com", name="K")
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.assertEqual(avatars.set_generated_avatar(user), key)
+        # The adopting row isn't visible yet, so the files look orphaned
+        collect_orphaned_avatars(grace=timedelta(hours=1))
+        self.assertEqual(self._files(), [])
+
+        with patch("accounts.tasks.render_avatar.delay", side_effect=render_avatar):
+            for callback in callbacks:
+                callback()
+        self.assertTrue(avatar_storage.avatar_exists(key))
+
+    def test_gc_keeps_key_adopted_mid_scan(self):
+        orphan = avatars.generate_avatar("J")
+        self._age(days=2)
+        snapshot = avatar_storage._referenced_avatars
+
+        def adopt_after_snapshot():
+            referenced = snapshot()
+            # Generating an existing avatar doesn't touch its files
+            User.objects.create(email="j@example.com", name="J", avatar_key=orphan, avatar_image="x")
+            return referenced
+
+        with patch.object(avatar_storage, "_referenced_avatars", adopt_after_snapshot):
+            report = collect_orphaned_avatars(grace=timedelta(hours=1))
+        self.assertEqual(report["deleted"], 0)
+        self.assertTrue(all(orphan in name for name in self._files()))
@@ -0,0 +1,62 @@
+from unittest import skipUnless
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from redis.exceptions import RedisError
+from rest_framework.test import APITestCase
+
+from accounts.tokens import issue_tokens
+from chores.redis_client import get_redis
+
+User = get_user_model()
+
+
+def redis_available():
+    try:
+        return get_redis().ping()
+    except RedisError:
+        return False
+
+
+@skipUnless(redis_available(), "Redis is not available")
+class RefreshRotationTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="user@example.com", name="user", password="Password123!"
+        )
+        self.tokens = issue_tokens(self.user)
+
+    def _refresh(self, refresh_token):
+        return self.client.post(reverse("refresh"), {"refresh_token": refresh_token})
+
+    def test_refresh_rotates_and_revokes_old_token(self):
+        response = self._refresh(self.tokens["refresh_token"])
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.data["refresh_token"], self.tokens["refresh_token"])
+
+        # The old token can't be used again, the new one can
+        self.assertEqual(self._refresh(self.tokens["refresh_token"]).status_code, 401)
+        self.assertEqual(self._refresh(response.data["refresh_token"]).status_code, 200)
+
+    def test_revocation_expires_with_token(self):
+        self._refresh(self.tokens["refresh_token"])
+        keys = get_redis().keys("auth:revoked:*")
+        self.assertTrue(keys)
+        self.assertTrue(all(get_redis().ttl(key) > 0 for key in keys))
+
+    def test_logout(self):
+        response = self.client.post(reverse("logout"), {"refresh_token": self.tokens["refresh_token"]})
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self._refresh(self.tokens["refresh_token"]).status_code, 401)
+
+    def test_logout_all(self):
+        other_device = issue_tokens(self.user)
+        response = self.client.post(
+            reverse("logout-all"),
+            HTTP_AUTHORIZATION=f"Bearer {self.tokens['access_token']}",
+        )
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self._refresh(other_device["refresh_token"]).status_code, 401)
+        response = self.client.get(
+            reverse("user"), HTTP_AUTHORIZATION=f"Bearer {other_device['access_token']}"
+        )
+        self.assertEqual(response.status_code, 401)
@@ -0,0 +1,77 @@
+import uuid
+from unittest import skipUnless
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from redis.exceptions import RedisError
+from rest_framework.parsers import JSONParser
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from chores.redis_client import get_redis
+from chores.throttling import TokenBucketThrottle, parse_rate, take_tokens
+
+
+def redis_available():
+    try:
+        return get_redis().ping()
+    except RedisError:
+        return False
+
+
+class ParseRateTests(TestCase):
+    def test_parse_rate(self):
+        self.assertEqual(parse_rate("5/min"), (5, 60))
+        self.assertEqual(parse_rate("10/hour"), (10, 3600))
+
+
+class IdentityTests(TestCase):
+    def _identity(self, kind, data=None, **headers):
+        request = Request(
+            APIRequestFactory().post("/", data, format="json", **headers),
+            parsers=[JSONParser()],
+        )
+        return TokenBucketThrottle().get_identity(kind, request, None)
+
+    def test_forwarded_for_is_not_trusted(self):
+        spoofed = {self._identity("ip", HTTP_X_FORWARDED_FOR=f"10.0.0.{i}") for i in range(3)}
+        self.assertEqual(spoofed, {"127.0.0.1"})
+
+    @override_settings(REST_FRAMEWORK={"NUM_PROXIES": 1})
+    def test_client_address_from_proxy(self):
+        identity = self._identity("ip", HTTP_X_FORWARDED_FOR="10.0.0.1, 203.0.113.7")
+        self.assertEqual(identity, "203.0.113.7")
+
+    def test_non_object_body(self):
+        self.assertIsNone(self._identity("account", [{"email": "a@example.com"}]))
+        self.assertIsNone(self._identity("join_code", "ABC"))
+
+
+@skipUnless(redis_available(), "Redis is not available")
+class TokenBucketTests(TestCase):
+    def test_bucket_empties_then_rejects(self):
+        key = f"test:{uuid.uuid4()}"
+        for _ in range(3):
+            self.assertEqual(take_tokens([(key, "3/min")]), 0)
+        self.assertGreater(take_tokens([(key, "3/min")]), 0)
+
+    def test_all_buckets_must_admit(self):
+        tight = f"test:{uuid.uuid4()}"
+        loose = f"test:{uuid.uuid4()}"
+        self.assertEqual(take_tokens([(tight, "1/min"), (loose, "2/min")]), 0)
+        self.assertGreater(take_tokens([(tight, "1/min"), (loose, "2/min")]), 0)
+        # The rejected request didn't use up the loose bucket
+        self.assertEqual(take_tokens([(loose, "2/min")]), 0)
+
+
+@skipUnless(redis_available(), "Redis is not available")
+class LoginThrottleTests(APITestCase):
+    def test_login_rejected_before_hashing(self):
+        email = f"{uuid.uuid4()}@example.com"
+        limits = {"login": {"account": "2/min"}}
+        with override_settings(RATE_LIMITS=limits):
+            for _ in range(2):
+                response = self.client.post(reverse("login"), {"email": email, "password": "x"})
+                self.assertEqual(response.status_code, 401)
+            response = self.client.post(reverse("login"), {"email": email, "password": "x"})
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("Retry-After", response)
@@ -0,0 +1,62 @@
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import EmailVerificationToken, PasswordResetToken
+
+User = get_user_model()
+
+
+class EmailVerificationTokenTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="user@example.com", name="user", password="Password123!"
+        )
+
+    def test_only_hash_is_stored(self):
+        raw = EmailVerificationToken.create_token(self.user)
+        token = EmailVerificationToken.objects.get(user=self.user)
+        self.assertNotEqual(token.token_hash, raw)
+        self.assertEqual(token.token_hash, EmailVerificationToken.hash_token(raw))
+
+    def test_verify_is_single_use(self):
+        raw = EmailVerificationToken.create_token(self.user)
+        url = reverse("verify-email")
+
+        response = self.client.get(url, {"token": raw})
+        self.assertTemplateUsed(response, "verify_success.html")
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.is_verified)
+
+        response = self.client.get(url, {"token": raw})
+        self.assertTemplateUsed(response, "verify_failed.html")
+
+    def test_expired_token_rejected(self):
+        raw = EmailVerificationToken.create_token(self.user)
+        EmailVerificationToken.objects.update(expires_at=timezone.now() - timedelta(minutes=1))
+        response = self.client.get(reverse("verify-email"), {"token": raw})
+        self.assertTemplateUsed(response, "verify_failed.html")
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.is_verified)
+
+
+class PurgeTokensTests(TestCase):
+    def test_purge_removes_expired_and_used_in_chunks(self):
+        users = [
+            User.objects.create_user(email=f"user{i}@example.com", name=f"user{i}")
+            for i in range(5)
+        ]
+        for user in users:
+            PasswordResetToken.create_token(user)
+        PasswordResetToken.objects.filter(user__in=users[:2]).update(
+            expires_at=timezone.now() - timedelta(minutes=1)
+        )
+        PasswordResetToken.objects.filter(user=users[2]).update(used_at=timezone.now())
+
+        self.assertEqual(PasswordResetToken.purge(batch_size=2), 3)
+        self.assertEqual(
+            set(PasswordResetToken.objects.values_list("user_id", flat=True)),
+            {users[3].id, users[4].id},
+        )
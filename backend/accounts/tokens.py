@@ -0,0 +1,48 @@
+import time
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from chores.redis_client import get_redis
+from .authentication import AUTH_VERSION_CLAIM, resolve_token_user
+
+
+def issue_tokens(user):
+    """
+    Returns a new access/refresh token pair for user.
+    Both carry the user's auth version, so bumping it revokes them.
+    """
+    refresh = RefreshToken.for_user(user)
+    refresh[AUTH_VERSION_CLAIM] = user.auth_version
+    return {
+        "access_token": str(refresh.access_token),
+        "refresh_token": str(refresh),
+    }
+
+
+def revoked_key(jti):
+    return f"auth:revoked:{jti}"
+
+
+def revoke_refresh_token(refresh):
+    """
+    Adds the token's jti to the revocation list until the token expires.
+    Returns False if it was already revoked.
+    """
+    ttl = int(refresh["exp"] - time.time())
+    if ttl <= 0:
+        return False
+    return bool(get_redis().set(revoked_key(refresh["jti"]), 1, ex=ttl, nx=True))
+
+
+def rotate_refresh_token(raw_token):
+    """
+    Exchanges a refresh token for a new pair and revokes the old one.
+    SET NX makes the revocation the claim, so a token can only
+    be rotated once even by concurrent requests.
+    Raises TokenError or AuthenticationFailed for unusable tokens.
+    """
+    refresh = RefreshToken(raw_token)
+    user = resolve_token_user(refresh)
+    if not revoke_refresh_token(refresh):
+        raise TokenError("Token has been revoked")
+    return issue_tokens(user)
@@ -6,6 +6,8 @@ urlpatterns = [
     path("login/", views.LoginView.as_view(), name="login"),
     path("guest/", views.GuestView.as_view(), name="guest"),
     path("refresh/", views.RefreshTokenView.as_view(), name="refresh"),
+    path("logout/", views.LogoutView.as_view(), name="logout"),
+    path("logout-all/", views.LogoutAllView.as_view(), name="logout-all"),
     path("push-token/", views.SavePushTokenView.as_view(), name="push-token"),
     path("user/", views.UserView.as_view(), name="user"),
     path("verify-email/", views.VerifyEmailView.as_view(), name="verify-email"),
@@ -16,4 +18,5 @@ urlpatterns = [
     path("change-email/", views.ChangeEmailView.as_view(), name="change-email"),
     path("change-password/", views.UserChangePasswordView.as_view(), name="change-password"),
     path("generate-avatar/", views.GenerateAvatarView.as_view(), name="generate-avatar"),
+    path("upload-avatar/", views.UploadAvatarView.as_view(), name="upload-avatar"),
 ]
@@ -1,26 +1,44 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from django.contrib.auth import get_user_model, authenticate
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.db import transaction
+from django.http import FileResponse, Http404, HttpResponseNotModified
 from django.utils import timezone
 from django.shortcuts import render, redirect
+from django.views import View
 from django.core.exceptions import ValidationError
 from rest_framework_simplejwt.tokens import RefreshToken, TokenError
 from rest_framework.permissions import IsAuthenticated, AllowAny
-import secrets
-from pathlib import Path
-
-from .serializers import RegisterSerializer, UserSerializer
-from .models import PushToken, PasswordResetToken
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.parsers import MultiPartParser
+from asgiref.sync import sync_to_async
+from redis.exceptions import RedisError
+
+from .serializers import RegisterSerializer, UserSerializer, NotificationPreferencesSerializer
+from .models import PushToken, PasswordResetToken, EmailVerificationToken
+from .tokens import issue_tokens, revoke_refresh_token, rotate_refresh_token
+from .helpers.auth import aauthenticate_user
 from .helpers.email import send_verification_email, send_password_reset_email
-from .helpers.generate_avatar import generate_avatar
+from .helpers.generate_avatar import GENERATED_AVATAR_FIELDS, set_generated_avatar
+from .helpers.avatar_storage import AVATAR_NAME_RE, get_avatar_storage
 from .helpers.validate_password import validate_password
+from .helpers.upload import AvatarUploadLimitHandler, check_avatar_upload, stage_avatar_upload
+from .tasks import process_avatar_upload_task
+from chores.async_views import AsyncAPIView
+from chores.db_router import ReplicaReadMixin
+from chores.hashing import acheck_password, amake_password
+from chores.throttling import TokenBucketThrottle
 
 
 User = get_user_model()
 
 class ResetPasswordView(APIView):
     permission_classes = [AllowAny]
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = "reset_password"
 
     def get(self, request):
         token = request.GET.get("token")
@@ -51,6 +69,7 @@ class ResetPasswordView(APIView):
         # Reset password
         user = token_obj.user
         user.set_password(new_password)
+        user.bump_auth_version()
         user.save()
 
         # Mark token used
@@ -87,26 +106,78 @@ class GenerateAvatarView(APIView):
         bg_color = request.data.get("bg_color")
 
         if bg_color:
-            # delete old avatar file if it exists
-            if user.avatar_image:
-                old_path = Path(user.avatar_image)
-                if old_path.exists():
-                    old_path.unlink()
-                user.avatar_image = ""
-
-            path = generate_avatar(
-                initials=f"{user.name[0]}",
-                bg_color=bg_color
+            set_generated_avatar(user, bg_color=bg_color)
+            # request.user may be a cached copy, so only write what changed
+            user.save(update_fields=GENERATED_AVATAR_FIELDS)
+
+        serializer = UserSerializer(user)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+class UploadAvatarView(APIView):
+    """
+    Accepts a multipart "avatar" image. The body is streamed to a
+    temporary file and resizing happens in a Celery worker.
+    """
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser]
+    MULTIPART_OVERHEAD = 64 * 1024
+
+    def post(self, request):
+        max_bytes = settings.AVATAR_UPLOAD_MAX_BYTES
+        content_length = int(request.META.get("CONTENT_LENGTH") or 0)
+        if content_length > max_bytes + self.MULTIPART_OVERHEAD:
+            return Response(
+                {"detail": "Avatar is too large"},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
             )
 
-            user.avatar_type = "generated"
-            user.avatar_color = bg_color
-            user.avatar_image = path
+        # Must be set before the body is parsed
+        limit = AvatarUploadLimitHandler(request._request, max_bytes=max_bytes)
+        request._request.upload_handlers = [
+            limit,
+            TemporaryFileUploadHandler(request._request),
+        ]
+        upload = request.FILES.get("avatar")
 
-        user.save()
+        if limit.exceeded:
+            return Response(
+                {"detail": "Avatar is too large"},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+            )
+        if limit.rejected_type:
+            return Response({"detail": "Avatar must be an image"}, status=status.HTTP_400_BAD_REQUEST)
+        if upload is None:
+            return Response({"detail": "Avatar is required"}, status=status.HTTP_400_BAD_REQUEST)
 
-        serializer = UserSerializer(user)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        try:
+            check_avatar_upload(upload.temporary_file_path())
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        path = stage_avatar_upload(upload)
+        user_id = request.user.id
+        transaction.on_commit(lambda: process_avatar_upload_task.delay(user_id, path))
+
+        return Response({"detail": "Avatar is being processed"}, status=status.HTTP_202_ACCEPTED)
+
+class AvatarFileView(View):
+    """
+    Serves avatar files. Names are content-addressed, so a file
+    never changes and can be cached forever by clients and proxies.
+    """
+    def get(self, request, name):
+        storage = get_avatar_storage()
+        if not AVATAR_NAME_RE.match(name) or not storage.exists(name):
+            raise Http404("Avatar not found")
+
+        etag = f'"{name.removesuffix(".png")}"'
+        if request.headers.get("If-None-Match") == etag:
+            response = HttpResponseNotModified()
+        else:
+            response = FileResponse(storage.open(name), content_type="image/png")
+        response["ETag"] = etag
+        response["Cache-Control"] = f"public, max-age={settings.AVATAR_CACHE_MAX_AGE}, immutable"
+        return response
 
 class ChangeEmailView(APIView):
     permission_classes = [IsAuthenticated]
@@ -121,13 +192,13 @@ class ChangeEmailView(APIView):
         user = request.user
         user.email = new_email
         user.is_verified = False  # Mark as unverified until they verify the new email
-        token = secrets.token_urlsafe(32)
-        user.verification_token = token
+        token = EmailVerificationToken.create_token(user)
         user.verification_sent_at = timezone.now()
-        user.save()
+        user.bump_auth_version()
+        user.save(update_fields=["email", "is_verified", "verification_sent_at", "auth_version"])
         send_verification_email(new_email, token)
         return Response(
-            {"detail": "Email updated. Please verify your new email address."},
+            {"detail": "Email updated. Please verify your new email address.", **issue_tokens(user)},
             status=status.HTTP_200_OK
         )
 
@@ -146,8 +217,7 @@ class ResendVerificationEmailView(APIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
             else:
-                token = secrets.token_urlsafe(32)
-                user.verification_token = token
+                token = EmailVerificationToken.create_token(user)
                 user.verification_sent_at = timezone.now()
                 user.save()
                 send_verification_email(user.email, token)
@@ -169,22 +239,30 @@ class VerifyEmailView(APIView):
         if not token:
             return render(request, "verify_failed.html", {"detail": "Token is required"})
 
+        token_hash = EmailVerificationToken.hash_token(token)
         try:
-            user = User.objects.get(verification_token=token)
-            if timezone.now() - user.verification_sent_at > timezone.timedelta(hours=24):
-                return render(request, "verify_failed.html", {"detail": "Token has expired"})
-            
-            user.is_verified = True
-            user.verification_token = None
-            user.save()
-            return render(request, "verify_success.html")
-        except User.DoesNotExist:
+            token_obj = EmailVerificationToken.objects.select_related("user").get(token_hash=token_hash)
+        except EmailVerificationToken.DoesNotExist:
+            return render(request, "verify_failed.html", {"detail": "Invalid token"})
+
+        if token_obj.is_used:
             return render(request, "verify_failed.html", {"detail": "Invalid token"})
 
-class UserChangePasswordView(APIView):
+        if token_obj.is_expired:
+            return render(request, "verify_failed.html", {"detail": "Token has expired"})
+
+        user = token_obj.user
+        user.is_verified = True
+        user.save()
+        token_obj.mark_used()
+        return render(request, "verify_success.html")
+
+class UserChangePasswordView(AsyncAPIView):
     permission_classes = [IsAuthenticated]
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = "change_password"
 
-    def put(self, request):
+    async def put(self, request):
         user = request.user
         data = request.data
 
@@ -203,7 +281,7 @@ class UserChangePasswordView(APIView):
         if errors:
             return Response({"detail": errors}, status=status.HTTP_400_BAD_REQUEST)
 
-        if not user.check_password(current_password):
+        if not await acheck_password(current_password, user.password):
             return Response(
                 {"detail": {"current": "Wrong current password"}},
                 status=status.HTTP_400_BAD_REQUEST,
@@ -217,12 +295,17 @@ class UserChangePasswordView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        user.set_password(new_password)
-        user.save()
+        user.password = await amake_password(new_password)
+        user.bump_auth_version()
+        await user.asave(update_fields=["password", "auth_version"])
 
-        return Response({"message": "Password updated successfully"}, status=status.HTTP_200_OK)
+        # Other sessions are revoked, this one gets fresh tokens
+        return Response(
+            {"message": "Password updated successfully", **issue_tokens(user)},
+            status=status.HTTP_200_OK,
+        )
 
-class UserView(APIView):
+class UserView(ReplicaReadMixin, APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
@@ -237,9 +320,13 @@ class UserView(APIView):
         email = data.get("email")
         name = data.get("name")
         bg_color = data.get("bg_color")
+        email_changed = False
+        # request.user may be a cached copy, so only write what changed
+        update_fields = []
 
         if name:
             user.name = name
+            update_fields.append("name")
 
         if email and email != user.email:
             if User.objects.filter(email=email).exists():
@@ -250,37 +337,37 @@ class UserView(APIView):
 
             user.email = email
             user.is_verified = False
-            token = secrets.token_urlsafe(32)
-            user.verification_token = token
+            token = EmailVerificationToken.create_token(user)
             user.verification_sent_at = timezone.now()
+            user.bump_auth_version()
+            email_changed = True
+            update_fields += ["email", "is_verified", "verification_sent_at", "auth_version"]
             send_verification_email(email, token)
 
         if bg_color:
-            # delete old avatar file if it exists
-            if user.avatar_image:
-                old_path = Path(user.avatar_image)
-                if old_path.exists():
-                    old_path.unlink()
-                user.avatar_image = ""
-
-            path = generate_avatar(
-                initials=f"{user.name[0]}",
-                bg_color=bg_color
-            )
+            set_generated_avatar(user, bg_color=bg_color)
+            update_fields += GENERATED_AVATAR_FIELDS
 
-            user.avatar_type = "generated"
-            user.avatar_color = bg_color
-            user.avatar_image = path
+        preferences = NotificationPreferencesSerializer(user, data=data, partial=True)
+        preferences.is_valid(raise_exception=True)
+        for attr, value in preferences.validated_data.items():
+            setattr(user, attr, value)
+            update_fields.append(attr)
 
-        user.save()
+        if update_fields:
+            user.save(update_fields=update_fields)
 
-        serializer = UserSerializer(user)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        data = UserSerializer(user).data
+        if email_changed:
+            data.update(issue_tokens(user))
+        return Response(data, status=status.HTTP_200_OK)
 
-class LoginView(APIView):
+class LoginView(AsyncAPIView):
     permission_classes = [AllowAny]
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = "login"
 
-    def post(self, request):
+    async def post(self, request):
         email = request.data.get("email")
         password = request.data.get("password")
 
@@ -290,19 +377,14 @@ class LoginView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        user = authenticate(request, email=email, password=password)
+        user = await aauthenticate_user(email, password)
         if not user:
             return Response(
                 {"detail": "Invalid credentials"},
                 status=status.HTTP_401_UNAUTHORIZED
             )
 
-        refresh = RefreshToken.for_user(user)
-
-        return Response({
-            "access_token": str(refresh.access_token),
-            "refresh_token": str(refresh),
-        })
+        return Response(issue_tokens(user))
 
 class SavePushTokenView(APIView):
     permission_classes = [IsAuthenticated]
@@ -337,21 +419,70 @@ class RefreshTokenView(APIView):
             return Response({"detail": "refresh_token is required"}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            refresh = RefreshToken(refresh_token)
-            return Response({"access_token": str(refresh.access_token),
-                            "refresh_token": str(refresh)}, status=status.HTTP_200_OK)
-        except TokenError as e:
+            tokens = rotate_refresh_token(refresh_token)
+        except (TokenError, AuthenticationFailed):
             return Response({"detail": "Invalid refresh token"}, status=status.HTTP_401_UNAUTHORIZED)
+        except RedisError:
+            # Can't record the revocation, so don't hand out a new token
+            return Response(
+                {"detail": "Token refresh is temporarily unavailable"},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+        return Response(tokens, status=status.HTTP_200_OK)
 
-class RegisterView(APIView):
+class LogoutView(APIView):
     permission_classes = [AllowAny]
 
     def post(self, request):
+        refresh_token = request.data.get("refresh_token")
+        if not refresh_token:
+            return Response({"detail": "refresh_token is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            revoke_refresh_token(RefreshToken(refresh_token))
+        except TokenError:
+            pass  # Expired or invalid tokens are already unusable
+        except RedisError:
+            return Response(
+                {"detail": "Logout is temporarily unavailable"},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+class LogoutAllView(APIView):
+    """ Revokes every token issued to the user, on all devices. """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        user = request.user
+        user.bump_auth_version()
+        user.save(update_fields=["auth_version"])
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+class RegisterView(AsyncAPIView):
+    permission_classes = [AllowAny]
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = "register"
+
+    async def post(self, request):
         email = request.data.get("email")
         if not email:
             return Response({"detail": "Email is required"}, status=status.HTTP_400_BAD_REQUEST)
 
         # Check if user exists
+        response = await sync_to_async(self._resend_if_registered)(email)
+        if response:
+            return response
+
+        serializer = RegisterSerializer(data=request.data)
+        if await sync_to_async(serializer.is_valid)():
+            password_hash = await amake_password(serializer.validated_data["password"])
+            user = await sync_to_async(serializer.save)(password_hash=password_hash)
+            return Response(issue_tokens(user))
+        # TODO: Make sure returned error key is consistent with previous ones (detail)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    def _resend_if_registered(self, email):
         try:
             existing_user = User.objects.get(email=email)
             if existing_user.is_verified:
@@ -361,8 +492,7 @@ class RegisterView(APIView):
                 )
             else:
                 # Unverified user -> resend verification email
-                token = secrets.token_urlsafe(32)
-                existing_user.verification_token = token
+                token = EmailVerificationToken.create_token(existing_user)
                 existing_user.verification_sent_at = timezone.now()
                 existing_user.save()
                 send_verification_email(existing_user.email, token)
@@ -371,18 +501,7 @@ class RegisterView(APIView):
                     status=status.HTTP_200_OK
                 )
         except User.DoesNotExist:
-            pass  # New user -> continue with normal registration
-
-        serializer = RegisterSerializer(data=request.data)
-        if serializer.is_valid():
-            user = serializer.save()
-            refresh = RefreshToken.for_user(user)
-            return Response({
-                "access_token": str(refresh.access_token),
-                "refresh_token": str(refresh)
-            })
-        # TODO: Make sure returned error key is consistent with previous ones (detail)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+            return None  # New user -> continue with normal registration
 
 class GuestView(APIView):
     permission_classes = [AllowAny]
@@ -410,8 +529,4 @@ class GuestView(APIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
-        refresh = RefreshToken.for_user(user)
-        return Response({
-            "access_token": str(refresh.access_token),
-            "refresh_token": str(refresh)
-        })
+        return Response(issue_tokens(user))
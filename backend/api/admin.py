@@ -29,11 +29,13 @@ class HouseAdmin(admin.ModelAdmin):
         "address",
         "join_code",
         "deleted_at_display",
+        "member_count",
         "max_members",
     )
     search_fields = ("name", "address", "join_code")
     list_filter = (
         DeletedListFilter,
+        "is_template",
     )
 
     def deleted_at_display(self, obj):
@@ -145,3 +147,19 @@ class RotationMemberAdmin(admin.ModelAdmin):
         # start from default manager
         qs = super().get_queryset(request)
         return qs
+
+@admin.register(ArchivedRow)
+class ArchivedRowAdmin(admin.ModelAdmin):
+    list_display = ("id", "model", "object_id", "house_id", "deleted_at", "archived_at")
+    list_filter = ("model",)
+    search_fields = ("house_id",)
+
+@admin.register(DeferredNotification)
+class DeferredNotificationAdmin(admin.ModelAdmin):
+    list_display = ("id", "user", "release_at", "created_at")
+    ordering = ("release_at",)
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ("id", "user", "kind", "title", "created_at", "read_at")
+    list_filter = ("kind",)
@@ -20,13 +20,25 @@ def check_version(
     if client_version is None:
         raise Conflict(f"{name} version is required for concurrency check.")
 
+    if obj.version != parse_version(client_version):
+        raise Conflict(f"{name} has been modified.")
+
+def parse_version(client_version: int | str) -> int:
     try:
-        client_version = int(client_version)
+        return int(client_version)
     except (ValueError, TypeError):
         raise Conflict("Invalid version value.")
 
-    if obj.version != client_version:
-        raise Conflict(f"{name} has been modified.")
+def request_version(request) -> int | None:
+    """
+    The version the client last saw, from If-Match ("3", W/"3") or a
+    "version" field in the body. None if the client sent neither.
+    """
+    etag = request.headers.get("If-Match")
+    if etag and etag != "*":
+        return parse_version(etag.removeprefix("W/").strip('"'))
+    version = request.data.get("version")
+    return None if version is None else parse_version(version)
 
 def timeit(func):
     def myinner(*args, **kwargs):
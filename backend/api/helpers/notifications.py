@@ -0,0 +1,69 @@
+import datetime
+import requests
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from django.conf import settings
+
+EXPO_PUSH_URL = "https://exp.host/--/api/v2/push/send"
+
+def build_push_message(token, title, body, data=None):
+    message = {
+        "to": token,
+        "sound": "default",
+        "title": title,
+        "body": body,
+        "priority": "high",
+    }
+    if data:
+        message["data"] = data
+    return message
+
+def send_push_messages(messages, chunk_size=None):
+    """
+    Send push messages to Expo in chunks.
+    Expo accepts a list of messages per request, so a batch of
+    n messages costs ceil(n / chunk_size) requests instead of n.
+    Returns the indexes of the messages that were handed to Expo,
+    so callers can keep the ones in failed chunks for a retry.
+    """
+    chunk_size = chunk_size or settings.EXPO_PUSH_CHUNK_SIZE
+    delivered = set()
+    for start in range(0, len(messages), chunk_size):
+        chunk = messages[start:start + chunk_size]
+        try:
+            resp = requests.post(EXPO_PUSH_URL, json=chunk, timeout=10)
+            resp.raise_for_status()
+            delivered.update(range(start, start + len(chunk)))
+        except requests.RequestException as e:
+            print(f"Error sending {len(chunk)} push notifications: {e}")
+    return delivered
+
+def get_user_timezone(user):
+    """ Return the user's tzinfo, falling back to UTC for unknown names """
+    try:
+        return ZoneInfo(user.timezone)
+    except (ZoneInfoNotFoundError, ValueError):
+        return datetime.timezone.utc
+
+def quiet_hours_release(user, now):
+    """
+    If `now` falls inside the user's quiet hours, return the aware
+    datetime at which the window ends. Otherwise return None.
+    Windows may wrap past midnight, e.g. 22:00 -> 07:00.
+    """
+    start, end = user.quiet_hours_start, user.quiet_hours_end
+    if start is None or end is None or start == end:
+        return None
+
+    local_now = now.astimezone(get_user_timezone(user))
+    current = local_now.time()
+    if start < end:
+        inside = start <= current < end
+    else:
+        inside = current >= start or current < end
+    if not inside:
+        return None
+
+    release = datetime.datetime.combine(local_now.date(), end, tzinfo=local_now.tzinfo)
+    if release <= local_now:
+        release += datetime.timedelta(days=1)
+    return release
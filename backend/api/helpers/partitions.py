@@ -0,0 +1,184 @@
+"""
+Monthly range partitions of ChoreOccurrence by due_date, Postgres only.
+
+The table is converted once by `manage.py partition_occurrences`, after
+which the create_occurrence_partitions task keeps
+OCCURRENCE_PARTITION_MONTHS_AHEAD months of partitions ready. Rows
+outside every month land in a DEFAULT partition.
+
+A unique constraint on a partitioned table must include the partition
+key, and (schedule, original_due_date) can't: due_date moves when an
+occurrence is rescheduled. A trigger keeps those pairs in KEY_TABLE
+instead, whose primary key makes duplicates fail with IntegrityError
+just like the unique_occurrence_override constraint did.
+"""
+import datetime
+from dateutil.relativedelta import relativedelta
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from api.models import ChoreOccurrence
+
+TABLE = ChoreOccurrence._meta.db_table
+DEFAULT_PARTITION = f"{TABLE}_default"
+KEY_TABLE = f"{TABLE}_key"
+SEQUENCE = f"{TABLE}_id_seq"
+
+def month_start(value):
+    return datetime.datetime(value.year, value.month, 1, tzinfo=datetime.timezone.utc)
+
+def partition_name(month):
+    return f"{TABLE}_p{month:%Y_%m}"
+
+def is_partitioned(cursor):
+    if connection.vendor != "postgresql":
+        return False
+    cursor.execute("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)", [TABLE])
+    return cursor.fetchone() is not None
+
+def create_partitions(cursor, first, last):
+    """
+    Creates the monthly partitions from first to last, inclusive, that
+    don't exist yet. Returns their names.
+    """
+    created = []
+    month = month_start(first)
+    while month <= last:
+        name = partition_name(month)
+        cursor.execute("SELECT to_regclass(%s)", [name])
+        if cursor.fetchone()[0] is None:
+            _create_partition(cursor, name, month, month + relativedelta(months=1))
+            created.append(name)
+        month += relativedelta(months=1)
+    return created
+
+def _create_partition(cursor, name, lower, upper):
+    bounds = [lower, upper]
+    cursor.execute(f'CREATE TABLE "{name}" (LIKE "{TABLE}" INCLUDING DEFAULTS)')
+    # Rows of this month already in the default partition have to move
+    # out of it before the month can be attached
+    cursor.execute(
+        f'INSERT INTO "{name}" SELECT * FROM "{DEFAULT_PARTITION}" '
+        f"WHERE due_date >= %s AND due_date < %s",
+        bounds,
+    )
+    if cursor.rowcount:
+        cursor.execute(
+            f'DELETE FROM "{DEFAULT_PARTITION}" WHERE due_date >= %s AND due_date < %s',
+            bounds,
+        )
+        # The delete dropped their keys through the trigger
+        cursor.execute(
+            f'INSERT INTO "{KEY_TABLE}" SELECT schedule_id, original_due_date FROM "{name}"'
+        )
+    cursor.execute(
+        f'ALTER TABLE "{TABLE}" ATTACH PARTITION "{name}" FOR VALUES FROM (%s) TO (%s)',
+        bounds,
+    )
+
+def ensure_future_partitions(now=None):
+    """
+    Creates partitions up to OCCURRENCE_PARTITION_MONTHS_AHEAD months
+    ahead. Does nothing until the table has been partitioned.
+    """
+    now = now or timezone.now()
+    last = month_start(now) + relativedelta(months=settings.OCCURRENCE_PARTITION_MONTHS_AHEAD)
+    with transaction.atomic(), connection.cursor() as cursor:
+        if not is_partitioned(cursor):
+            return []
+        return create_partitions(cursor, now, last)
+
+def detach_partition(month):
+    """
+    Detaches a month from the table, leaving it as a plain table to
+    archive or drop. Its rows leave KEY_TABLE with it, as detaching
+    doesn't fire the trigger, so their occurrences can be created again.
+    """
+    name = partition_name(month_start(month))
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'ALTER TABLE "{TABLE}" DETACH PARTITION "{name}"')
+        cursor.execute(
+            f'DELETE FROM "{KEY_TABLE}" AS k USING "{name}" AS p '
+            f"WHERE k.schedule_id = p.schedule_id AND k.original_due_date = p.original_due_date"
+        )
+    return name
+
+def convert_table(now=None):
+    """
+    Rebuilds the table as a partitioned one, copying every row, in one
+    transaction. The table is locked throughout, so run it in a
+    maintenance window.
+    """
+    now = now or timezone.now()
+    old = f"{TABLE}_unpartitioned"
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'LOCK TABLE "{TABLE}" IN ACCESS EXCLUSIVE MODE')
+        cursor.execute(f'ALTER TABLE "{TABLE}" RENAME TO "{old}"')
+        # The primary key has to include the partition key
+        cursor.execute(
+            f'CREATE TABLE "{TABLE}" (LIKE "{old}" INCLUDING DEFAULTS) PARTITION BY RANGE (due_date)'
+        )
+        cursor.execute(f'ALTER TABLE "{TABLE}" ADD PRIMARY KEY (id, due_date)')
+        cursor.execute(f'CREATE TABLE "{DEFAULT_PARTITION}" PARTITION OF "{TABLE}" DEFAULT')
+        _create_key_table(cursor)
+
+        cursor.execute(f'SELECT MIN(due_date) FROM "{old}"')
+        first = cursor.fetchone()[0] or now
+        last = month_start(now) + relativedelta(months=settings.OCCURRENCE_PARTITION_MONTHS_AHEAD)
+        create_partitions(cursor, first, last)
+
+        cursor.execute(f'INSERT INTO "{TABLE}" SELECT * FROM "{old}"')
+        cursor.execute(f'DROP TABLE "{old}"')
+
+        # The old identity sequence went with the old table
+        cursor.execute(f'CREATE SEQUENCE "{SEQUENCE}" OWNED BY "{TABLE}".id')
+        cursor.execute(f"ALTER TABLE \"{TABLE}\" ALTER COLUMN id SET DEFAULT nextval('\"{SEQUENCE}\"')")
+        cursor.execute(f"SELECT setval('\"{SEQUENCE}\"', COALESCE(MAX(id), 0) + 1, false) FROM \"{TABLE}\"")
+        _create_indexes_and_foreign_keys(cursor)
+
+def _create_key_table(cursor):
+    cursor.execute(f"""
+        CREATE TABLE "{KEY_TABLE}" (
+            schedule_id bigint NOT NULL,
+            original_due_date timestamp with time zone NOT NULL,
+            PRIMARY KEY (schedule_id, original_due_date)
+        )
+    """)
+    cursor.execute(f"""
+        CREATE FUNCTION "{KEY_TABLE}_sync"() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                DELETE FROM "{KEY_TABLE}"
+                WHERE schedule_id = OLD.schedule_id AND original_due_date = OLD.original_due_date;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO "{KEY_TABLE}" VALUES (NEW.schedule_id, NEW.original_due_date);
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    # Moving a row to another month fires DELETE then INSERT
+    cursor.execute(f"""
+        CREATE TRIGGER "{KEY_TABLE}_sync"
+        AFTER INSERT OR DELETE OR UPDATE OF schedule_id, original_due_date ON "{TABLE}"
+        FOR EACH ROW EXECUTE FUNCTION "{KEY_TABLE}_sync"()
+    """)
+
+def _create_indexes_and_foreign_keys(cursor):
+    for field in ChoreOccurrence._meta.concrete_fields:
+        column = field.column
+        if field.db_index:
+            cursor.execute(f'CREATE INDEX "{TABLE}_{column}_idx" ON "{TABLE}" ({column})')
+        if not field.remote_field:
+            continue
+        target = field.target_field
+        cursor.execute(
+            f'ALTER TABLE "{TABLE}" ADD CONSTRAINT "{TABLE}_{column}_fk" '
+            f'FOREIGN KEY ({column}) REFERENCES "{target.model._meta.db_table}" ({target.column}) '
+            f"DEFERRABLE INITIALLY DEFERRED"
+        )
+    with connection.schema_editor() as editor:
+        for index in ChoreOccurrence._meta.indexes:
+            editor.add_index(ChoreOccurrence, index)
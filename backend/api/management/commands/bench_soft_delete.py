@@ -0,0 +1,77 @@
+import datetime
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from api.models import Chore, ChoreOccurrence, ChoreSchedule, House
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure active-occurrence lookups as the soft-deleted fraction "
+        "grows. Runs in a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=50000)
+        parser.add_argument("--repeat", type=int, default=200)
+        parser.add_argument("--explain", action="store_true")
+
+    def handle(self, *args, **options):
+        for fraction in (0, 0.5, 0.9, 0.99):
+            try:
+                with transaction.atomic():
+                    schedule = self._populate(options["rows"], fraction)
+                    latency = self._measure(schedule, options)
+                    raise Rollback
+            except Rollback:
+                pass
+            self.stdout.write(f"{fraction:5.0%} deleted: {latency * 1000:8.3f} ms/query")
+
+    def _populate(self, rows, fraction):
+        house = House.objects.create(name="benchmark")
+        chore = Chore.objects.create(house=house, name="benchmark")
+        start = timezone.now() - datetime.timedelta(days=rows)
+        schedule = ChoreSchedule.objects.create(chore=chore, start_date=start, repeat_unit="day")
+
+        deleted = int(rows * fraction)
+        ChoreOccurrence.all_objects.bulk_create(
+            [
+                ChoreOccurrence(
+                    schedule=schedule,
+                    due_date=start + datetime.timedelta(days=i),
+                    original_due_date=start + datetime.timedelta(days=i),
+                    deleted_at=timezone.now() if i < deleted else None,
+                )
+                for i in range(rows)
+            ],
+            batch_size=5000,
+        )
+        if connection.vendor == "postgresql":
+            # Fresh planner statistics, as autovacuum would have by now
+            with connection.cursor() as cursor:
+                cursor.execute(f"ANALYZE {ChoreOccurrence._meta.db_table}")
+        return schedule
+
+    def _measure(self, schedule, options):
+        # The last days of the range are always active rows
+        upper = timezone.now()
+        lower = upper - datetime.timedelta(days=7)
+        queryset = ChoreOccurrence.objects.filter(
+            schedule=schedule,
+            due_date__gte=lower,
+            due_date__lt=upper,
+        )
+        if options["explain"]:
+            self.stdout.write(queryset.explain())
+
+        start = time.perf_counter()
+        for _ in range(options["repeat"]):
+            list(queryset.all())
+        return (time.perf_counter() - start) / options["repeat"]
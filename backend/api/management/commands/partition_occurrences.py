@@ -0,0 +1,55 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from api.helpers import partitions
+from api.models import ChoreOccurrence
+
+
+class Command(BaseCommand):
+    help = (
+        "Convert the occurrence table to monthly partitions by due_date "
+        "(Postgres only, locks the table while it copies), create the "
+        "partitions ahead, or detach an old month."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--detach", metavar="YYYY-MM", help="Detach this month's partition.")
+        parser.add_argument(
+            "--explain",
+            nargs=2,
+            metavar=("FROM", "TO"),
+            help="Show the plan of the occurrence read path for a date range.",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Partitioning needs Postgres.")
+
+        if options["detach"]:
+            month = datetime.datetime.strptime(options["detach"], "%Y-%m")
+            name = partitions.detach_partition(month)
+            self.stdout.write(f"Detached {name}")
+            return
+
+        if options["explain"]:
+            self._explain(*options["explain"])
+            return
+
+        with connection.cursor() as cursor:
+            converted = partitions.is_partitioned(cursor)
+        if not converted:
+            partitions.convert_table()
+            self.stdout.write(f"Partitioned {partitions.TABLE}")
+        created = partitions.ensure_future_partitions()
+        self.stdout.write(f"Created {len(created)} partitions ahead")
+
+    def _explain(self, from_date, to_date):
+        # Same filter as OccurrenceService._get_saved_occurrences, only
+        # the partitions of the range should be scanned
+        start = timezone.make_aware(datetime.datetime.fromisoformat(from_date))
+        end = timezone.make_aware(datetime.datetime.fromisoformat(to_date)) + datetime.timedelta(days=1)
+        queryset = ChoreOccurrence.objects.filter(due_date__gte=start, due_date__lt=end)
+        self.stdout.write(queryset.explain())
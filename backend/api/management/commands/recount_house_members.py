@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from api.models import House
+
+
+class Command(BaseCommand):
+    help = "Recompute House.member_count from active memberships."
+
+    def handle(self, *args, **options):
+        updated = House.recount_members()
+        self.stdout.write(f"Recounted members for {updated} houses")
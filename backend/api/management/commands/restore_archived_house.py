@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from api.services import ArchiveService
+
+
+class Command(BaseCommand):
+    help = (
+        "Move a house's archived rows back into their tables. They stay "
+        "soft-deleted until the house is restored."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("house_id", type=int)
+
+    def handle(self, *args, **options):
+        restored = ArchiveService().restore_house(options["house_id"])
+        self.stdout.write(f"Restored {restored} rows for house {options['house_id']}")
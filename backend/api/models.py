@@ -1,10 +1,17 @@
 import string
 import random
-from django.db import models
+import uuid
+import functools
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_save
 from django.utils import timezone
 from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 from django.contrib.auth.hashers import make_password, check_password
 from rest_framework.exceptions import PermissionDenied, ValidationError
+from .exceptions import Conflict
 from django.core.validators import RegexValidator
 
 HEX_COLOR_VALIDATOR = RegexValidator(
@@ -15,13 +22,38 @@ HEX_COLOR_VALIDATOR = RegexValidator(
 def generate_join_code(length=6):
     return ''.join(random.choices(string.ascii_uppercase + string.digits, k=length))
 
+# Condition of the partial indexes below, matching ActiveManager, so
+# soft-deleted rows never bloat the index scans of the default manager
+ACTIVE = Q(deleted_at__isnull=True)
+
 class ActiveManager(models.Manager):
     def get_queryset(self):
         return super().get_queryset().filter(deleted_at__isnull=True)
 
+@functools.cache
+def soft_delete_dependents(model):
+    """
+    (model, lookup) for every SoftDeleteModel that CASCADEs from model,
+    directly or through other SoftDeleteModels. lookup filters the
+    dependent by the root's pk, e.g. (ChoreSchedule, "chore__house").
+    """
+    dependents = []
+    for rel in model._meta.related_objects:
+        related = rel.related_model
+        if rel.on_delete is not models.CASCADE or not issubclass(related, SoftDeleteModel):
+            continue
+        dependents.append((related, rel.field.name))
+        dependents.extend(
+            (nested, f"{lookup}__{rel.field.name}")
+            for nested, lookup in soft_delete_dependents(related)
+        )
+    return tuple(dependents)
+
 class SoftDeleteModel(models.Model):
     deleted_at = models.DateTimeField(null=True, blank=True)
     version = models.IntegerField(default=0)
+    # Shared by a row and everything its delete cascaded to
+    deletion_batch = models.UUIDField(null=True, blank=True, db_index=True)
 
     objects = ActiveManager()
     all_objects = models.Manager()
@@ -34,20 +66,78 @@ class SoftDeleteModel(models.Model):
         # Only increment version if object already exists
         if self.pk:
             self.version += 1
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], "version"}
         super().save(*args, **kwargs)
 
+    def save_versioned(self, update_fields, expected_version=None):
+        """
+        Compare-and-swap save of update_fields: one UPDATE ... SET
+        version = version + 1 WHERE id = ? AND version = ?, so concurrent
+        edits conflict instead of overwriting each other, without locking
+        the row. expected_version defaults to the version that was loaded.
+        Raises Conflict if the row has changed since.
+        """
+        if expected_version is None:
+            expected_version = self.version
+        fields = [self._meta.get_field(name) for name in update_fields]
+        updated = type(self).all_objects.filter(pk=self.pk, version=expected_version).update(
+            version=F("version") + 1,
+            **{field.attname: getattr(self, field.attname) for field in fields},
+        )
+        if not updated:
+            raise Conflict(f"{type(self).__name__} has been modified.")
+        self.version = expected_version + 1
+        # The write is a plain UPDATE, so post_save doesn't fire
+        post_save.send(
+            sender=type(self),
+            instance=self,
+            created=False,
+            update_fields={*update_fields, "version"},
+            raw=False,
+            using=self._state.db,
+        )
+
     def delete(self, using=None, keep_parents=False, force=False):
-        """Soft delete unless force=True."""
+        """
+        Soft delete unless force=True. Active dependents are soft
+        deleted too, with one UPDATE per table, under the same batch id.
+        """
         if force:
             return super().delete(using=using, keep_parents=keep_parents)
 
-        self.deleted_at = timezone.now()
-        self.save(update_fields=["deleted_at", "version"])
+        now = timezone.now()
+        batch = uuid.uuid4()
+        with transaction.atomic():
+            for model, lookup in soft_delete_dependents(type(self)):
+                model.all_objects.filter(
+                    **{lookup: self.pk},
+                    deleted_at__isnull=True,
+                ).update(
+                    deleted_at=now,
+                    deletion_batch=batch,
+                    version=F("version") + 1,
+                )
+            self.deleted_at = now
+            self.deletion_batch = batch
+            self.save(update_fields=["deleted_at", "deletion_batch", "version"])
 
     def restore(self):
-        """Restore a soft-deleted object."""
-        self.deleted_at = None
-        self.save(update_fields=["deleted_at", "version"])
+        """
+        Restore a soft-deleted object and whatever its delete cascaded
+        to. Rows that were already deleted before stay deleted.
+        """
+        with transaction.atomic():
+            if self.deletion_batch:
+                for model, _ in soft_delete_dependents(type(self)):
+                    model.all_objects.filter(deletion_batch=self.deletion_batch).update(
+                        deleted_at=None,
+                        deletion_batch=None,
+                        version=F("version") + 1,
+                    )
+            self.deleted_at = None
+            self.deletion_batch = None
+            self.save(update_fields=["deleted_at", "deletion_batch", "version"])
 
 class House(SoftDeleteModel):
     name = models.CharField(max_length=100)
@@ -64,29 +154,84 @@ class House(SoftDeleteModel):
     join_code = models.CharField(max_length=8, unique=True, default=generate_join_code)
     password = models.CharField(max_length=128)
     max_members = models.PositiveIntegerField(default=6)
+    # Active members, kept in step by add_member and HouseMember.delete
+    member_count = models.PositiveIntegerField(default=0)
+    # Template houses can be cloned by any user
+    is_template = models.BooleanField(default=False)
     users = models.ManyToManyField(
         settings.AUTH_USER_MODEL,
         through="HouseMember",
         related_name="houses"
     )
 
-    def add_member(self, user, role="member"):
-        if HouseMember.objects.filter(
-            house=self,
-            user=user,
-            deleted_at__isnull=True
-        ).exists():
-            raise ValidationError("User already in this house.")
-
-        current_count = HouseMember.objects.filter(house=self).count()
-        if current_count >= int(self.max_members):
+    class Meta:
+        indexes = [
+            models.Index(fields=["join_code"], condition=ACTIVE, name="house_active_join_code_idx"),
+            models.Index(fields=["is_template"], condition=ACTIVE, name="house_active_template_idx"),
+        ]
+
+    def _take_seat(self):
+        """
+        Claims a member slot with one conditional UPDATE, so concurrent
+        joins can't go over max_members.
+        """
+        admitted = House.all_objects.filter(
+            pk=self.pk,
+            member_count__lt=F("max_members"),
+        ).update(member_count=F("member_count") + 1)
+        if not admitted:
             raise ValidationError("House is full.")
+        self.member_count += 1
+
+    def save(self, *args, **kwargs):
+        # member_count only changes through atomic UPDATEs, a full save
+        # from a stale instance mustn't write it back
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != "member_count"
+            ]
+        super().save(*args, **kwargs)
 
-        return HouseMember.objects.create(
-            house=self,
-            user=user,
-            role=role
+    def add_member(self, user, role="member"):
+        with transaction.atomic():
+            self._take_seat()
+            try:
+                with transaction.atomic():
+                    return HouseMember.objects.create(
+                        house=self,
+                        user=user,
+                        role=role
+                    )
+            except IntegrityError:
+                pass
+
+            # (user, house) is unique, including members who left
+            member = HouseMember.all_objects.select_for_update().get(house=self, user=user)
+            if member.deleted_at is None:
+                # Rolls back the seat taken above
+                raise ValidationError("User already in this house.")
+
+            member.deleted_at = None
+            member.role = role
+            member.joined_at = timezone.now()
+            member.save(update_fields=["deleted_at", "role", "joined_at", "version"])
+            return member
+
+    @classmethod
+    def recount_members(cls):
+        """
+        Resets member_count from the membership rows, e.g. after a
+        backfill or rows removed outside HouseMember.delete.
+        """
+        active = (
+            HouseMember.objects
+            .filter(house=OuterRef("pk"))
+            .values("house")
+            .annotate(count=Count("pk"))
+            .values("count")
         )
+        return cls.all_objects.update(member_count=Coalesce(Subquery(active), 0))
 
     def set_password(self, raw_password):
         self.password = make_password(raw_password)
@@ -118,6 +263,55 @@ class HouseMember(SoftDeleteModel):
 
     class Meta:
         unique_together = ("user", "house")
+        indexes = [
+            models.Index(fields=["user", "house"], condition=ACTIVE, name="member_active_user_idx"),
+            models.Index(fields=["house", "role"], condition=ACTIVE, name="member_active_house_idx"),
+        ]
+
+    def delete(self, using=None, keep_parents=False, force=False):
+        """
+        Removes the member and frees their slot in the house.
+        """
+        with transaction.atomic():
+            if force:
+                was_active = HouseMember.objects.filter(pk=self.pk).exists()
+                result = super().delete(using=using, keep_parents=keep_parents, force=True)
+            else:
+                # Conditional, so removing the same member twice frees one slot
+                now = timezone.now()
+                was_active = HouseMember.objects.filter(pk=self.pk).update(
+                    deleted_at=now,
+                    version=F("version") + 1,
+                )
+                self.deleted_at = now
+                self.version += 1
+                result = None
+                if was_active:
+                    # The soft delete is an UPDATE, so post_save doesn't fire
+                    post_save.send(
+                        sender=HouseMember,
+                        instance=self,
+                        created=False,
+                        update_fields={"deleted_at", "version"},
+                        raw=False,
+                        using=using or "default",
+                    )
+
+            if was_active:
+                House.all_objects.filter(pk=self.house_id).update(
+                    member_count=F("member_count") - 1
+                )
+        return result
+
+    def restore(self):
+        """
+        Restores a removed member if the house still has room.
+        """
+        if self.deleted_at is None:
+            return
+        with transaction.atomic():
+            self.house._take_seat()
+            super().restore()
 
     def __str__(self):
         return f"{self.user.name} in {self.house.name}"
@@ -128,6 +322,11 @@ class Chore(SoftDeleteModel):
     description = models.TextField(blank=True)
     color = models.CharField(max_length=7, validators=[HEX_COLOR_VALIDATOR], default="#3498db")
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["house"], condition=ACTIVE, name="chore_active_house_idx"),
+        ]
+
     def __str__(self):
         return f"{self.name} ({self.house.name})"
 
@@ -155,6 +354,7 @@ class ChoreSchedule(SoftDeleteModel):
         indexes = [
             models.Index(fields=["start_date"]),
             models.Index(fields=["end_date"]),
+            models.Index(fields=["chore", "start_date"], condition=ACTIVE, name="schedule_active_chore_idx"),
         ]
 
     def __str__(self):
@@ -186,6 +386,17 @@ class ChoreOccurrence(SoftDeleteModel):
             models.Index(fields=["schedule", "original_due_date"]),
             models.Index(fields=["due_date"]),
             models.Index(fields=["notification_sent_at", "due_date"]),
+            models.Index(fields=["schedule", "due_date"], condition=ACTIVE, name="occurrence_active_sched_idx"),
+            # Reminder scan: only rows still waiting for a notification
+            models.Index(
+                fields=["due_date"],
+                condition=ACTIVE & Q(
+                    notification_sent_at__isnull=True,
+                    completed_at__isnull=True,
+                    skipped_at__isnull=True,
+                ),
+                name="occurrence_active_remind_idx",
+            ),
         ]
         constraints = [
             models.UniqueConstraint(
@@ -194,15 +405,15 @@ class ChoreOccurrence(SoftDeleteModel):
             )
         ]
 
-    def set_completed(self, completed: bool):
+    def set_completed(self, completed: bool, expected_version=None):
         if completed:
             if not self.completed_at:
                 self.completed_at = timezone.now()
-                self.save(update_fields=["completed_at"])
+                self.save_versioned(["completed_at"], expected_version)
         else:
             if self.completed_at is not None:
                 self.completed_at = None
-                self.save(update_fields=["completed_at"])
+                self.save_versioned(["completed_at"], expected_version)
 
     @property
     def temp_id(self):
@@ -237,6 +448,11 @@ class MemberAssignmentRule(SoftDeleteModel):
     )
     rotation_offset = models.PositiveIntegerField(default=0)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["schedule"], condition=ACTIVE, name="rule_active_schedule_idx"),
+        ]
+
     def __str__(self):
         return f"{self.schedule} with type: {self.rule_type}"
 
@@ -254,6 +470,85 @@ class RotationMember(SoftDeleteModel):
     class Meta:
         unique_together = ("assignment_rule", "position")
         ordering = ["position"]
+        indexes = [
+            models.Index(fields=["assignment_rule", "position"], condition=ACTIVE, name="rotation_active_rule_idx"),
+            models.Index(fields=["user"], condition=ACTIVE, name="rotation_active_user_idx"),
+        ]
 
     def __str__(self):
         return f"{self.user} at position {self.position}"
+
+class DeferredNotification(models.Model):
+    """
+    A push notification held back by the recipient's quiet hours.
+    Rows are only ever read once release_at has passed.
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="deferred_notifications"
+    )
+    payload = models.JSONField()
+    release_at = models.DateTimeField(db_index=True)
+    # Delivery attempts so far, see DEFERRED_PUSH_MAX_ATTEMPTS
+    attempts = models.PositiveSmallIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Notification for {self.user} at {self.release_at}"
+
+class Notification(models.Model):
+    KIND_CHOICES = [
+        ("reminder", "Reminder"),
+        ("assignment", "Assignment"),
+        ("house_membership", "House membership"),
+    ]
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="notifications"
+    )
+    house = models.ForeignKey(
+        House,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="+"
+    )
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    title = models.CharField(max_length=255)
+    body = models.TextField(blank=True)
+    data = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    read_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Keyset pagination: WHERE user_id = ? AND id < ? ORDER BY id DESC
+            models.Index(fields=["user", "-id"]),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} for {self.user}: {self.title}"
+
+class ArchivedRow(models.Model):
+    """
+    A row soft-deleted long ago, moved out of its table by
+    ArchiveService and kept as JSON until restored.
+    """
+    model = models.CharField(max_length=50)   # label_lower, e.g. "api.chore"
+    object_id = models.BigIntegerField()
+    # Not a ForeignKey, the house may be archived too
+    house_id = models.BigIntegerField(db_index=True)
+    data = models.JSONField(encoder=DjangoJSONEncoder)
+    deleted_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["model", "object_id"], name="unique_archived_row"),
+        ]
+
+    def __str__(self):
+        return f"{self.model} {self.object_id} (house {self.house_id})"
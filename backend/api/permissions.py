@@ -0,0 +1,93 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.permissions import BasePermission
+
+from .models import HouseMember
+
+
+def memberships_cache_key(user_id):
+    return f"memberships:{user_id}"
+
+
+def invalidate_memberships(user_id):
+    key = memberships_cache_key(user_id)
+    cache.delete(key)
+    # A request may have refilled the cache from the pre-commit rows
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+class MembershipResolver:
+    """
+    A user's active memberships as {house_id: role}.
+    Loaded once, from the per-user cache or a single query, and shared
+    by the permission check and services for the rest of the request.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self._roles = None
+
+    @classmethod
+    def for_user(cls, user, refresh=False):
+        """
+        The resolver attached to this user instance. IsHouseMember
+        refreshes it at the start of each request, and services then
+        reuse it through request.user.
+        """
+        resolver = getattr(user, "_membership_resolver", None)
+        if resolver is None or refresh:
+            resolver = cls(user)
+            user._membership_resolver = resolver
+        return resolver
+
+    @property
+    def roles(self):
+        if self._roles is None:
+            key = memberships_cache_key(self.user.pk)
+            roles = cache.get(key)
+            if roles is None:
+                roles = dict(
+                    HouseMember.objects
+                    .filter(user_id=self.user.pk, house__deleted_at__isnull=True)
+                    .values_list("house_id", "role")
+                )
+                cache.set(key, roles, settings.MEMBERSHIP_CACHE_TTL)
+            self._roles = roles
+        return self._roles
+
+    def house_ids(self):
+        return list(self.roles)
+
+    def role(self, house_id):
+        return self.roles.get(int(house_id))
+
+    def is_member(self, house_id):
+        return self.role(house_id) is not None
+
+    def is_owner(self, house_id):
+        return self.role(house_id) == "owner"
+
+    def require_member(self, house_id):
+        if not self.is_member(house_id):
+            raise PermissionDenied("You are not a member of this house.")
+
+    def require_owner(self, house_id, message="Only owners can perform this action."):
+        if not self.is_owner(house_id):
+            raise PermissionDenied(message)
+
+
+class IsHouseMember(BasePermission):
+    """
+    Requires membership of the house in the URL, taken from the
+    house_id or id kwarg. Views without either aren't house-scoped.
+    """
+    message = "You are not a member of this house."
+
+    def has_permission(self, request, view):
+        resolver = MembershipResolver.for_user(request.user, refresh=True)
+        house_id = view.kwargs.get("house_id", view.kwargs.get("id"))
+        if house_id is None:
+            return True
+        return resolver.is_member(house_id)
@@ -55,6 +55,11 @@ class ChoreSerializer(serializers.ModelSerializer):
         model = Chore
         fields = ["name", "description", "color"]
 
+class ChoreReadSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Chore
+        fields = ["id", "name", "description", "color"]
+
 class ScheduleSerializer(serializers.ModelSerializer):
     class Meta:
         model = ChoreSchedule
@@ -76,6 +81,39 @@ class RotationMemberSerializer(serializers.ModelSerializer):
         model = RotationMember
         fields = ["user", "position"]
 
+class RotationMemberImportSerializer(serializers.Serializer):
+    # Checked against the house's members in one query by the service
+    user = serializers.IntegerField()
+    position = serializers.IntegerField(min_value=0)
+
+class AssignmentImportSerializer(MemberAssignmentRuleSerializer):
+    rotation_members = RotationMemberImportSerializer(many=True, required=False, default=list)
+
+    class Meta(MemberAssignmentRuleSerializer.Meta):
+        fields = MemberAssignmentRuleSerializer.Meta.fields + ["rotation_members"]
+
+    def validate_rotation_members(self, value):
+        positions = [member["position"] for member in value]
+        if len(positions) != len(set(positions)):
+            raise serializers.ValidationError("Positions must be unique.")
+        return value
+
+class ScheduleImportSerializer(ScheduleSerializer):
+    assignment = AssignmentImportSerializer()
+
+    class Meta(ScheduleSerializer.Meta):
+        fields = ScheduleSerializer.Meta.fields + ["assignment"]
+
+class ChoreImportSerializer(ChoreSerializer):
+    """
+    One chore in the nested shape accepted by ChoreService.create_chore.
+    Validation makes no queries.
+    """
+    schedule = ScheduleImportSerializer()
+
+    class Meta(ChoreSerializer.Meta):
+        fields = ChoreSerializer.Meta.fields + ["schedule"]
+
 class HouseJoinSerializer(serializers.Serializer):
     join_code = serializers.CharField(max_length=8)
     password = serializers.CharField(required=False, write_only=True)
@@ -170,7 +208,10 @@ class HouseReadSerializer(serializers.ModelSerializer):
         ]
 
     def get_members(self, obj):
-        members = HouseMember.objects.filter(house=obj)
+        # Prefetched by HouseService.members_prefetch
+        members = getattr(obj, "active_members", None)
+        if members is None:
+            members = HouseMember.objects.filter(house=obj).select_related("user")
         return HouseMemberReadSerializer(members, many=True).data
 
 class HouseMemberUpdateSerializer(serializers.Serializer):
@@ -185,6 +226,7 @@ class HouseMemberReadSerializer(serializers.ModelSerializer):
             "user",
             "role",
             "joined_at",
+            "version",
         ]
 
 class HouseMemberCreateSerializer(serializers.ModelSerializer):
@@ -287,3 +329,17 @@ class ChoreScheduleReadSerializer(serializers.ModelSerializer):
             "end_date",
             "version",
         ]
+
+class NotificationSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Notification
+        fields = [
+            "id",
+            "kind",
+            "house",
+            "title",
+            "body",
+            "data",
+            "created_at",
+            "read_at",
+        ]
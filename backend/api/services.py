@@ -1,14 +1,27 @@
 from rest_framework.exceptions import PermissionDenied, ValidationError
 import datetime
 import math
+from collections import defaultdict
 from dateutil.relativedelta import relativedelta
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.utils import timezone
 from django.db import transaction
+from django.db.models import SET_NULL, Exists, F, OuterRef, Prefetch, prefetch_related_objects
 from django.shortcuts import get_object_or_404
 from .models import *
 from .serializers import *
 from .helpers.generic_utils import timeit
+from .permissions import MembershipResolver, invalidate_memberships
+from .helpers.notifications import (
+    build_push_message,
+    get_user_timezone,
+    quiet_hours_release,
+    send_push_messages,
+)
+from accounts.authentication import invalidate_cached_users
+from accounts.models import PushToken
 
 User = get_user_model()
 
@@ -82,23 +95,40 @@ class OccurrenceService:
         Get any already generated/saved occurences,
         and generate the rest without saving them
         """
-        saved = self._get_saved_occurrences(house, from_date, to_date)
-        generated = self._generate_occurrences(house, saved, from_date, to_date)
+        return self.get_occurrences_for_houses([house], from_date, to_date)
+
+    def get_occurrences_for_houses(self, houses, from_date, to_date):
+        """
+        Same as get_occurrences, but for several houses at once.
+        Saved occurrences and schedules are loaded with one query each,
+        and all schedules are expanded in a single pass.
+        """
+        saved = self._get_saved_occurrences(houses, from_date, to_date)
+        generated = self._generate_occurrences(houses, saved, from_date, to_date)
         return saved + generated
 
-    def _get_saved_occurrences(self, house, from_date, to_date):
-        """ Get a list of already saved occurrences for a house within a date range """
+    def _get_saved_occurrences(self, houses, from_date, to_date):
+        """ Get a list of already saved occurrences for houses within a date range """
         from_date = datetime.date.fromisoformat(from_date)
         to_date = datetime.date.fromisoformat(to_date)
-        return list(ChoreOccurrence.objects.filter(
-            schedule__chore__house=house,
-            due_date__date__range=(from_date, to_date),
-        ))
+        # Half-open range on the bare column rather than due_date__date,
+        # so the due_date indexes and partition pruning apply
+        start = make_aware_safe(datetime.datetime.combine(from_date, datetime.time.min))
+        end = make_aware_safe(datetime.datetime.combine(to_date + datetime.timedelta(days=1), datetime.time.min))
+        return list(
+            ChoreOccurrence.objects
+            .filter(
+                schedule__chore__house__in=houses,
+                due_date__gte=start,
+                due_date__lt=end,
+            )
+            .select_related("schedule__chore__house", "assigned_user")
+        )
 
     # @timeit
-    def _generate_occurrences(self, house, saved, from_date, to_date):
+    def _generate_occurrences(self, houses, saved, from_date, to_date):
         """
-        Generate occurrences for all schedules in the house,
+        Generate occurrences for all schedules in the houses,
         within a date range, excluding already saved occurrences.
         Does not save generated occurrences to the database.
         """
@@ -111,11 +141,11 @@ class OccurrenceService:
         schedules = (
             ChoreSchedule.objects
             .filter(
-                chore__house=house,
+                chore__house__in=houses,
                 start_date__lte=to_date
             )
-            .select_related("chore")
-            .prefetch_related("assignment_rule__rotation_members")
+            .select_related("chore__house")
+            .prefetch_related("assignment_rule__rotation_members__user")
         )
         occurrences = []
         for schedule in schedules:
@@ -187,6 +217,315 @@ class OccurrenceService:
                 occurrences.append(occurrence)
         return occurrences
 
+class PushService:
+    def dispatch(self, notifications, now=None):
+        """
+        Send push notifications, or defer them for users in quiet hours.
+        notifications = [(user, {"title": ..., "body": ...}), ...]
+        Returns (sent, deferred) counts and the ids of users with a
+        push that couldn't be delivered.
+        """
+        now = now or timezone.now()
+        immediate = []
+        deferred = []
+        for user, payload in notifications:
+            release_at = quiet_hours_release(user, now)
+            if release_at:
+                deferred.append(DeferredNotification(
+                    user=user,
+                    payload=payload,
+                    release_at=release_at,
+                ))
+            else:
+                immediate.append((user.id, payload))
+
+        DeferredNotification.objects.bulk_create(deferred)
+        sent, failed = self.send(immediate)
+        return sent, len(deferred), {immediate[index][0] for index in failed}
+
+    def send(self, notifications):
+        """
+        Send [(user_id, payload), ...] to every push token of each user.
+        Tokens are loaded with a single query.
+        Returns (sent, failed): the number of messages handed to Expo and
+        the indexes of the notifications with a message that wasn't.
+        """
+        tokens = defaultdict(list)
+        user_ids = {user_id for user_id, _ in notifications}
+        for user_id, token in (
+            PushToken.objects
+            .filter(user_id__in=user_ids)
+            .values_list("user_id", "token")
+        ):
+            tokens[user_id].append(token)
+
+        messages = []
+        owners = []
+        for index, (user_id, payload) in enumerate(notifications):
+            for token in tokens[user_id]:
+                messages.append(build_push_message(token, **payload))
+                owners.append(index)
+
+        delivered = send_push_messages(messages)
+        failed = {owner for i, owner in enumerate(owners) if i not in delivered}
+        return len(delivered), failed
+
+    def flush_deferred(self, now=None, batch_size=None):
+        """
+        Send deferred notifications whose quiet hours have ended.
+        Only rows with release_at <= now are read, in batches,
+        so suppressed notifications are never rescanned.
+        Rows whose delivery failed are retried after
+        DEFERRED_PUSH_RETRY_SECONDS, and dropped after
+        DEFERRED_PUSH_MAX_ATTEMPTS.
+        """
+        now = now or timezone.now()
+        batch_size = batch_size or settings.DEFERRED_PUSH_BATCH_SIZE
+        retry_at = now + datetime.timedelta(seconds=settings.DEFERRED_PUSH_RETRY_SECONDS)
+        sent = 0
+        while True:
+            # Claim the batch by moving release_at past now, so the HTTP
+            # calls run without row locks held. Rows claimed by a run
+            # that crashes come back at retry_at.
+            with transaction.atomic():
+                batch = list(
+                    DeferredNotification.objects
+                    .select_for_update(skip_locked=True)
+                    .filter(release_at__lte=now)
+                    .order_by("release_at")
+                    .values_list("id", "user_id", "payload", "attempts")[:batch_size]
+                )
+                if not batch:
+                    break
+                DeferredNotification.objects.filter(
+                    id__in=[pk for pk, _, _, _ in batch]
+                ).update(release_at=retry_at, attempts=F("attempts") + 1)
+
+            delivered, failed = self.send([(user_id, payload) for _, user_id, payload, _ in batch])
+            sent += delivered
+            done = []
+            dropped = 0
+            for i, (pk, _, _, attempts) in enumerate(batch):
+                if i not in failed:
+                    done.append(pk)
+                elif attempts + 1 >= settings.DEFERRED_PUSH_MAX_ATTEMPTS:
+                    done.append(pk)
+                    dropped += 1
+            if dropped:
+                print(f"Dropped {dropped} deferred push notifications after {settings.DEFERRED_PUSH_MAX_ATTEMPTS} attempts")
+            DeferredNotification.objects.filter(id__in=done).delete()
+        return sent
+
+
+class DigestService:
+    def get_due_recipients(self, now=None):
+        """
+        Get users whose digest time has passed today, in their own
+        timezone, and who haven't had today's digest yet. A late or
+        skipped run is caught up by the next one.
+        Returns a dict of {user: local_date}.
+        """
+        now = now or timezone.now()
+        recipients = {}
+
+        for user in User.objects.filter(digest_enabled=True, is_active=True):
+            local_now = now.astimezone(get_user_timezone(user))
+            local_date = local_now.date()
+            if user.digest_last_sent_on == local_date:
+                continue
+
+            digest_at = datetime.datetime.combine(
+                local_date, user.digest_time, tzinfo=local_now.tzinfo)
+            if local_now >= digest_at:
+                recipients[user] = local_date
+        return recipients
+
+    def collect_digests(self, recipients):
+        """
+        Expand the occurrences of every house the recipients belong to
+        in one pass, and group the open ones due on each recipient's
+        local date by user.
+        Returns a dict of {user: [occurrence, ...]}.
+        """
+        if not recipients:
+            return {}
+
+        users_by_id = {user.id: user for user in recipients}
+        house_ids = set(
+            HouseMember.objects
+            .filter(user_id__in=users_by_id, house__deleted_at__isnull=True)
+            .values_list("house_id", flat=True)
+        )
+
+        # Pad the range by a day either side, as local dates
+        # don't line up with the UTC dates used for expansion
+        dates = recipients.values()
+        from_date = min(dates) - datetime.timedelta(days=1)
+        to_date = max(dates) + datetime.timedelta(days=1)
+        occurrences = OccurrenceService().get_occurrences_for_houses(
+            house_ids, from_date.isoformat(), to_date.isoformat())
+
+        digests = {user: [] for user in recipients}
+        for occ in occurrences:
+            user = users_by_id.get(occ.assigned_user_id)
+            if user is None or occ.completed_at or occ.skipped_at:
+                continue
+            local_due = occ.due_date.astimezone(get_user_timezone(user))
+            if local_due.date() == recipients[user]:
+                digests[user].append(occ)
+
+        for occs in digests.values():
+            occs.sort(key=lambda occ: occ.due_date)
+        return digests
+
+    def build_notifications(self, digests):
+        """ Build one notification per user with chores due """
+        notifications = []
+        for user, occs in digests.items():
+            if not occs:
+                continue
+            lines = [
+                f"{occ.schedule.chore.name} ({occ.schedule.chore.house.name})"
+                for occ in occs
+            ]
+            title = f"📋 {len(occs)} chore{'s' if len(occs) != 1 else ''} today"
+            notifications.append((user, {"title": title, "body": "\n".join(lines)}))
+        return notifications
+
+    def send_digests(self, recipients, now=None):
+        """
+        Collect, send and mark the digests for the given recipients.
+        Users whose push failed aren't marked, so the next run retries.
+        Returns the number of push messages sent.
+        """
+        digests = self.collect_digests(recipients)
+        sent, _, failed = PushService().dispatch(self.build_notifications(digests), now=now)
+
+        users_by_date = defaultdict(list)
+        for user, local_date in recipients.items():
+            if user.id not in failed:
+                users_by_date[local_date].append(user.id)
+        for local_date, user_ids in users_by_date.items():
+            User.objects.filter(id__in=user_ids).update(digest_last_sent_on=local_date)
+            invalidate_cached_users(user_ids)
+        return sent
+
+
+class NotificationService:
+    """
+    In-app notification inbox.
+    Unread counts live in the cache and are adjusted incrementally
+    as notifications are created and read. The table is only counted
+    when a counter is missing from the cache.
+    """
+    PAGE_SIZE = 20
+    MAX_PAGE_SIZE = 100
+
+    @staticmethod
+    def _unread_key(user_id):
+        return f"notifications:unread:{user_id}"
+
+    def notify(self, notifications):
+        """
+        Record notifications in bulk.
+        notifications = [Notification(user=..., kind=..., title=...), ...]
+        """
+        created = Notification.objects.bulk_create(notifications)
+
+        per_user = defaultdict(int)
+        for notification in created:
+            per_user[notification.user_id] += 1
+        transaction.on_commit(lambda: self._adjust_unread(per_user))
+        return created
+
+    def _adjust_unread(self, per_user):
+        for user_id, delta in per_user.items():
+            try:
+                if delta > 0:
+                    cache.incr(self._unread_key(user_id), delta)
+                elif delta < 0:
+                    cache.decr(self._unread_key(user_id), -delta)
+            except ValueError:
+                # No cached counter yet, it's computed on first read
+                pass
+
+    def unread_count(self, user):
+        count = cache.get(self._unread_key(user.id))
+        if count is None:
+            count = Notification.objects.filter(user=user, read_at__isnull=True).count()
+            cache.add(self._unread_key(user.id), count, timeout=settings.NOTIFICATION_UNREAD_TTL)
+        return max(count, 0)
+
+    def list_notifications(self, user, before=None, limit=None):
+        """
+        Keyset paginated inbox, newest first.
+        Returns (notifications, next_before) where next_before is the
+        cursor for the following page, or None on the last page.
+        """
+        limit = max(1, min(int(limit or self.PAGE_SIZE), self.MAX_PAGE_SIZE))
+        queryset = Notification.objects.filter(user=user)
+        if before is not None:
+            queryset = queryset.filter(id__lt=before)
+
+        page = list(queryset.order_by("-id")[:limit + 1])
+        if len(page) > limit:
+            return page[:limit], page[limit - 1].id
+        return page, None
+
+    def mark_read(self, user, ids=None):
+        """ Mark the given notifications (or all of them) as read """
+        queryset = Notification.objects.filter(user=user, read_at__isnull=True)
+        if ids is not None:
+            queryset = queryset.filter(id__in=ids)
+        updated = queryset.update(read_at=timezone.now())
+
+        if ids is None:
+            transaction.on_commit(lambda: cache.set(self._unread_key(user.id), 0, timeout=settings.NOTIFICATION_UNREAD_TTL))
+        elif updated:
+            transaction.on_commit(lambda: self._adjust_unread({user.id: -updated}))
+        return updated
+
+
+class BootstrapService:
+    def get_dashboard(self, user, days):
+        """
+        Everything the app needs on launch: the user's houses with
+        their members, chores and the next `days` days of occurrences.
+        Queries are batched over all houses, and their schedules are
+        expanded in one pass.
+        """
+        from_date = timezone.localdate()
+        to_date = from_date + datetime.timedelta(days=days)
+
+        houses = list(
+            HouseService().get_user_houses(user)
+            .prefetch_related(
+                Prefetch("chores", queryset=Chore.objects.order_by("id"), to_attr="active_chores")
+            )
+        )
+        occurrences = OccurrenceService().get_occurrences_for_houses(
+            houses, from_date.isoformat(), to_date.isoformat()
+        )
+
+        occurrences_by_house = defaultdict(list)
+        for occ in sorted(occurrences, key=lambda occ: occ.due_date):
+            occurrences_by_house[occ.schedule.chore.house_id].append(occ)
+
+        return {
+            "from": from_date,
+            "to": to_date,
+            "houses": [
+                {
+                    **HouseReadSerializer(house).data,
+                    "chores": ChoreReadSerializer(house.active_chores, many=True).data,
+                    "occurrences": OccurrenceSerializer(
+                        occurrences_by_house[house.id], many=True
+                    ).data,
+                }
+                for house in houses
+            ],
+        }
+
 class ChoreService:
     @transaction.atomic
     def create_chore(self, house, data, user):
@@ -222,6 +561,7 @@ class ChoreService:
         )
 
         # 4. Rotation Members
+        assigned_users = []
         for member_data in rotation_members_data:
             member_serializer = RotationMemberSerializer(data=member_data)
             member_serializer.is_valid(raise_exception=True)
@@ -230,20 +570,218 @@ class ChoreService:
                 assignment_rule=assignment,
                 **member_serializer.validated_data
             )
+            assigned_users.append(member_serializer.validated_data["user"])
+
+        NotificationService().notify([
+            Notification(
+                user=assigned_user,
+                house=house,
+                kind="assignment",
+                title=f"You've been assigned '{chore.name}'",
+                data={"chore_id": chore.id},
+            )
+            for assigned_user in set(assigned_users)
+        ])
 
         return chore
 
+    @transaction.atomic
+    def import_chores(self, house, data, user):
+        """
+        Create many chores with their nested models, in the same shape
+        as create_chore. Everything is validated before anything is
+        written, then each table gets a single bulk_create.
+        """
+        serializer = ChoreImportSerializer(
+            data=data,
+            many=True,
+            max_length=settings.CHORE_IMPORT_MAX,
+        )
+        serializer.is_valid(raise_exception=True)
+        items = serializer.validated_data
+
+        member_ids = set(house.memberships.values_list("user_id", flat=True))
+        errors = [
+            {"user": f"User {member['user']} is not a member of this house."}
+            for item in items
+            for member in item["schedule"]["assignment"]["rotation_members"]
+            if member["user"] not in member_ids
+        ]
+        if errors:
+            raise ValidationError({"rotation_members": errors})
+
+        chores, schedules, rules, members = [], [], [], []
+        for item in items:
+            schedule_data = dict(item["schedule"])
+            assignment_data = dict(schedule_data.pop("assignment"))
+            rotation_members_data = assignment_data.pop("rotation_members")
+            chore_data = {k: v for k, v in item.items() if k != "schedule"}
+
+            chore = Chore(house=house, **chore_data)
+            schedule = ChoreSchedule(chore=chore, **schedule_data)
+            rule = MemberAssignmentRule(schedule=schedule, **assignment_data)
+            chores.append(chore)
+            schedules.append(schedule)
+            rules.append(rule)
+            members.extend(
+                RotationMember(assignment_rule=rule, user_id=member["user"], position=member["position"])
+                for member in rotation_members_data
+            )
+
+        # Parents are inserted first, bulk_create then copies
+        # their new ids into the children's FKs
+        Chore.objects.bulk_create(chores)
+        ChoreSchedule.objects.bulk_create(schedules)
+        MemberAssignmentRule.objects.bulk_create(rules)
+        RotationMember.objects.bulk_create(members)
+
+        NotificationService().notify([
+            Notification(
+                user_id=user_id,
+                house=house,
+                kind="assignment",
+                title=f"You've been assigned {len(chore_ids)} new chores in {house.name}",
+                data={"chore_ids": chore_ids},
+            )
+            for user_id, chore_ids in self._assigned_chores(members).items()
+        ])
+
+        return chores
+
+    def _assigned_chores(self, rotation_members):
+        assigned = defaultdict(list)
+        for member in rotation_members:
+            chore_id = member.assignment_rule.schedule.chore_id
+            if chore_id not in assigned[member.user_id]:
+                assigned[member.user_id].append(chore_id)
+        return assigned
+
 class HouseService:
-    def _check_owner(self, house, user):
-        membership = house.memberships.filter(
-            user=user,
-            deleted_at__isnull=True
-        ).first()
+    def members_prefetch(self):
+        """
+        Active members with their users, in one query for any number
+        of houses. HouseReadSerializer reads them from active_members.
+        """
+        return Prefetch(
+            "memberships",
+            queryset=HouseMember.objects.select_related("user").order_by("id"),
+            to_attr="active_members",
+        )
 
-        if not membership or membership.role != "owner":
-            raise PermissionDenied("Only owners can perform this action.")
+    def get_user_houses(self, user):
+        """
+        Houses the user belongs to, ready for HouseReadSerializer.
+        """
+        is_member = HouseMember.objects.filter(house=OuterRef("pk"), user=user)
+        return (
+            House.objects
+            .filter(Exists(is_member))
+            .prefetch_related(self.members_prefetch())
+            .order_by("id")
+        )
+
+    def get_house(self, house_id):
+        return get_object_or_404(
+            House.objects.prefetch_related(self.members_prefetch()),
+            id=house_id,
+        )
 
-        return membership
+    @transaction.atomic
+    def clone_chores(self, source, target, user):
+        """
+        Copies the source house's chores, schedules, assignment rules and
+        rotation members into target. One select and one bulk insert per
+        table, so the round trips don't depend on the size of the house.
+        Rotation members are remapped with _map_members.
+        """
+        if not source.is_template:
+            MembershipResolver.for_user(user).require_member(source.id)
+
+        chores = list(Chore.objects.filter(house=source).order_by("id"))
+        schedules = list(ChoreSchedule.objects.filter(chore__house=source).order_by("id"))
+        rules = list(MemberAssignmentRule.objects.filter(schedule__chore__house=source))
+        rotation_members = list(
+            RotationMember.objects
+            .filter(assignment_rule__schedule__chore__house=source)
+            .order_by("assignment_rule_id", "position")
+        )
+        user_map = self._map_members(source, target)
+
+        new_chores = {
+            chore.id: Chore(house=target, name=chore.name, description=chore.description, color=chore.color)
+            for chore in chores
+        }
+        new_schedules = {
+            schedule.id: ChoreSchedule(
+                chore=new_chores[schedule.chore_id],
+                start_date=schedule.start_date,
+                repeat_unit=schedule.repeat_unit,
+                repeat_interval=schedule.repeat_interval,
+                constraints=schedule.constraints,
+                end_date=schedule.end_date,
+            )
+            for schedule in schedules
+            if schedule.chore_id in new_chores
+        }
+        new_rules = {
+            rule.id: MemberAssignmentRule(
+                schedule=new_schedules[rule.schedule_id],
+                rule_type=rule.rule_type,
+                rotation_offset=rule.rotation_offset,
+            )
+            for rule in rules
+            if rule.schedule_id in new_schedules
+        }
+        new_members = []
+        rule_users = defaultdict(list)
+        for member in rotation_members:
+            user_id = user_map.get(member.user_id)
+            if member.assignment_rule_id not in new_rules or user_id is None:
+                continue
+            # Two source users can map to the same target user
+            if user_id in rule_users[member.assignment_rule_id]:
+                continue
+            rule_users[member.assignment_rule_id].append(user_id)
+            new_members.append(RotationMember(
+                assignment_rule=new_rules[member.assignment_rule_id],
+                user_id=user_id,
+                position=len(rule_users[member.assignment_rule_id]) - 1,
+            ))
+
+        Chore.objects.bulk_create(new_chores.values())
+        ChoreSchedule.objects.bulk_create(new_schedules.values())
+        MemberAssignmentRule.objects.bulk_create(new_rules.values())
+        RotationMember.objects.bulk_create(new_members)
+        return list(new_chores.values())
+
+    def _map_members(self, source, target):
+        """
+        Maps source house user ids onto target house user ids.
+        Users in both houses keep their chores, the others take the
+        target's remaining members in join order, wrapping around.
+        """
+        source_ids = list(
+            HouseMember.objects.filter(house=source)
+            .order_by("joined_at", "id")
+            .values_list("user_id", flat=True)
+        )
+        target_ids = list(
+            HouseMember.objects.filter(house=target)
+            .order_by("joined_at", "id")
+            .values_list("user_id", flat=True)
+        )
+        if not target_ids:
+            return {}
+
+        shared = set(source_ids) & set(target_ids)
+        spare = [user_id for user_id in target_ids if user_id not in shared] or target_ids
+        user_map = {user_id: user_id for user_id in shared}
+        for i, user_id in enumerate(u for u in source_ids if u not in shared):
+            user_map[user_id] = spare[i % len(spare)]
+        return user_map
+
+    def _check_owner(self, house, user, message="Only owners can perform this action."):
+        MembershipResolver.for_user(user).require_owner(house.id, message)
 
     def _get_member(self, house, member_id):
         member = house.memberships.filter(
@@ -258,22 +796,21 @@ class HouseService:
 
         return member
 
-    def update_house(self, house, user, data):
+    def update_house(self, house, user, data, version=None):
         """
         Updates a house. Only owners can update.
+        Raises Conflict if the house changed since version.
         """
-        # Check ownership
-        membership = house.memberships.filter(user=user).first()
-        if not membership or membership.role != "owner":
-            raise PermissionDenied("Only owners can update the house.")
+        self._check_owner(house, user, "Only owners can update the house.")
 
+        fields = list(data)
         # Password handling
         if "password" in data:
             house.set_password(data.pop("password"))
 
         for attr, value in data.items():
             setattr(house, attr, value)
-        house.save()
+        house.save_versioned(fields, version)
 
         return house
 
@@ -281,13 +818,36 @@ class HouseService:
         """
         Soft delete a house. Only owners can delete.
         """
-        membership = house.memberships.filter(user=user).first()
-        if not membership or membership.role != "owner":
-            raise PermissionDenied("Only owners can delete the house.")
+        self._check_owner(house, user, "Only owners can delete the house.")
 
         house.delete()
+        self._invalidate_house_memberships(house)
         return house
 
+    def restore_house(self, house, user):
+        """
+        Restores a deleted house and everything deleted along with it.
+        Only owners at the time of deletion can restore.
+        """
+        was_owner = HouseMember.all_objects.filter(
+            house=house,
+            user=user,
+            role="owner",
+            deletion_batch=house.deletion_batch,
+        ).exists()
+        if house.deleted_at is None or not was_owner:
+            raise PermissionDenied("Only owners can restore the house.")
+
+        house.restore()
+        self._invalidate_house_memberships(house)
+        return house
+
+    def _invalidate_house_memberships(self, house):
+        for member_user_id in (
+            HouseMember.all_objects.filter(house=house).values_list("user_id", flat=True)
+        ):
+            invalidate_memberships(member_user_id)
+
     @transaction.atomic
     def create_house(self, data, user):
         """
@@ -301,11 +861,7 @@ class HouseService:
         house.save()
 
         # Add creator as owner
-        HouseMember.objects.create(
-            house=house,
-            user=user,
-            role="owner"
-        )
+        house.add_member(user, role="owner")
 
         return house
 
@@ -315,14 +871,35 @@ class HouseService:
         Joins a user to a house using join_code.
         Raises ValidationError on failure.
         """
+        house = self.get_house_by_join_code(join_code)
+        if house.password and not house.check_password(password):
+            raise ValidationError("Incorrect password.")
+        return self.admit_member(house, user)
+
+    def get_house_by_join_code(self, join_code):
         try:
-            house = House.objects.get(join_code=join_code)
+            return House.objects.get(join_code=join_code)
         except House.DoesNotExist:
             raise ValidationError("Invalid join code.")
 
-        if house.password and not house.check_password(password):
-            raise ValidationError("Incorrect password.")
+    def admit_member(self, house, user):
+        """
+        Adds user to house once the join password has been checked.
+        """
         house.add_member(user)
+        # Loaded once here for both the notifications and the response
+        prefetch_related_objects([house], self.members_prefetch())
+
+        NotificationService().notify([
+            Notification(
+                user_id=member.user_id,
+                house=house,
+                kind="house_membership",
+                title=f"{user.name} joined {house.name}",
+            )
+            for member in house.active_members
+            if member.user_id != user.id
+        ])
         return house
 
     def remove_member(self, house, member_id, user):
@@ -332,18 +909,157 @@ class HouseService:
         self._check_owner(house, user)
         member = self._get_member(house, member_id)
         member.delete()
+
+        NotificationService().notify([
+            Notification(
+                user_id=member.user_id,
+                house=house,
+                kind="house_membership",
+                title=f"You were removed from {house.name}",
+            )
+        ])
         return member
 
-    def update_member(self, house, member_id, role, user):
+    def update_member(self, house, member_id, role, user, version=None):
         """
         Update user role. Only owners can change role.
+        Raises Conflict if the member changed since version.
         """
         self._check_owner(house, user)
         member = self._get_member(house, member_id)
         member.role = role
-        member.save()
+        member.save_versioned(["role"], version)
+
+        NotificationService().notify([
+            Notification(
+                user_id=member.user_id,
+                house=house,
+                kind="house_membership",
+                title=f"You are now {member.get_role_display().lower()} of {house.name}",
+            )
+        ])
         return member
 
+class ArchiveService:
+    """
+    Moves rows soft-deleted for longer than ARCHIVE_AFTER_DAYS out of
+    the house tables into ArchivedRow, and back again.
+    """
+    def archive_models(self):
+        """ Every soft-delete model of the house graph, parents first """
+        return [House] + [model for model, _ in soft_delete_dependents(House)]
+
+    def _house_lookup(self, model):
+        if model is House:
+            return "pk"
+        return dict(soft_delete_dependents(House))[model]
+
+    def _nulled_links(self, model):
+        """
+        Relations the hard delete clears, e.g. Notification.house. Their
+        ids are kept with the archived row and re-linked on restore.
+        """
+        return {
+            f"{rel.related_model._meta.label_lower}.{rel.field.name}": rel
+            # related_name="+" hides a relation from related_objects
+            for rel in model._meta.get_fields(include_hidden=True)
+            if rel.auto_created and not rel.concrete and getattr(rel, "on_delete", None) is SET_NULL
+        }
+
+    def archive(self, now=None, batch_size=None):
+        """
+        Archives in chunks of batch_size, each committed on its own, so an
+        interrupted run picks up where it stopped. Returns rows archived
+        per model.
+        """
+        now = now or timezone.now()
+        cutoff = now - datetime.timedelta(days=settings.ARCHIVE_AFTER_DAYS)
+        batch_size = batch_size or settings.ARCHIVE_BATCH_SIZE
+        # Leaves first, so no row is archived while something references it
+        return {
+            model.__name__: self._archive_model(model, cutoff, batch_size)
+            for model in reversed(self.archive_models())
+        }
+
+    def _archive_model(self, model, cutoff, batch_size):
+        stale = model.all_objects.filter(deleted_at__lt=cutoff)
+        for rel in model._meta.related_objects:
+            if issubclass(rel.related_model, SoftDeleteModel):
+                # Waits until its dependents, deleted or not, are archived
+                stale = stale.exclude(Exists(
+                    rel.related_model.all_objects.filter(**{rel.field.name: OuterRef("pk")})
+                ))
+        fields = [field.attname for field in model._meta.concrete_fields]
+        label = model._meta.label_lower
+        nulled = self._nulled_links(model)
+
+        archived = 0
+        while True:
+            with transaction.atomic():
+                rows = list(
+                    stale.select_for_update(skip_locked=True, of=("self",))
+                    .order_by("pk")
+                    .values(*fields, archive_house_id=F(self._house_lookup(model)))
+                    [:batch_size]
+                )
+                if not rows:
+                    return archived
+                ids = [row["id"] for row in rows]
+                for key, rel in nulled.items():
+                    linked = defaultdict(list)
+                    for pk, target in rel.related_model._base_manager.filter(
+                        **{f"{rel.field.name}__in": ids}
+                    ).values_list("pk", rel.field.attname):
+                        linked[target].append(pk)
+                    for row in rows:
+                        row.setdefault("_links", {})[key] = linked[row["id"]]
+                ArchivedRow.objects.bulk_create([
+                    ArchivedRow(
+                        model=label,
+                        object_id=row["id"],
+                        house_id=row.pop("archive_house_id"),
+                        data=row,
+                        deleted_at=row["deleted_at"],
+                    )
+                    for row in rows
+                ])
+                model.all_objects.filter(pk__in=ids).delete()
+            archived += len(rows)
+
+    def restore_house(self, house_id):
+        """
+        Moves everything archived for a house back into its tables,
+        parents first. Rows come back still soft-deleted, House.restore
+        brings them back to life. All or nothing: an IntegrityError means
+        something they referenced, e.g. a user, is gone or was replaced.
+        """
+        with transaction.atomic():
+            archived = list(ArchivedRow.objects.select_for_update().filter(house_id=house_id))
+            by_model = defaultdict(list)
+            for row in archived:
+                by_model[row.model].append(row.data)
+
+            for model in self.archive_models():
+                model.all_objects.bulk_create([
+                    self._to_instance(model, data)
+                    for data in by_model[model._meta.label_lower]
+                ])
+                for key, rel in self._nulled_links(model).items():
+                    for data in by_model[model._meta.label_lower]:
+                        # Unless the row was pointed somewhere else meanwhile
+                        rel.related_model._base_manager.filter(
+                            pk__in=data.get("_links", {}).get(key, []),
+                            **{f"{rel.field.name}__isnull": True},
+                        ).update(**{rel.field.attname: data["id"]})
+            ArchivedRow.objects.filter(id__in=[row.id for row in archived]).delete()
+        return len(archived)
+
+    def _to_instance(self, model, data):
+        return model(**{
+            field.attname: field.to_python(data[field.attname])
+            for field in model._meta.concrete_fields
+        })
+
 class ChoreManagementService:
     def create_chore(self, data, user):
         return Chore.objects.create(
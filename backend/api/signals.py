@@ -1,6 +1,7 @@
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
-from .models import ChoreSchedule, ChoreOccurrence
+from .models import ChoreSchedule, ChoreOccurrence, HouseMember
+from .permissions import invalidate_memberships
 from .helpers.occurrence_utils import generate_occurrences_for_schedule, generate_next_occurrence_after
 
 """
@@ -36,3 +37,8 @@ def schedule_post_save(sender, instance, created, **kwargs):
         generate_occurrences_for_schedule(instance)
 
 """
+
+@receiver(post_save, sender=HouseMember)
+@receiver(post_delete, sender=HouseMember)
+def house_member_changed(sender, instance, **kwargs):
+    invalidate_memberships(instance.user_id)
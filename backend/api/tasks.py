@@ -1,16 +1,14 @@
 import datetime
-import requests
 from django.utils import timezone
 from celery import shared_task
-from .models import ChoreOccurrence
-from accounts.models import PushToken
-
-EXPO_PUSH_URL = "https://exp.host/--/api/v2/push/send"
+from .models import ChoreOccurrence, Notification
+from .helpers.partitions import ensure_future_partitions
+from .services import ArchiveService, DigestService, NotificationService, PushService
 
 
 @shared_task
 def send_chore_reminders():
-    now = timezone.localtime()
+    now = timezone.now()
     one_hour_later = now + datetime.timedelta(hours=1)
 
     # +/- 1 min window
@@ -18,36 +16,63 @@ def send_chore_reminders():
     upper = one_hour_later + datetime.timedelta(minutes=1)
 
     # Fetch occurrences due in ~1 hour, not yet completed or notified
-    occurrences_due = ChoreOccurrence.objects.filter(
-        completed=False,
-        notification_sent=False,
+    occurrences_due = list(ChoreOccurrence.objects.filter(
+        completed_at__isnull=True,
+        skipped_at__isnull=True,
+        notification_sent_at__isnull=True,
+        assigned_user__isnull=False,
         due_date__gte=lower,
         due_date__lte=upper
-    ).select_related("schedule__chore", "schedule__user")
+    ).select_related("schedule__chore", "assigned_user"))
 
-    for occ in occurrences_due:
-        user = occ.schedule.user
-        if not user:
-            continue
+    notifications = [
+        (occ.assigned_user, {
+            "title": "⏰ Chore Reminder",
+            "body": f"You have '{occ.schedule.chore.name}' due in 1 hour.",
+        })
+        for occ in occurrences_due
+    ]
+    sent, deferred, _ = PushService().dispatch(notifications, now=now)
+    NotificationService().notify([
+        Notification(
+            user=user,
+            house_id=occ.schedule.chore.house_id,
+            kind="reminder",
+            title=payload["title"],
+            body=payload["body"],
+            data={"occurrence_id": occ.id},
+        )
+        for occ, (user, payload) in zip(occurrences_due, notifications)
+    ])
 
-        token_obj = PushToken.objects.filter(user=user).first()
-        if not token_obj:
-            continue
+    # Deferred reminders now live in the deferred queue,
+    # so they are marked as handled and never rescanned here
+    ChoreOccurrence.objects.filter(
+        id__in=[occ.id for occ in occurrences_due]
+    ).update(notification_sent_at=now)
+    return sent, deferred
 
-        push_token = token_obj.token
 
-        message = {
-            "to": push_token,
-            "sound": "default",
-            "title": "⏰ Chore Reminder",
-            "body": f"You have '{occ.schedule.chore.name}' due in 1 hour.",
-            "priority": "high",
-        }
-
-        try:
-            resp = requests.post(EXPO_PUSH_URL, json=message, timeout=5)
-            # Mark notification as sent
-            occ.notification_sent = True
-            occ.save(update_fields=["notification_sent", "notification_sent_at"])
-        except Exception as e:
-            print(f"Error sending notification for {user.username}: {e}")
+@shared_task
+def flush_deferred_notifications():
+    return PushService().flush_deferred()
+
+
+@shared_task
+def send_daily_digests():
+    service = DigestService()
+    recipients = service.get_due_recipients()
+    return service.send_digests(recipients)
+
+
+@shared_task
+def archive_deleted_rows():
+    archived = ArchiveService().archive()
+    for name, count in archived.items():
+        print(f"Archived {count} {name} rows")
+
+
+@shared_task
+def create_occurrence_partitions():
+    created = ensure_future_partitions()
+    print(f"Created {len(created)} occurrence partitions")
@@ -0,0 +1,104 @@
+import factory
+import datetime as dt
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from api.models import *
+from api.services import ArchiveService
+
+User = get_user_model()
+
+class UserFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = User
+    email = factory.Sequence(lambda n: f"user{n}@example.com")
+    name = factory.Sequence(lambda n: f"user{n}")
+
+class HouseFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = House
+    name = factory.Sequence(lambda n: f"house{n}")
+    max_members = 6
+    password = ""
+
+START = dt.datetime(2026, 1, 25, 9, 0, tzinfo=dt.timezone.utc)
+LATER = timezone.now() + dt.timedelta(days=91)
+
+@override_settings(ARCHIVE_AFTER_DAYS=90)
+class TestArchiveService(TestCase):
+    def setUp(self):
+        self.user = UserFactory()
+        self.house = HouseFactory()
+        self.house.add_member(self.user, role="owner")
+        chore = Chore.objects.create(house=self.house, name="chore", color="#ff0000")
+        self.schedule = ChoreSchedule.objects.create(
+            chore=chore, start_date=START, repeat_unit="week", constraints={"weekdays": [0, 3]}
+        )
+        rule = MemberAssignmentRule.objects.create(schedule=self.schedule, rule_type="fixed")
+        RotationMember.objects.create(assignment_rule=rule, user=self.user, position=0)
+        self.occurrence = ChoreOccurrence.objects.create(
+            schedule=self.schedule, due_date=START, original_due_date=START
+        )
+        self.house.delete()
+        self.service = ArchiveService()
+
+    def _remaining(self):
+        return {model.__name__: model.all_objects.count() for model in self.service.archive_models()}
+
+    def test_archives_after_retention(self):
+        self.assertEqual(self.service.archive(now=LATER - dt.timedelta(days=2)), {
+            model.__name__: 0 for model in reversed(self.service.archive_models())
+        })
+
+        archived = self.service.archive(now=LATER)
+        self.assertEqual(set(archived.values()), {1})
+        self.assertEqual(set(self._remaining().values()), {0})
+        self.assertEqual(ArchivedRow.objects.filter(house_id=self.house.id).count(), 7)
+
+    def test_referenced_rows_wait(self):
+        # Deleted recently, so its schedule, chore and house stay too
+        ChoreOccurrence.all_objects.filter(id=self.occurrence.id).update(deleted_at=LATER)
+        self.service.archive(now=LATER)
+        self.assertEqual(self._remaining(), {
+            "House": 1,
+            "HouseMember": 0,
+            "Chore": 1,
+            "ChoreSchedule": 1,
+            "ChoreOccurrence": 1,
+            "MemberAssignmentRule": 0,
+            "RotationMember": 0,
+        })
+
+    def test_chunks(self):
+        self.service.archive(now=LATER, batch_size=1)
+        self.assertEqual(set(self._remaining().values()), {0})
+
+    def test_restore_relinks_notifications(self):
+        notification = Notification.objects.create(
+            user=self.user, house=self.house, kind="reminder", title="n"
+        )
+        self.service.archive(now=LATER)
+        notification.refresh_from_db()
+        self.assertIsNone(notification.house_id)
+
+        self.service.restore_house(self.house.id)
+        notification.refresh_from_db()
+        self.assertEqual(notification.house_id, self.house.id)
+
+    def test_restore_house(self):
+        self.service.archive(now=LATER)
+        self.assertEqual(self.service.restore_house(self.house.id), 7)
+        self.assertFalse(ArchivedRow.objects.exists())
+
+        house = House.all_objects.get(id=self.house.id)
+        self.assertIsNotNone(house.deleted_at)
+        house.restore()
+
+        schedule = ChoreSchedule.objects.get(id=self.schedule.id)
+        self.assertEqual(schedule.start_date, START)
+        self.assertEqual(schedule.constraints, {"weekdays": [0, 3]})
+        self.assertEqual(schedule.assignment_rule.rotation_members.get().user, self.user)
+        self.assertEqual(ChoreOccurrence.objects.get().due_date, START)
+        self.assertEqual(HouseMember.objects.get(house=house).role, "owner")
@@ -0,0 +1,93 @@
+import factory
+import datetime as dt
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from api.models import *
+
+User = get_user_model()
+
+class UserFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = User
+    email = factory.Sequence(lambda n: f"user{n}@example.com")
+    name = factory.Sequence(lambda n: f"user{n}")
+
+class HouseFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = House
+    name = factory.Sequence(lambda n: f"house{n}")
+    max_members = 6
+    password = ""
+
+class ChoreFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Chore
+    house = factory.SubFactory(HouseFactory)
+    name = factory.Sequence(lambda n: f"chore{n}")
+    color = "#ff0000"
+
+class ScheduleFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = ChoreSchedule
+    chore = factory.SubFactory(ChoreFactory)
+    start_date = dt.datetime(2026, 1, 25, 9, 0, tzinfo=dt.timezone.utc)
+    repeat_unit = "day"
+    repeat_interval = 1
+
+TODAY = dt.date(2026, 2, 1)
+
+@patch("api.services.timezone.localdate", lambda: TODAY)
+class TestBootstrap(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = UserFactory()
+        self.client.force_authenticate(user=self.user)
+
+    def _make_house(self, chores=2):
+        house = HouseFactory()
+        house.add_member(self.user)
+        for _ in range(chores):
+            schedule = ScheduleFactory(chore=ChoreFactory(house=house))
+            rule = MemberAssignmentRule.objects.create(schedule=schedule, rule_type="fixed")
+            RotationMember.objects.create(assignment_rule=rule, user=self.user, position=0)
+        return house
+
+    def _get(self, **params):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("bootstrap"), params)
+        self.assertEqual(response.status_code, 200)
+        return response, len(ctx.captured_queries)
+
+    def test_groups_by_house(self):
+        houses = [self._make_house(chores=1), self._make_house(chores=2)]
+        response, _ = self._get(days=2)
+        self.assertEqual([h["id"] for h in response.data["houses"]], [h.id for h in houses])
+
+        first, second = response.data["houses"]
+        self.assertEqual(len(first["chores"]), 1)
+        self.assertEqual(len(second["chores"]), 2)
+        # three days inclusive per chore
+        self.assertEqual(len(first["occurrences"]), 3)
+        self.assertEqual(len(second["occurrences"]), 6)
+        self.assertEqual(len(first["members"]), 1)
+
+    def test_query_count_is_fixed(self):
+        self._make_house()
+        _, few = self._get()
+        for _ in range(3):
+            self._make_house(chores=3)
+        _, many = self._get()
+        self.assertEqual(few, many)
+
+    def test_days_is_capped(self):
+        self._make_house(chores=1)
+        with self.settings(BOOTSTRAP_MAX_DAYS=5):
+            response, _ = self._get(days=500)
+        self.assertEqual(response.data["to"], TODAY + dt.timedelta(days=5))
@@ -0,0 +1,97 @@
+import factory
+import datetime as dt
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from api.models import *
+from api.services import HouseService
+
+User = get_user_model()
+
+class UserFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = User
+    email = factory.Sequence(lambda n: f"user{n}@example.com")
+    name = factory.Sequence(lambda n: f"user{n}")
+
+class HouseFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = House
+    name = factory.Sequence(lambda n: f"house{n}")
+    max_members = 6
+    password = ""
+
+class TestHouseClone(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = UserFactory()
+        self.old_flatmate = UserFactory()
+        self.new_flatmate = UserFactory()
+
+        self.source = HouseFactory()
+        self.source.add_member(self.user, role="owner")
+        self.source.add_member(self.old_flatmate)
+        self.target = HouseFactory()
+        self.target.add_member(self.user, role="owner")
+        self.target.add_member(self.new_flatmate)
+        self.client.force_authenticate(user=self.user)
+
+    def _add_chores(self, house, count):
+        for i in range(count):
+            chore = Chore.objects.create(house=house, name=f"chore{i}", color="#ff0000")
+            schedule = ChoreSchedule.objects.create(
+                chore=chore,
+                start_date=dt.datetime(2026, 1, 25, 9, 0, tzinfo=dt.timezone.utc),
+                repeat_unit="week",
+            )
+            rule = MemberAssignmentRule.objects.create(schedule=schedule, rule_type="rotation")
+            RotationMember.objects.create(assignment_rule=rule, user=self.user, position=0)
+            RotationMember.objects.create(assignment_rule=rule, user=self.old_flatmate, position=1)
+
+    def _clone(self, source):
+        return self.client.post(
+            reverse("house-clone", args=[self.target.id]),
+            {"source_house_id": source.id},
+            format="json",
+        )
+
+    def test_clones_graph_and_remaps_members(self):
+        self._add_chores(self.source, 2)
+        response = self._clone(self.source)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["created"], 2)
+
+        chore = Chore.objects.get(house=self.target, name="chore1")
+        schedule = chore.schedules.get()
+        self.assertEqual(schedule.repeat_unit, "week")
+        self.assertEqual(
+            list(schedule.assignment_rule.rotation_members.values_list("user_id", "position")),
+            [(self.user.id, 0), (self.new_flatmate.id, 1)],
+        )
+        # Source is untouched
+        self.assertEqual(Chore.objects.filter(house=self.source).count(), 2)
+
+    def test_round_trips_are_constant(self):
+        self._add_chores(self.source, 1)
+        # Warm the membership resolver
+        HouseService().clone_chores(self.source, self.target, self.user)
+        with CaptureQueriesContext(connection) as small:
+            HouseService().clone_chores(self.source, self.target, self.user)
+        self._add_chores(self.source, 10)
+        with CaptureQueriesContext(connection) as large:
+            HouseService().clone_chores(self.source, self.target, self.user)
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+
+    def test_requires_source_membership_unless_template(self):
+        other = HouseFactory()
+        self._add_chores(other, 1)
+        self.assertEqual(self._clone(other).status_code, 403)
+
+        other.is_template = True
+        other.save()
+        self.assertEqual(self._clone(other).status_code, 201)
@@ -0,0 +1,145 @@
+import factory
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from rest_framework.exceptions import ValidationError
+
+from api.models import *
+
+User = get_user_model()
+
+class UserFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = User
+    email = factory.Sequence(lambda n: f"user{n}@example.com")
+    name = factory.Sequence(lambda n: f"user{n}")
+
+class HouseFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = House
+    name = factory.Sequence(lambda n: f"house{n}")
+    max_members = 6
+    password = ""
+
+class TestHouseReads(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = UserFactory()
+        self.client.force_authenticate(user=self.user)
+
+    def _make_houses(self, count, members):
+        houses = []
+        for _ in range(count):
+            house = HouseFactory()
+            house.add_member(self.user)
+            for _ in range(members):
+                house.add_member(UserFactory())
+            houses.append(house)
+        return houses
+
+    def test_list_query_count_is_fixed(self):
+        self._make_houses(1, 1)
+        # houses, members with users
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("house-list-generic"))
+        self.assertEqual(len(response.data), 1)
+
+        self._make_houses(3, 4)
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("house-list-generic"))
+        self.assertEqual(len(response.data), 4)
+        self.assertEqual(len(response.data[-1]["members"]), 5)
+
+    def test_list_excludes_left_and_removed_members(self):
+        house, other = self._make_houses(2, 1)
+        HouseMember.objects.get(house=other, user=self.user).delete()
+        leaver = house.memberships.exclude(user=self.user).get()
+        leaver.delete()
+
+        response = self.client.get(reverse("house-list-generic"))
+        self.assertEqual([h["id"] for h in response.data], [house.id])
+        self.assertEqual([m["user"]["id"] for m in response.data[0]["members"]], [self.user.id])
+
+    def test_detail_query_count(self):
+        house, = self._make_houses(1, 4)
+        # memberships, house, members with users
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse("house-details", args=[house.id]))
+        self.assertEqual(len(response.data["members"]), 5)
+
+class TestMemberAdmission(APITestCase):
+    def setUp(self):
+        self.house = HouseFactory(max_members=2)
+
+    def test_count_tracks_joins_and_removals(self):
+        first = self.house.add_member(UserFactory())
+        self.house.add_member(UserFactory())
+        self.house.refresh_from_db()
+        self.assertEqual(self.house.member_count, 2)
+
+        with self.assertRaisesMessage(ValidationError, "House is full."):
+            self.house.add_member(UserFactory())
+
+        first.delete()
+        first.delete()
+        self.house.refresh_from_db()
+        self.assertEqual(self.house.member_count, 1)
+
+    def _statements(self, func, *args):
+        with CaptureQueriesContext(connection) as ctx:
+            try:
+                func(*args)
+            except ValidationError:
+                pass
+        return [
+            q["sql"].split()[0] for q in ctx.captured_queries
+            if "SAVEPOINT" not in q["sql"]
+        ]
+
+    def test_admission_is_one_update(self):
+        statements = self._statements(self.house.add_member, UserFactory())
+        self.assertEqual(statements, ["UPDATE", "INSERT"])
+
+    def test_full_house_rejects_without_insert(self):
+        House.all_objects.filter(pk=self.house.pk).update(member_count=2)
+        statements = self._statements(self.house.add_member, UserFactory())
+        self.assertEqual(statements, ["UPDATE"])
+
+    def test_duplicate_join_keeps_count(self):
+        user = UserFactory()
+        self.house.add_member(user)
+        with self.assertRaisesMessage(ValidationError, "User already in this house."):
+            self.house.add_member(user)
+        self.house.refresh_from_db()
+        self.assertEqual(self.house.member_count, 1)
+
+    def test_rejoin_restores_membership(self):
+        user = UserFactory()
+        member = self.house.add_member(user)
+        member.delete()
+
+        rejoined = self.house.add_member(user)
+        self.assertEqual(rejoined.pk, member.pk)
+        self.assertIsNone(rejoined.deleted_at)
+        self.house.refresh_from_db()
+        self.assertEqual(self.house.member_count, 1)
+
+    def test_stale_save_keeps_count(self):
+        stale = House.objects.get(pk=self.house.pk)
+        self.house.add_member(UserFactory())
+        stale.name = "renamed"
+        stale.save()
+        self.house.refresh_from_db()
+        self.assertEqual((self.house.name, self.house.member_count), ("renamed", 1))
+
+    def test_recount(self):
+        self.house.add_member(UserFactory())
+        House.all_objects.update(member_count=0)
+        House.recount_members()
+        self.house.refresh_from_db()
+        self.assertEqual(self.house.member_count, 1)
@@ -0,0 +1,121 @@
+import copy
+import factory
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from api.models import *
+
+User = get_user_model()
+
+class UserFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = User
+    email = factory.Sequence(lambda n: f"user{n}@example.com")
+    name = factory.Sequence(lambda n: f"user{n}")
+
+class HouseFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = House
+    name = factory.Sequence(lambda n: f"house{n}")
+    max_members = 6
+    password = ""
+
+def chore_data(name, users):
+    # Same shape as data.json
+    return {
+        "name": name,
+        "description": "chore_description",
+        "color": "#aabbcc",
+        "schedule": {
+            "start_date": "2026-03-30T12:30",
+            "repeat_unit": "day",
+            "repeat_interval": 1,
+            "assignment": {
+                "rule_type": "rotation",
+                "rotation_offset": 0,
+                "rotation_members": [
+                    {"user": user.id, "position": i} for i, user in enumerate(users)
+                ],
+            },
+        },
+    }
+
+class TestChoreImport(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = UserFactory()
+        self.other = UserFactory()
+        self.house = HouseFactory()
+        self.house.add_member(self.user, role="owner")
+        self.house.add_member(self.other)
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("chore-import", args=[self.house.id])
+
+    def _import(self, data):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(self.url, data, format="json")
+        inserts = [q["sql"] for q in ctx.captured_queries if q["sql"].startswith("INSERT")]
+        return response, inserts
+
+    def test_imports_nested_graph(self):
+        data = [chore_data(f"chore{i}", [self.user, self.other]) for i in range(30)]
+        response, inserts = self._import(data)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["created"], 30)
+
+        # One insert per table, plus the notifications
+        self.assertEqual(len(inserts), 5)
+        self.assertEqual(Chore.objects.filter(house=self.house).count(), 30)
+        self.assertEqual(MemberAssignmentRule.objects.count(), 30)
+        self.assertEqual(RotationMember.objects.count(), 60)
+
+        chore = Chore.objects.get(name="chore7")
+        rule = chore.schedules.get().assignment_rule
+        self.assertEqual(
+            list(rule.rotation_members.values_list("user_id", "position")),
+            [(self.user.id, 0), (self.other.id, 1)],
+        )
+        self.assertEqual(Notification.objects.filter(kind="assignment").count(), 2)
+
+    def test_query_count_is_fixed(self):
+        # Warm the membership cache
+        self._import([chore_data("a", [self.user])])
+        with CaptureQueriesContext(connection) as small:
+            self.client.post(self.url, [chore_data("b", [self.user])], format="json")
+        with CaptureQueriesContext(connection) as large:
+            self.client.post(
+                self.url,
+                [chore_data(f"c{i}", [self.user, self.other]) for i in range(40)],
+                format="json",
+            )
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+
+    def test_invalid_item_rejects_whole_import(self):
+        bad = chore_data("bad", [self.user])
+        bad["schedule"]["repeat_unit"] = "fortnight"
+        response, inserts = self._import([chore_data("good", [self.user]), bad])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(inserts, [])
+        self.assertFalse(Chore.objects.exists())
+
+    def test_rotation_members_must_be_in_house(self):
+        outsider = UserFactory()
+        response, inserts = self._import([chore_data("chore", [self.user, outsider])])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(inserts, [])
+
+    def test_duplicate_positions_rejected(self):
+        data = chore_data("chore", [self.user, self.other])
+        data["schedule"]["assignment"]["rotation_members"][1]["position"] = 0
+        response, _ = self._import([data])
+        self.assertEqual(response.status_code, 400)
+
+    def test_limit(self):
+        with self.settings(CHORE_IMPORT_MAX=2):
+            response, _ = self._import([chore_data(f"c{i}", [self.user]) for i in range(3)])
+        self.assertEqual(response.status_code, 400)
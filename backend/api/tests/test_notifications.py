@@ -0,0 +1,271 @@
+import factory
+import requests
+import datetime as dt
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from api.services import DigestService, NotificationService, PushService
+from api.models import *
+from api.helpers.notifications import quiet_hours_release
+from accounts.authentication import get_cached_user
+from accounts.models import PushToken
+
+User = get_user_model()
+
+class UserFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = User
+    email = factory.Sequence(lambda n: f"user{n}@example.com")
+    name = factory.Sequence(lambda n: f"user{n}")
+    password = factory.PostGenerationMethodCall("set_password", "password123")
+
+class HouseFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = House
+    name = factory.Sequence(lambda n: f"house{n}")
+    max_members = 6
+    password = factory.PostGenerationMethodCall("set_password", "house-password")
+
+class ChoreFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Chore
+    house = factory.SubFactory(HouseFactory)
+    name = "chore-name"
+    color = "#ff0000"
+
+class ScheduleFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = ChoreSchedule
+    chore = factory.SubFactory(ChoreFactory)
+    start_date = dt.datetime(2026, 1, 25, 9, 0, tzinfo=dt.timezone.utc)
+    repeat_unit = "day"
+    repeat_interval = 1
+
+def make_rotation(schedule, user):
+    rule = MemberAssignmentRule.objects.create(schedule=schedule, rule_type="fixed")
+    RotationMember.objects.create(assignment_rule=rule, user=user, position=0)
+
+NOW = dt.datetime(2026, 2, 1, 8, 5, tzinfo=dt.timezone.utc)
+
+@override_settings(DIGEST_SLOT_MINUTES=15)
+class TestDigestService(TestCase):
+    def setUp(self):
+        self.user = UserFactory(digest_enabled=True, digest_time=dt.time(8, 0))
+        self.other = UserFactory()
+        self.houses = [HouseFactory(), HouseFactory()]
+        for house in self.houses:
+            house.add_member(user=self.user)
+            house.add_member(user=self.other)
+            make_rotation(ScheduleFactory(chore=ChoreFactory(house=house)), self.user)
+        make_rotation(ScheduleFactory(chore=ChoreFactory(house=self.houses[0])), self.other)
+        PushToken.objects.create(user=self.user, token="token_123")
+        self.service = DigestService()
+
+    def test_due_recipients_in_slot(self):
+        recipients = self.service.get_due_recipients(now=NOW)
+        self.assertEqual(recipients, {self.user: NOW.date()})
+
+    def test_due_recipients_before_digest_time(self):
+        earlier = NOW - dt.timedelta(minutes=30)
+        self.assertEqual(self.service.get_due_recipients(now=earlier), {})
+
+    def test_late_run_catches_up(self):
+        later = NOW + dt.timedelta(hours=3)
+        self.assertEqual(self.service.get_due_recipients(now=later), {self.user: NOW.date()})
+
+    def test_due_recipients_respects_timezone(self):
+        self.user.timezone = "America/New_York"
+        self.user.save()
+        self.assertEqual(self.service.get_due_recipients(now=NOW), {})
+        local_eight = NOW + dt.timedelta(hours=5)
+        self.assertIn(self.user, self.service.get_due_recipients(now=local_eight))
+
+    def test_collect_digests_across_houses(self):
+        digests = self.service.collect_digests({self.user: NOW.date()})
+        occs = digests[self.user]
+        self.assertEqual(len(occs), 2)
+        self.assertEqual(
+            {occ.schedule.chore.house for occ in occs},
+            set(self.houses),
+        )
+
+    def test_collect_digests_batched_queries(self):
+        # memberships, saved occurrences, schedules, rules, rotation members, users
+        with self.assertNumQueries(6):
+            self.service.collect_digests({self.user: NOW.date()})
+
+    @patch("api.helpers.notifications.requests.post")
+    def test_send_digests_marks_sent(self, mock_post):
+        recipients = self.service.get_due_recipients(now=NOW)
+        sent = self.service.send_digests(recipients)
+        self.assertEqual(sent, 1)
+        self.assertEqual(mock_post.call_count, 1)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.digest_last_sent_on, NOW.date())
+        self.assertEqual(self.service.get_due_recipients(now=NOW), {})
+
+    @patch("api.helpers.notifications.requests.post")
+    def test_failed_digest_not_marked(self, mock_post):
+        mock_post.side_effect = requests.ConnectionError("expo down")
+        self.assertEqual(self.service.send_digests(self.service.get_due_recipients(now=NOW)), 0)
+        self.user.refresh_from_db()
+        self.assertIsNone(self.user.digest_last_sent_on)
+        self.assertIn(self.user, self.service.get_due_recipients(now=NOW))
+
+    @patch("api.helpers.notifications.requests.post")
+    def test_send_digests_invalidates_cached_user(self, mock_post):
+        get_cached_user(self.user.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.service.send_digests(self.service.get_due_recipients(now=NOW))
+        self.assertEqual(get_cached_user(self.user.id).digest_last_sent_on, NOW.date())
+
+class TestQuietHours(TestCase):
+    def setUp(self):
+        self.user = UserFactory(
+            quiet_hours_start=dt.time(22, 0),
+            quiet_hours_end=dt.time(7, 0),
+        )
+        PushToken.objects.create(user=self.user, token="token_123")
+        self.service = PushService()
+
+    def test_release_wraps_midnight(self):
+        late = dt.datetime(2026, 2, 1, 23, 30, tzinfo=dt.timezone.utc)
+        self.assertEqual(
+            quiet_hours_release(self.user, late),
+            dt.datetime(2026, 2, 2, 7, 0, tzinfo=dt.timezone.utc),
+        )
+        early = dt.datetime(2026, 2, 2, 6, 0, tzinfo=dt.timezone.utc)
+        self.assertEqual(
+            quiet_hours_release(self.user, early),
+            dt.datetime(2026, 2, 2, 7, 0, tzinfo=dt.timezone.utc),
+        )
+
+    def test_no_release_outside_window(self):
+        noon = dt.datetime(2026, 2, 1, 12, 0, tzinfo=dt.timezone.utc)
+        self.assertIsNone(quiet_hours_release(self.user, noon))
+        self.user.quiet_hours_start = None
+        self.assertIsNone(quiet_hours_release(self.user, noon))
+
+    @patch("api.helpers.notifications.requests.post")
+    def test_dispatch_defers_then_flushes(self, mock_post):
+        late = dt.datetime(2026, 2, 1, 23, 30, tzinfo=dt.timezone.utc)
+        payload = {"title": "title", "body": "body"}
+        sent, deferred, failed = self.service.dispatch([(self.user, payload)], now=late)
+        self.assertEqual((sent, deferred, failed), (0, 1, set()))
+        mock_post.assert_not_called()
+
+        # Nothing is released before the window ends
+        self.assertEqual(self.service.flush_deferred(now=late + dt.timedelta(hours=1)), 0)
+        self.assertEqual(DeferredNotification.objects.count(), 1)
+
+        release = dt.datetime(2026, 2, 2, 7, 0, tzinfo=dt.timezone.utc)
+        self.assertEqual(self.service.flush_deferred(now=release), 1)
+        self.assertEqual(mock_post.call_count, 1)
+        self.assertFalse(DeferredNotification.objects.exists())
+
+    @override_settings(DEFERRED_PUSH_RETRY_SECONDS=300)
+    @patch("api.helpers.notifications.requests.post")
+    def test_failed_flush_keeps_rows(self, mock_post):
+        late = dt.datetime(2026, 2, 1, 23, 30, tzinfo=dt.timezone.utc)
+        self.service.dispatch([(self.user, {"title": "title", "body": "body"})], now=late)
+
+        release = dt.datetime(2026, 2, 2, 7, 0, tzinfo=dt.timezone.utc)
+        mock_post.side_effect = requests.ConnectionError("expo down")
+        self.assertEqual(self.service.flush_deferred(now=release), 0)
+        deferred = DeferredNotification.objects.get()
+        self.assertEqual(deferred.release_at, release + dt.timedelta(seconds=300))
+        self.assertEqual(deferred.attempts, 1)
+
+        # Not due again until the retry time
+        self.assertEqual(self.service.flush_deferred(now=release), 0)
+        self.assertEqual(mock_post.call_count, 1)
+
+        mock_post.side_effect = None
+        self.assertEqual(self.service.flush_deferred(now=deferred.release_at), 1)
+        self.assertFalse(DeferredNotification.objects.exists())
+
+    @override_settings(DEFERRED_PUSH_RETRY_SECONDS=300, DEFERRED_PUSH_MAX_ATTEMPTS=2)
+    @patch("api.helpers.notifications.requests.post")
+    def test_undeliverable_rows_dropped(self, mock_post):
+        late = dt.datetime(2026, 2, 1, 23, 30, tzinfo=dt.timezone.utc)
+        self.service.dispatch([(self.user, {"title": "title", "body": "body"})], now=late)
+
+        mock_post.side_effect = requests.ConnectionError("expo down")
+        release = dt.datetime(2026, 2, 2, 7, 0, tzinfo=dt.timezone.utc)
+        self.service.flush_deferred(now=release)
+        self.assertTrue(DeferredNotification.objects.exists())
+        self.service.flush_deferred(now=release + dt.timedelta(seconds=300))
+        self.assertFalse(DeferredNotification.objects.exists())
+
+class TestNotificationInbox(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = UserFactory()
+        self.client.force_authenticate(user=self.user)
+        self.service = NotificationService()
+
+    def _notify(self, n):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.service.notify([
+                Notification(user=self.user, kind="reminder", title=f"n{i}")
+                for i in range(n)
+            ])
+
+    def test_unread_count_is_cached(self):
+        self._notify(3)
+        self.assertEqual(self.service.unread_count(self.user), 3)
+        self._notify(2)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.service.unread_count(self.user), 5)
+
+    def test_mark_read_decrements(self):
+        self._notify(3)
+        self.service.unread_count(self.user)
+        ids = list(Notification.objects.values_list("id", flat=True)[:2])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.service.mark_read(self.user, ids=ids), 2)
+        self.assertEqual(self.service.unread_count(self.user), 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.service.mark_read(self.user)
+        self.assertEqual(self.service.unread_count(self.user), 0)
+
+    def test_keyset_pages(self):
+        self._notify(5)
+        url = reverse("notification-list")
+        first = self.client.get(url, {"limit": 3})
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual([n["title"] for n in first.data["results"]], ["n4", "n3", "n2"])
+
+        second = self.client.get(url, {"limit": 3, "before": first.data["next_before"]})
+        self.assertEqual([n["title"] for n in second.data["results"]], ["n1", "n0"])
+        self.assertIsNone(second.data["next_before"])
+
+    def test_unread_count_expires(self):
+        self._notify(2)
+        with override_settings(NOTIFICATION_UNREAD_TTL=0):
+            self.service.unread_count(self.user)
+        Notification.objects.update(read_at=dt.datetime.now(dt.timezone.utc))
+        # The stale count isn't kept, so the next read recounts
+        self.assertEqual(self.service.unread_count(self.user), 0)
+
+    def test_mark_read_rejects_non_integer_ids(self):
+        url = reverse("notification-read")
+        for ids in (["1"], [1.5], [None], [True], "1"):
+            response = self.client.post(url, {"ids": ids}, format="json")
+            self.assertEqual(response.status_code, 400, ids)
+
+    def test_list_rejects_non_positive_params(self):
+        self._notify(2)
+        url = reverse("notification-list")
+        for params in ({"limit": -1}, {"limit": -5}, {"limit": 0}, {"before": -1}, {"limit": "x"}):
+            self.assertEqual(self.client.get(url, params).status_code, 400, params)
+
+    def test_unread_count_endpoint(self):
+        self._notify(2)
+        response = self.client.get(reverse("notification-unread-count"))
+        self.assertEqual(response.data, {"unread": 2})
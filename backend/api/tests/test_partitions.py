@@ -0,0 +1,51 @@
+import unittest
+import datetime as dt
+
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase
+
+from api.helpers import partitions
+from api.models import *
+
+START = dt.datetime(2026, 1, 5, 9, 0, tzinfo=dt.timezone.utc)
+
+@unittest.skipUnless(connection.vendor == "postgresql", "Partitioning needs Postgres")
+class TestPartitions(TestCase):
+    def setUp(self):
+        house = House.objects.create(name="house", max_members=6, password="")
+        chore = Chore.objects.create(house=house, name="chore")
+        self.schedule = ChoreSchedule.objects.create(chore=chore, start_date=START, repeat_unit="day")
+        self.january = ChoreOccurrence.objects.create(
+            schedule=self.schedule, due_date=START, original_due_date=START,
+        )
+        partitions.convert_table(now=START)
+
+    def _partitioned(self):
+        with connection.cursor() as cursor:
+            return partitions.is_partitioned(cursor)
+
+    def _occurrence(self, date):
+        return ChoreOccurrence.objects.create(schedule=self.schedule, due_date=date, original_due_date=date)
+
+    def test_convert_keeps_rows_and_uniqueness(self):
+        self.assertTrue(self._partitioned())
+        self.assertTrue(ChoreOccurrence.objects.filter(pk=self.january.pk).exists())
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            self._occurrence(START)
+        # The new sequence continues after the copied rows
+        self.assertGreater(self._occurrence(START + dt.timedelta(days=1)).pk, self.january.pk)
+
+    def test_ensure_creates_months_ahead(self):
+        self.assertEqual(partitions.ensure_future_partitions(now=START), [])
+        later = START.replace(month=3)
+        self.assertEqual(
+            partitions.ensure_future_partitions(now=later),
+            [partitions.partition_name(later.replace(month=month)) for month in (5, 6)],
+        )
+
+    def test_detach_frees_keys(self):
+        name = partitions.detach_partition(START)
+        self.assertEqual(name, partitions.partition_name(partitions.month_start(START)))
+        self.assertFalse(ChoreOccurrence.objects.filter(pk=self.january.pk).exists())
+        # Lands in the default partition now that its month is gone
+        self._occurrence(START)
@@ -0,0 +1,87 @@
+import factory
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from api.models import *
+from api.permissions import MembershipResolver
+
+User = get_user_model()
+
+class UserFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = User
+    email = factory.Sequence(lambda n: f"user{n}@example.com")
+    name = factory.Sequence(lambda n: f"user{n}")
+
+class HouseFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = House
+    name = factory.Sequence(lambda n: f"house{n}")
+    max_members = 6
+    password = ""
+
+class TestHouseMembership(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.owner = UserFactory()
+        self.member = UserFactory()
+        self.outsider = UserFactory()
+        self.house = HouseFactory()
+        self.house.add_member(self.owner, role="owner")
+        self.membership = self.house.add_member(self.member)
+
+    def test_house_scoped_views_reject_non_members(self):
+        self.client.force_authenticate(user=self.outsider)
+        responses = [
+            self.client.get(reverse("chore-occurrences", args=[self.house.id])),
+            self.client.post(reverse("chore-create", args=[self.house.id]), {}, format="json"),
+            self.client.patch(reverse("occurrence-update", args=[self.house.id]), {}, format="json"),
+            self.client.get(reverse("house-details", args=[self.house.id])),
+            self.client.patch(reverse("house-update", args=[self.house.id]), {}, format="json"),
+            self.client.delete(reverse("house-delete", args=[self.house.id])),
+            self.client.delete(
+                reverse("house-member-update", args=[self.house.id, self.membership.id])
+            ),
+        ]
+        self.assertEqual([r.status_code for r in responses], [403] * len(responses))
+
+    def test_memberships_cached_across_requests(self):
+        self.client.force_authenticate(user=self.member)
+        url = reverse("house-details", args=[self.house.id])
+        self.client.get(url)
+        # house, members with users, memberships come from the cache
+        with self.assertNumQueries(2):
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_removal_revokes_access(self):
+        self.client.force_authenticate(user=self.member)
+        url = reverse("house-details", args=[self.house.id])
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+        self.client.force_authenticate(user=self.owner)
+        response = self.client.delete(
+            reverse("house-member-update", args=[self.house.id, self.membership.id])
+        )
+        self.assertEqual(response.status_code, 204)
+
+        self.client.force_authenticate(user=self.member)
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+    def test_owner_checks_share_one_load(self):
+        resolver = MembershipResolver.for_user(self.owner)
+        with self.assertNumQueries(1):
+            self.assertTrue(resolver.is_owner(self.house.id))
+            self.assertTrue(MembershipResolver.for_user(self.owner).is_member(self.house.id))
+            self.assertEqual(resolver.house_ids(), [self.house.id])
+
+    def test_deleted_house_drops_out(self):
+        self.client.force_authenticate(user=self.owner)
+        response = self.client.delete(reverse("house-delete", args=[self.house.id]))
+        self.assertEqual(response.status_code, 204)
+
+        self.client.force_authenticate(user=self.member)
+        response = self.client.get(reverse("house-details", args=[self.house.id]))
+        self.assertEqual(response.status_code, 403)
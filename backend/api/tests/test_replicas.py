@@ -0,0 +1,105 @@
+import factory
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import OperationalError
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from api.models import *
+from api.services import HouseService
+from chores.db_router import ReplicaRouter, _read_db, choose_read_db, lag_key, pin_key
+
+User = get_user_model()
+
+class UserFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = User
+    email = factory.Sequence(lambda n: f"user{n}@example.com")
+    name = factory.Sequence(lambda n: f"user{n}")
+
+class HouseFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = House
+    name = factory.Sequence(lambda n: f"house{n}")
+    max_members = 6
+    password = ""
+
+@override_settings(REPLICA_DATABASES=["replica_1", "replica_2"], REPLICA_STICKY_SECONDS=5)
+class TestReplicaRouting(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = UserFactory()
+        self.house = HouseFactory()
+        self.house.add_member(self.user, role="owner")
+        self.client.force_authenticate(user=self.user)
+
+    def test_skips_lagging_replicas(self):
+        cache.set(lag_key("replica_1"), 0.2)
+        cache.set(lag_key("replica_2"), 30)
+        self.assertEqual(choose_read_db(self.user), "replica_1")
+
+    @patch("chores.db_router.connections")
+    def test_falls_back_to_primary(self, connections):
+        connections.__getitem__.return_value.cursor.side_effect = OperationalError("down")
+        self.assertIsNone(choose_read_db(self.user))
+        self.assertEqual(cache.get(lag_key("replica_1")), float("inf"))
+        # Cached, so a down replica isn't retried on every request
+        choose_read_db(self.user)
+        self.assertEqual(connections.__getitem__.call_count, 2)
+
+    def test_failed_replica_read_retried_on_primary(self):
+        real_get_house = HouseService.get_house
+
+        def get_house(service, id):
+            if _read_db.get() == "replica_1":
+                raise OperationalError("replica went away")
+            return real_get_house(service, id)
+
+        with patch("chores.db_router.choose_read_db", return_value="replica_1") as choose, \
+                patch.object(HouseService, "get_house", get_house):
+            response = self.client.get(reverse("house-details", args=[self.house.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(choose.call_count, 1)
+        self.assertEqual(cache.get(lag_key("replica_1")), float("inf"))
+
+    @override_settings(REPLICA_DATABASES=[])
+    def test_no_replicas(self):
+        self.assertIsNone(choose_read_db(self.user))
+
+    def test_router(self):
+        router = ReplicaRouter()
+        self.assertIsNone(router.db_for_read(House))
+        token = _read_db.set("replica_1")
+        try:
+            self.assertEqual(router.db_for_read(House), "replica_1")
+            self.assertEqual(router.db_for_write(House), "default")
+        finally:
+            _read_db.reset(token)
+        self.assertFalse(router.allow_migrate("replica_1", "api"))
+
+    def test_write_pins_user_to_primary(self):
+        cache.set(lag_key("replica_1"), 0)
+        cache.set(lag_key("replica_2"), 0)
+        self.assertIsNotNone(choose_read_db(self.user))
+
+        response = self.client.patch(
+            reverse("house-update", args=[self.house.id]), {"name": "new"}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(cache.get(pin_key(self.user.pk)))
+        self.assertIsNone(choose_read_db(self.user))
+
+    def test_only_safe_requests_choose(self):
+        with patch("chores.db_router.choose_read_db", return_value=None) as choose:
+            self.client.get(reverse("house-details", args=[self.house.id]))
+            self.client.get(reverse("user"))
+            self.assertEqual(choose.call_count, 2)
+            self.client.patch(
+                reverse("house-update", args=[self.house.id]), {"name": "new"}, format="json"
+            )
+            self.assertEqual(choose.call_count, 2)
+        # Reset after the request
+        self.assertIsNone(_read_db.get())
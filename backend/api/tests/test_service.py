@@ -6,6 +6,8 @@ from rest_framework.test import APITestCase, APIClient
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 from django.http import Http404
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 from api.services import OccurrenceService
 from api.models import *
@@ -158,3 +160,16 @@ class TestOccurrenceService(TestCase):
         for occ in occurrences:
             self.assertFalse(occ.due_date < from_date_raw)
             self.assertFalse(occ.due_date > to_date_raw)
+
+    def test_saved_occs_half_open_range(self):
+        day = self.schedule.start_date.replace(hour=0, minute=0)
+        for due in (day, day + dt.timedelta(hours=23, minutes=59), day + dt.timedelta(days=1)):
+            ChoreOccurrence.objects.create(schedule=self.schedule, due_date=due, original_due_date=due)
+
+        with CaptureQueriesContext(connection) as queries:
+            saved = self.service._get_saved_occurrences(
+                [self.house], day.date().isoformat(), day.date().isoformat()
+            )
+        self.assertEqual(len(saved), 2)
+        # Compared on the bare column, so indexes and partition pruning apply
+        self.assertNotIn("cast", queries[0]["sql"].lower())
@@ -0,0 +1,111 @@
+import factory
+import datetime as dt
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from api.models import *
+from api.services import OccurrenceService
+
+User = get_user_model()
+
+class UserFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = User
+    email = factory.Sequence(lambda n: f"user{n}@example.com")
+    name = factory.Sequence(lambda n: f"user{n}")
+
+class HouseFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = House
+    name = factory.Sequence(lambda n: f"house{n}")
+    max_members = 6
+    password = ""
+
+START = dt.datetime(2026, 1, 25, 9, 0, tzinfo=dt.timezone.utc)
+
+class TestCascadingSoftDelete(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = UserFactory()
+        self.house = HouseFactory()
+        self.house.add_member(self.user, role="owner")
+        self.chores = []
+        for i in range(2):
+            chore = Chore.objects.create(house=self.house, name=f"chore{i}", color="#ff0000")
+            schedule = ChoreSchedule.objects.create(chore=chore, start_date=START, repeat_unit="day")
+            rule = MemberAssignmentRule.objects.create(schedule=schedule, rule_type="fixed")
+            RotationMember.objects.create(assignment_rule=rule, user=self.user, position=0)
+            ChoreOccurrence.objects.create(schedule=schedule, due_date=START, original_due_date=START)
+            self.chores.append(chore)
+        self.client.force_authenticate(user=self.user)
+
+    def _active_counts(self):
+        return [
+            model.objects.count()
+            for model in (HouseMember, Chore, ChoreSchedule, ChoreOccurrence, MemberAssignmentRule, RotationMember)
+        ]
+
+    def test_dependents_discovered(self):
+        self.assertEqual(
+            dict((model, lookup) for model, lookup in soft_delete_dependents(House)),
+            {
+                HouseMember: "house",
+                Chore: "house",
+                ChoreSchedule: "chore__house",
+                ChoreOccurrence: "schedule__chore__house",
+                MemberAssignmentRule: "schedule__chore__house",
+                RotationMember: "assignment_rule__schedule__chore__house",
+            },
+        )
+
+    def test_delete_cascades_with_one_update_per_table(self):
+        # one UPDATE per dependent table, then the house itself
+        with self.assertNumQueries(len(soft_delete_dependents(House)) + 1 + 2):
+            self.house.delete()
+        self.assertEqual(self._active_counts(), [0] * 6)
+
+        batches = {
+            chore.deletion_batch for chore in Chore.all_objects.filter(house=self.house)
+        }
+        self.assertEqual(batches, {self.house.deletion_batch})
+
+    def test_deleted_house_not_expanded(self):
+        self.house.delete()
+        occurrences = OccurrenceService().get_occurrences_for_houses(
+            [self.house], "2026-02-01", "2026-02-07"
+        )
+        self.assertEqual(occurrences, [])
+
+    def test_restore_brings_back_only_cascaded_rows(self):
+        self.chores[0].delete()
+        before = self._active_counts()
+
+        self.house.delete()
+        self.house.restore()
+        self.assertEqual(self._active_counts(), before)
+        # The chore deleted beforehand keeps its own batch
+        self.assertEqual(list(Chore.objects.filter(house=self.house)), [self.chores[1]])
+        self.assertIsNotNone(Chore.all_objects.get(pk=self.chores[0].pk).deleted_at)
+
+    def test_restore_endpoint(self):
+        self.client.delete(reverse("house-delete", args=[self.house.id]))
+        self.assertEqual(self.client.get(reverse("house-details", args=[self.house.id])).status_code, 403)
+
+        response = self.client.post(reverse("house-restore", args=[self.house.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get(reverse("house-details", args=[self.house.id])).status_code, 200)
+
+        outsider = UserFactory()
+        self.house.delete()
+        self.client.force_authenticate(user=outsider)
+        response = self.client.post(reverse("house-restore", args=[self.house.id]))
+        self.assertEqual(response.status_code, 403)
+
+class TestActiveIndexes(APITestCase):
+    def test_every_soft_delete_model_has_partial_index(self):
+        for model in (House, HouseMember, Chore, ChoreSchedule, ChoreOccurrence, MemberAssignmentRule, RotationMember):
+            conditions = [index.condition for index in model._meta.indexes]
+            self.assertIn(ACTIVE, conditions, model)
@@ -0,0 +1,113 @@
+import factory
+import datetime as dt
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from api.exceptions import Conflict
+from api.models import *
+from api.permissions import MembershipResolver
+
+User = get_user_model()
+
+class UserFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = User
+    email = factory.Sequence(lambda n: f"user{n}@example.com")
+    name = factory.Sequence(lambda n: f"user{n}")
+
+class HouseFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = House
+    name = factory.Sequence(lambda n: f"house{n}")
+    max_members = 6
+    password = ""
+
+START = dt.datetime(2026, 1, 25, 9, 0, tzinfo=dt.timezone.utc)
+
+class TestSaveVersioned(APITestCase):
+    def setUp(self):
+        self.house = HouseFactory()
+
+    def test_bumps_version(self):
+        self.house.name = "renamed"
+        self.house.save_versioned(["name"])
+        self.assertEqual(self.house.version, 1)
+        self.house.refresh_from_db()
+        self.assertEqual((self.house.name, self.house.version), ("renamed", 1))
+
+    def test_concurrent_edit_conflicts(self):
+        first = House.objects.get(id=self.house.id)
+        second = House.objects.get(id=self.house.id)
+        first.name = "first"
+        first.save_versioned(["name"])
+
+        second.address = "second"
+        with self.assertRaises(Conflict):
+            second.save_versioned(["address"])
+        self.house.refresh_from_db()
+        self.assertEqual((self.house.name, self.house.address), ("first", None))
+
+    def test_stale_expected_version(self):
+        self.house.save_versioned(["name"])
+        with self.assertRaises(Conflict):
+            self.house.save_versioned(["name"], expected_version=0)
+
+    def test_save_update_fields_writes_version(self):
+        self.house.name = "renamed"
+        self.house.save(update_fields=["name"])
+        self.house.refresh_from_db()
+        self.assertEqual(self.house.version, 1)
+
+class TestIfMatch(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = UserFactory()
+        self.house = HouseFactory()
+        self.house.add_member(self.user, role="owner")
+        self.client.force_authenticate(user=self.user)
+
+    def test_house_update(self):
+        response = self.client.get(reverse("house-details", args=[self.house.id]))
+        self.assertEqual(response["ETag"], '"0"')
+
+        url = reverse("house-update", args=[self.house.id])
+        response = self.client.patch(url, {"name": "new"}, format="json", HTTP_IF_MATCH='"0"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["ETag"], '"1"')
+
+        response = self.client.patch(url, {"name": "lost"}, format="json", HTTP_IF_MATCH='W/"0"')
+        self.assertEqual(response.status_code, 409)
+        self.house.refresh_from_db()
+        self.assertEqual(self.house.name, "new")
+
+    def test_member_update_by_body_version(self):
+        other = UserFactory()
+        member = self.house.add_member(other)
+        self.assertEqual(MembershipResolver(other).role(self.house.id), "member")
+        url = reverse("house-member-update", args=[self.house.id, member.id])
+
+        response = self.client.patch(url, {"role": "owner", "version": 5}, format="json")
+        self.assertEqual(response.status_code, 409)
+
+        response = self.client.patch(url, {"role": "owner", "version": member.version}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["version"], member.version + 1)
+        # The cached memberships were invalidated
+        self.assertEqual(MembershipResolver(other).role(self.house.id), "owner")
+
+    def test_occurrence_completion(self):
+        chore = Chore.objects.create(house=self.house, name="chore", color="#ff0000")
+        schedule = ChoreSchedule.objects.create(chore=chore, start_date=START, repeat_unit="day")
+        occ = ChoreOccurrence.objects.create(schedule=schedule, due_date=START, original_due_date=START)
+        url = reverse("occurrence-update", args=[self.house.id])
+
+        data = {"occurrence_id": occ.id, "completed": True}
+        response = self.client.patch(url, data, format="json", HTTP_IF_MATCH='"3"')
+        self.assertEqual(response.status_code, 409)
+
+        response = self.client.patch(url, data, format="json", HTTP_IF_MATCH=f'"{occ.version}"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["version"], occ.version + 1)
@@ -6,12 +6,20 @@ urlpatterns = [
     path("house/join/", views.HouseJoinView.as_view(), name="house-join"),
     path("house/generic/", views.HouseListGenericView.as_view(), name="house-list-generic"),
     path("house/<int:id>/details/", views.HouseDetailView.as_view(), name="house-details"),
+    path("bootstrap/", views.BootstrapView.as_view(), name="bootstrap"),
     path("house/<int:id>/update/", views.HouseView.as_view(), name="house-update"),
     path("house/<int:id>/delete/", views.HouseView.as_view(), name="house-delete"),
+    path("house/<int:id>/restore/", views.HouseRestoreView.as_view(), name="house-restore"),
+    path("house/<int:house_id>/clone/", views.HouseCloneView.as_view(), name="house-clone"),
     path("house/<int:house_id>/member/<int:member_id>/update/", views.HouseMemberView.as_view(), name="house-member-update"),
 
     path("chore/create/<int:house_id>/", views.CreateChoreView.as_view(), name="chore-create"),
+    path("chore/import/<int:house_id>/", views.ImportChoresView.as_view(), name="chore-import"),
 
     path("chore/occurrences/<int:house_id>/", views.GetOccurrencesView.as_view(), name="chore-occurrences"),
     path("chore/occurrence/<int:house_id>/update/", views.OccurrenceUpdateView.as_view(), name="occurrence-update"),
+
+    path("notifications/", views.NotificationListView.as_view(), name="notification-list"),
+    path("notifications/unread-count/", views.NotificationUnreadCountView.as_view(), name="notification-unread-count"),
+    path("notifications/read/", views.NotificationReadView.as_view(), name="notification-read"),
 ]
@@ -3,14 +3,24 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework import status
 from rest_framework.generics import ListAPIView
+from rest_framework.exceptions import ValidationError
+from django.conf import settings
+from django.http import Http404
 from django.shortcuts import get_object_or_404
+from asgiref.sync import sync_to_async
 
 from .models import House, ChoreOccurrence
 from .serializers import *
-from .services import HouseService, ChoreService, OccurrenceService
+from chores.async_views import AsyncAPIView
+from chores.db_router import ReplicaReadMixin
+from chores.hashing import acheck_password
+from chores.throttling import TokenBucketThrottle
+from .permissions import IsHouseMember
+from .helpers.generic_utils import request_version
+from .services import HouseService, ChoreService, OccurrenceService, NotificationService, BootstrapService
 
 class OccurrenceUpdateView(APIView):
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsAuthenticated, IsHouseMember]
 
     def patch(self, request, house_id):
         get_object_or_404(House, id=house_id)
@@ -30,8 +40,12 @@ class OccurrenceUpdateView(APIView):
 
         if completed is not None:
             occ = service.resolve_occurrence(occ_id)
+            if occ.schedule.chore.house_id != house_id:
+                raise Http404("Occurrence not found")
+            # The client can't have seen a version of an unsaved occurrence
+            version = None if occ.is_temp else request_version(request)
             occ = service.materialize_occurrence(occ)
-            occ.set_completed(bool(completed))
+            occ.set_completed(bool(completed), version)
 
         """
         elif mode == "single":
@@ -60,8 +74,8 @@ class OccurrenceUpdateView(APIView):
             status=status.HTTP_200_OK
         )
 
-class GetOccurrencesView(APIView):
-    permission_classes = [IsAuthenticated]
+class GetOccurrencesView(ReplicaReadMixin, APIView):
+    permission_classes = [IsAuthenticated, IsHouseMember]
 
     def get(self, request, house_id):
         house = get_object_or_404(House.objects, id=house_id)
@@ -73,7 +87,7 @@ class GetOccurrencesView(APIView):
         return Response(occurrence_serializer.data, status=status.HTTP_200_OK)
 
 class CreateChoreView(APIView):
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsAuthenticated, IsHouseMember]
 
     def post(self, request, house_id):
         house = get_object_or_404(House.objects, id=house_id)
@@ -87,8 +101,24 @@ class CreateChoreView(APIView):
         # TEMP: Update response with generated occurences?
         return Response({"chore": "created"}, status=status.HTTP_201_CREATED)
 
+class ImportChoresView(APIView):
+    permission_classes = [IsAuthenticated, IsHouseMember]
+
+    def post(self, request, house_id):
+        house = get_object_or_404(House.objects, id=house_id)
+        service = ChoreService()
+        chores = service.import_chores(
+            house=house,
+            data=request.data,
+            user=request.user
+        )
+        return Response(
+            {"created": len(chores), "chores": ChoreReadSerializer(chores, many=True).data},
+            status=status.HTTP_201_CREATED
+        )
+
 class HouseMemberView(APIView):
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsAuthenticated, IsHouseMember]
 
     def patch(self, request, house_id, member_id):
         house = get_object_or_404(House.objects, id=house_id)
@@ -101,7 +131,8 @@ class HouseMemberView(APIView):
             house=house,
             member_id=member_id,
             role=serializer.validated_data["role"],
-            user=request.user
+            user=request.user,
+            version=request_version(request),
         )
         response_serializer = HouseMemberReadSerializer(updated_member)
 
@@ -113,19 +144,21 @@ class HouseMemberView(APIView):
         service.remove_member(house, member_id, request.user)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
-class HouseDetailView(APIView):
-    permission_classes = [IsAuthenticated]
+class HouseDetailView(ReplicaReadMixin, APIView):
+    permission_classes = [IsAuthenticated, IsHouseMember]
 
     def get(self, request, id):
-        house = get_object_or_404(House, id=id)
+        house = HouseService().get_house(id)
 
         serializer = HouseReadSerializer(house)
-        return Response(serializer.data)
+        return Response(serializer.data, headers={"ETag": f'"{house.version}"'})
 
-class HouseJoinView(APIView):
+class HouseJoinView(AsyncAPIView):
     permission_classes = [IsAuthenticated]
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = "house_join"
 
-    def post(self, request):
+    async def post(self, request):
         serializer = HouseJoinSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
@@ -133,13 +166,18 @@ class HouseJoinView(APIView):
         password = serializer.validated_data.get("password")
 
         service = HouseService()
-        house = service.join_house(request.user, join_code, password)
+        house = await sync_to_async(service.get_house_by_join_code)(join_code)
 
-        response_serializer = HouseReadSerializer(house)
-        return Response(response_serializer.data, status=status.HTTP_200_OK)
+        # Hash the join password off the event loop
+        if house.password and not await acheck_password(password, house.password):
+            raise ValidationError("Incorrect password.")
+        house = await sync_to_async(service.admit_member)(house, request.user)
+
+        response_data = await sync_to_async(lambda: HouseReadSerializer(house).data)()
+        return Response(response_data, status=status.HTTP_200_OK)
 
 class HouseView(APIView):
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsAuthenticated, IsHouseMember]
 
     def post(self, request):
         serializer = HouseCreateSerializer(data=request.data)
@@ -161,10 +199,12 @@ class HouseView(APIView):
         serializer.is_valid(raise_exception=True)
 
         service = HouseService()
-        updated_house = service.update_house(house, request.user, serializer.validated_data)
+        updated_house = service.update_house(
+            house, request.user, serializer.validated_data, version=request_version(request)
+        )
 
         response_serializer = HouseReadSerializer(updated_house)
-        return Response(response_serializer.data)
+        return Response(response_serializer.data, headers={"ETag": f'"{updated_house.version}"'})
 
     def delete(self, request, id):
         house = get_object_or_404(House, id=id)
@@ -174,13 +214,123 @@ class HouseView(APIView):
 
         return Response(status=status.HTTP_204_NO_CONTENT)
 
-class HouseListGenericView(ListAPIView):
+class HouseCloneView(APIView):
+    """
+    Copies the chores of another house, or a template house,
+    into this one.
+    """
+    permission_classes = [IsAuthenticated, IsHouseMember]
+
+    def post(self, request, house_id):
+        target = get_object_or_404(House.objects, id=house_id)
+        source_id = request.data.get("source_house_id")
+        if not source_id:
+            return Response(
+                {"error": "source_house_id required"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        source = get_object_or_404(House.objects, id=source_id)
+
+        service = HouseService()
+        chores = service.clone_chores(source, target, request.user)
+        return Response(
+            {"created": len(chores), "chores": ChoreReadSerializer(chores, many=True).data},
+            status=status.HTTP_201_CREATED
+        )
+
+class HouseRestoreView(APIView):
+    # The house is deleted, so membership is checked by the service
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, id):
+        house = get_object_or_404(House.all_objects, id=id)
+
+        service = HouseService()
+        house = service.restore_house(house, request.user)
+
+        response_serializer = HouseReadSerializer(house)
+        return Response(response_serializer.data, status=status.HTTP_200_OK)
+
+class HouseListGenericView(ReplicaReadMixin, ListAPIView):
     serializer_class = HouseReadSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
         # Only houses the user belongs to
-        return House.objects.filter(
-            memberships__user=self.request.user,
-            memberships__deleted_at__isnull=True
-        ).distinct()
+        return HouseService().get_user_houses(self.request.user)
+
+class BootstrapView(APIView):
+    """
+    Houses, members, chores and upcoming occurrences in one response,
+    so the app can start without a request per house.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        try:
+            days = int(request.GET.get("days", settings.BOOTSTRAP_DAYS))
+        except ValueError:
+            return Response(
+                {"error": "days must be an integer"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        days = min(max(days, 0), settings.BOOTSTRAP_MAX_DAYS)
+
+        data = BootstrapService().get_dashboard(request.user, days)
+        return Response(data, status=status.HTTP_200_OK)
+
+class NotificationListView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        before = request.GET.get("before")
+        limit = request.GET.get("limit")
+        try:
+            before = int(before) if before else None
+            limit = int(limit) if limit else None
+            if (before is not None and before < 1) or (limit is not None and limit < 1):
+                raise ValueError
+        except ValueError:
+            return Response(
+                {"error": "before and limit must be positive integers"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        service = NotificationService()
+        notifications, next_before = service.list_notifications(
+            request.user,
+            before=before,
+            limit=limit,
+        )
+        return Response({
+            "results": NotificationSerializer(notifications, many=True).data,
+            "next_before": next_before,
+        }, status=status.HTTP_200_OK)
+
+class NotificationUnreadCountView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        service = NotificationService()
+        return Response(
+            {"unread": service.unread_count(request.user)},
+            status=status.HTTP_200_OK
+        )
+
+class NotificationReadView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        ids = request.data.get("ids")
+        if ids is not None and not (
+            isinstance(ids, list)
+            and all(isinstance(i, int) and not isinstance(i, bool) for i in ids)
+        ):
+            return Response(
+                {"error": "ids must be a list of integers"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        service = NotificationService()
+        updated = service.mark_read(request.user, ids=ids)
+        return Response({"updated": updated}, status=status.HTTP_200_OK)
@@ -0,0 +1,148 @@
+"""
+Read replicas.
+
+Safe requests to views using ReplicaReadMixin read from a replica in
+REPLICA_DATABASES, everything else uses the primary ("default").
+
+After a user writes, their reads stay on the primary for
+REPLICA_STICKY_SECONDS so they see their own changes. A replica that is
+further behind than that, or unreachable, is skipped, and with no
+healthy replica reads fall back to the primary. A read that fails on
+its replica is retried on the primary.
+"""
+import random
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, connections
+from django.utils.decorators import sync_and_async_middleware
+from rest_framework.permissions import SAFE_METHODS
+
+# Alias reads go to for the current request, None for the primary
+_read_db = ContextVar("read_db", default=None)
+
+# 0 on a caught up replica (or a standalone copy), else seconds since
+# the last replayed transaction
+LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+"""
+
+def pin_key(user_id):
+    return f"db:pin:{user_id}"
+
+def lag_key(alias):
+    return f"db:lag:{alias}"
+
+def replica_lag(alias):
+    """
+    Seconds the replica is behind, cached for REPLICA_LAG_CHECK_SECONDS.
+    An unreachable replica is infinitely behind.
+    """
+    lag = cache.get(lag_key(alias))
+    if lag is None:
+        try:
+            with connections[alias].cursor() as cursor:
+                cursor.execute(LAG_SQL)
+                seconds = cursor.fetchone()[0]
+            lag = float("inf") if seconds is None else float(seconds)
+        except DatabaseError:
+            lag = float("inf")
+        cache.set(lag_key(alias), lag, settings.REPLICA_LAG_CHECK_SECONDS)
+    return lag
+
+def mark_unavailable(alias):
+    """ Skips the replica until its next lag check """
+    cache.set(lag_key(alias), float("inf"), settings.REPLICA_LAG_CHECK_SECONDS)
+
+def choose_read_db(user):
+    """ A healthy replica for the user's reads, or None for the primary """
+    if not settings.REPLICA_DATABASES:
+        return None
+    if user.is_authenticated and cache.get(pin_key(user.pk)):
+        return None
+    # A replica further behind than the sticky window could still show
+    # a user their own write missing once the pin expires
+    replicas = [
+        alias for alias in settings.REPLICA_DATABASES
+        if replica_lag(alias) < settings.REPLICA_STICKY_SECONDS
+    ]
+    return random.choice(replicas) if replicas else None
+
+def _wrote(request, response):
+    user = getattr(request, "user", None)
+    return (
+        settings.REPLICA_DATABASES
+        and request.method not in SAFE_METHODS
+        and response.status_code < 400
+        and user is not None
+        and user.is_authenticated
+    )
+
+@sync_and_async_middleware
+def replica_pin_middleware(get_response):
+    """
+    Pins a user's reads to the primary after a successful write. DRF
+    puts the authenticated user on the underlying request.
+    """
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            response = await get_response(request)
+            if _wrote(request, response):
+                await cache.aset(pin_key(request.user.pk), True, settings.REPLICA_STICKY_SECONDS)
+            return response
+    else:
+        def middleware(request):
+            response = get_response(request)
+            if _wrote(request, response):
+                cache.set(pin_key(request.user.pk), True, settings.REPLICA_STICKY_SECONDS)
+            return response
+    return middleware
+
+class ReplicaReadMixin:
+    """
+    Serves the view's safe requests from a replica once the user is
+    known. Authentication and permission checks read from the primary.
+    If the replica fails mid-request, the request is run again on the
+    primary, which is safe as it didn't write.
+    """
+    _primary_only = False
+
+    def dispatch(self, request, *args, **kwargs):
+        token = _read_db.set(None)
+        try:
+            try:
+                return super().dispatch(request, *args, **kwargs)
+            except DatabaseError:
+                alias = _read_db.get()
+                if alias is None:
+                    raise
+                mark_unavailable(alias)
+                _read_db.set(None)
+                self._primary_only = True
+                return super().dispatch(request, *args, **kwargs)
+        finally:
+            _read_db.reset(token)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS and not self._primary_only:
+            _read_db.set(choose_read_db(request.user))
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return _read_db.get()
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == "default"
@@ -0,0 +1,45 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+
+_pool = None
+
+def _init_worker():
+    import django
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "chores.settings")
+    django.setup()
+
+def get_hashing_pool():
+    """
+    Process pool for password hashing, sized by PASSWORD_HASHING_WORKERS.
+    Returns None when set to 0, in which case hashing runs in a thread.
+    """
+    global _pool
+    workers = settings.PASSWORD_HASHING_WORKERS
+    if not workers:
+        return None
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        )
+    return _pool
+
+async def _run(func, *args):
+    pool = get_hashing_pool()
+    if pool is None:
+        return await sync_to_async(func, thread_sensitive=False)(*args)
+    return await asyncio.get_running_loop().run_in_executor(pool, func, *args)
+
+async def amake_password(raw_password):
+    return await _run(make_password, raw_password)
+
+async def acheck_password(raw_password, encoded):
+    if not encoded:
+        return False
+    return await _run(check_password, raw_password, encoded)
@@ -0,0 +1,15 @@
+import redis
+from django.conf import settings
+
+_client = None
+
+def get_redis():
+    """ Shared Redis client for app level keys (rate limits, revocations) """
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(
+            settings.REDIS_URL,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        )
+    return _client
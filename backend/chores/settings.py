@@ -23,6 +23,34 @@ PROJECT_ROOT = BASE_DIR.parent
 MEDIA_ROOT = BASE_DIR / "media"
 MEDIA_URL = "/media/"
 
+# Avatars are content-addressed and served with immutable caching.
+# Swap the "avatars" backend for any Django storage (e.g. S3) as needed.
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
+    },
+    "avatars": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+        "OPTIONS": {
+            "location": MEDIA_ROOT / "avatars",
+            "base_url": f"{MEDIA_URL}avatars/",
+        },
+    },
+}
+AVATAR_SIZES = {
+    "small": 64,    # member lists
+    "large": 256,   # profile
+}
+AVATAR_CACHE_MAX_AGE = 60 * 60 * 24 * 365
+AVATAR_GC_GRACE_HOURS = 24
+AVATAR_GC_BATCH_SIZE = 500
+AVATAR_UPLOAD_DIR = MEDIA_ROOT / "uploads"   # shared with Celery workers
+AVATAR_UPLOAD_MAX_BYTES = 15 * 1024 * 1024
+AVATAR_UPLOAD_MAX_DIMENSION = 8000
+
 match os.environ.get("ENV"):
     case "test":
         env_filename = ".env.test"
@@ -50,8 +78,12 @@ ALLOWED_HOSTS = os.environ.get("DJANGO_ALLOWED_HOSTS", "localhost").split(",")
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
-    )
+        'accounts.authentication.CachedJWTAuthentication',
+    ),
+    # Proxies in front of the app. Throttles key on the client address
+    # they add to X-Forwarded-For, 0 uses REMOTE_ADDR, so clients can't
+    # pick their own rate limit bucket.
+    'NUM_PROXIES': int(os.environ.get("NUM_PROXIES", 0)),
 }
 
 # Application definition
@@ -79,6 +111,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'chores.db_router.replica_pin_middleware',
 ]
 
 CHANNEL_LAYERS = {
@@ -90,6 +123,27 @@ CHANNEL_LAYERS = {
     },
 }
 
+REDIS_URL = os.environ.get("REDIS_URL", "redis://127.0.0.1:6379/2")
+REDIS_SOCKET_TIMEOUT = 0.5
+
+# Token bucket limits per view scope, see chores/throttling.py.
+# Identities: ip, account (user or submitted email), join_code.
+RATE_LIMIT_ENABLED = True
+RATE_LIMITS = {
+    "login": {"ip": "20/min", "account": "5/min"},
+    "register": {"ip": "10/hour"},
+    "house_join": {"ip": "20/min", "account": "10/min", "join_code": "10/min"},
+    "reset_password": {"ip": "10/min"},
+    "change_password": {"ip": "10/min", "account": "5/min"},
+}
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": "redis://127.0.0.1:6379/1",
+    },
+}
+
 ROOT_URLCONF = 'chores.urls'
 
 TEMPLATES = [
@@ -129,6 +183,25 @@ DATABASES = {
     }
 }
 
+# Read replicas as host:port pairs, e.g. "replica1:5432,replica2:5432"
+REPLICA_DATABASES = []
+for number, address in enumerate(filter(None, os.getenv("POSTGRES_REPLICA_HOSTS", "").split(",")), 1):
+    host, _, port = address.strip().partition(":")
+    DATABASES[f"replica_{number}"] = {
+        **DATABASES["default"],
+        "HOST": host,
+        "PORT": port or "5432",
+        "OPTIONS": {"connect_timeout": 2},
+        "TEST": {"MIRROR": "default"},
+    }
+    REPLICA_DATABASES.append(f"replica_{number}")
+
+DATABASE_ROUTERS = ["chores.db_router.ReplicaRouter"]
+# Reads stay on the primary this long after a user's write, and
+# replicas further behind than this are skipped
+REPLICA_STICKY_SECONDS = 5
+REPLICA_LAG_CHECK_SECONDS = 5
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -149,6 +222,10 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Processes used by async auth views for password hashing.
+# 0 hashes in a thread instead, e.g. for tests.
+PASSWORD_HASHING_WORKERS = int(os.environ.get("PASSWORD_HASHING_WORKERS", os.cpu_count() or 1))
+
 AUTHENTICATION_BACKENDS = [
     "django.contrib.auth.backends.ModelBackend",
 ]
@@ -158,6 +235,18 @@ SIMPLE_JWT = {
     "REFRESH_TOKEN_LIFETIME": timedelta(days=30),
 }
 
+# Seconds a user resolved from an access token stays cached
+AUTH_USER_CACHE_TTL = 300
+# Seconds a user's house memberships stay cached
+MEMBERSHIP_CACHE_TTL = 300
+
+# Days of occurrences returned by the app bootstrap endpoint
+BOOTSTRAP_DAYS = 14
+BOOTSTRAP_MAX_DAYS = 60
+
+# Most chores accepted by one bulk import request
+CHORE_IMPORT_MAX = 200
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
 
@@ -186,9 +275,56 @@ CELERY_BEAT_SCHEDULE = {
     'send-chore-reminders-every-minute': {
         'task': 'api.tasks.send_chore_reminders',
         'schedule': 20,   # check every minute
-    }
+    },
+    'flush-deferred-notifications': {
+        'task': 'api.tasks.flush_deferred_notifications',
+        'schedule': 60,
+    },
+    'send-daily-digests': {
+        'task': 'api.tasks.send_daily_digests',
+        'schedule': 60 * 15,   # must match DIGEST_SLOT_MINUTES
+    },
+    'collect-orphaned-avatars': {
+        'task': 'accounts.tasks.collect_orphaned_avatars_task',
+        'schedule': 60 * 60 * 24,
+    },
+    'purge-expired-tokens': {
+        'task': 'accounts.tasks.purge_expired_tokens',
+        'schedule': 60 * 60,
+    },
+    'archive-deleted-rows': {
+        'task': 'api.tasks.archive_deleted_rows',
+        'schedule': 60 * 60 * 24,
+    },
+    'create-occurrence-partitions': {
+        'task': 'api.tasks.create_occurrence_partitions',
+        'schedule': 60 * 60 * 24,
+    },
 }
 
+# Rows deleted per statement when purging reset/verification tokens
+TOKEN_PURGE_BATCH_SIZE = 1000
+
+# Soft-deleted house data older than this is moved to ArchivedRow
+ARCHIVE_AFTER_DAYS = 90
+ARCHIVE_BATCH_SIZE = 1000
+
+# Monthly ChoreOccurrence partitions kept ready past the current month
+OCCURRENCE_PARTITION_MONTHS_AHEAD = 3
+
+# Push notifications
+EXPO_PUSH_CHUNK_SIZE = 100   # Expo's max messages per request
+# How often digests go out, each run sends every digest time that has passed
+DIGEST_SLOT_MINUTES = 15
+DEFERRED_PUSH_BATCH_SIZE = 500
+# Deferred pushes that Expo didn't accept are retried after this long,
+# and dropped after the last attempt (an hour of retries)
+DEFERRED_PUSH_RETRY_SECONDS = 60 * 5
+DEFERRED_PUSH_MAX_ATTEMPTS = 12
+# Cached unread counts are recounted after this long, so drift from
+# missed adjustments doesn't last
+NOTIFICATION_UNREAD_TTL = 60 * 60
+
 
 # Eail settings
 
@@ -202,4 +338,5 @@ EMAIL_PORT = 587
 EMAIL_USE_TLS = True
 EMAIL_HOST_USER = os.environ.get("EMAIL_HOST_USER", "")
 EMAIL_HOST_PASSWORD = os.environ.get("EMAIL_HOST_PASSWORD", "")
+EMAIL_TIMEOUT = 10   # emails are sent by Celery workers, keep them from hanging
 DEFAULT_FROM_EMAIL = os.environ.get("DEFAULT_FROM_EMAIL", "")
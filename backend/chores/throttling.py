@@ -0,0 +1,120 @@
+import logging
+from django.conf import settings
+from redis.exceptions import RedisError
+from rest_framework.throttling import BaseThrottle
+
+from .redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {"s": 1, "sec": 1, "m": 60, "min": 60, "h": 3600, "hour": 3600, "d": 86400, "day": 86400}
+
+# Checks every bucket, and only takes a token from each if all of them
+# have one, so a request is admitted or rejected in one round trip.
+# KEYS = bucket keys, ARGV = capacity, refill per ms for each key.
+# Returns 0 when admitted, or the wait in ms until it would be.
+TOKEN_BUCKET_LUA = """
+local time = redis.call("TIME")
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local tokens = {}
+local wait = 0
+for i = 1, #KEYS do
+    local capacity = tonumber(ARGV[2 * i - 1])
+    local rate = tonumber(ARGV[2 * i])
+    local state = redis.call("HMGET", KEYS[i], "tokens", "ts")
+    local available = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    available = math.min(capacity, available + (now - ts) * rate)
+    tokens[i] = available
+    if available < 1 then
+        wait = math.max(wait, math.ceil((1 - available) / rate))
+    end
+end
+if wait > 0 then
+    return wait
+end
+for i = 1, #KEYS do
+    local capacity = tonumber(ARGV[2 * i - 1])
+    local rate = tonumber(ARGV[2 * i])
+    redis.call("HSET", KEYS[i], "tokens", tostring(tokens[i] - 1), "ts", now)
+    redis.call("PEXPIRE", KEYS[i], math.ceil(capacity / rate))
+end
+return 0
+"""
+
+_script = None
+
+def parse_rate(rate):
+    """ "5/min" -> (capacity 5, refill of 5 tokens per 60 seconds) """
+    count, period = rate.split("/")
+    return int(count), PERIODS[period]
+
+def take_tokens(buckets):
+    """
+    buckets = [(key, "5/min"), ...]
+    Returns 0 if a token was taken from every bucket,
+    otherwise the seconds to wait before retrying.
+    """
+    global _script
+    if _script is None:
+        _script = get_redis().register_script(TOKEN_BUCKET_LUA)
+
+    keys = []
+    args = []
+    for key, rate in buckets:
+        capacity, period = parse_rate(rate)
+        keys.append(f"ratelimit:{key}")
+        args.extend([capacity, capacity / (period * 1000)])
+    return _script(keys=keys, args=args) / 1000
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Token bucket rate limiting in Redis.
+    Views set `throttle_scope`, which selects a dict of identity -> rate
+    in settings.RATE_LIMITS, e.g. {"ip": "20/min", "account": "5/min"}.
+    Throttles run before the handler, so rejected requests never
+    reach the password hashing in the view.
+    """
+    def __init__(self):
+        self._wait = None
+
+    def get_identity(self, kind, request, view):
+        if kind == "ip":
+            return self.get_ident(request)
+        # A JSON body can be a list or a scalar
+        data = request.data if isinstance(request.data, dict) else {}
+        if kind == "account":
+            if request.user and request.user.is_authenticated:
+                return f"user:{request.user.pk}"
+            email = data.get("email")
+            return f"email:{email.strip().lower()}" if isinstance(email, str) and email else None
+        if kind == "join_code":
+            join_code = data.get("join_code")
+            return join_code.strip().upper() if isinstance(join_code, str) and join_code else None
+        raise ValueError(f"Unknown rate limit identity: {kind}")
+
+    def allow_request(self, request, view):
+        if not settings.RATE_LIMIT_ENABLED or request.method in ("GET", "HEAD", "OPTIONS"):
+            return True
+
+        scope = getattr(view, "throttle_scope", None)
+        limits = settings.RATE_LIMITS.get(scope, {})
+        buckets = []
+        for kind, rate in limits.items():
+            identity = self.get_identity(kind, request, view)
+            if identity is not None:
+                buckets.append((f"{scope}:{kind}:{identity}", rate))
+        if not buckets:
+            return True
+
+        try:
+            self._wait = take_tokens(buckets)
+        except RedisError:
+            # Fail open, an unavailable Redis shouldn't lock everyone out
+            logger.warning("Rate limiting unavailable for %s", scope, exc_info=True)
+            return True
+        return self._wait == 0
+
+    def wait(self):
+        return self._wait
@@ -18,11 +18,13 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from accounts.views import AvatarFileView
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/", include("api.urls")),
     path("api/accounts/", include("accounts.urls")),
+    path(f"{settings.MEDIA_URL.lstrip('/')}avatars/<str:name>", AvatarFileView.as_view(), name="avatar-file"),
 ]
 
 if settings.DEBUG: